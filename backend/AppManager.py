@@ -1,28 +1,99 @@
 from backend.PointOperations import PointOperations
-from backend.Histogram import HistogramManager
+from backend.PointLUT import LUTPipeline
+from backend.Histogram import HistogramManager, HistogramCache
+from backend.IntegralHistogram import IntegralHistogram
+from backend.ImageData import ImageData
 from backend.LogicalOperations import LogicalOperations 
 from backend.MaskOperations import MaskOperations
 from backend.ArithmeticOperations import ArithmeticOperations
+from backend.StackOperations import StackOperations
 from backend.ConvolutionOperations import ConvolutionOperations
+from backend.ConvolutionCostModel import ConvolutionCostModel
 from backend.MorphologyOperations import MorphologyOperations
 from backend.SegmentationOperations import SegmentationOperations
 
 class AppManager:
+    # Cache histogramów współdzielony przez wszystkie okna i dialogi
+    histogram_cache = HistogramCache(max_entries=16)
+    
+    # Silnik konwolucji współdzielony przez wszystkie dialogi - bank przygotowanych
+    # masek, pamięć własnych masek i model kosztu tworzone są raz
+    convolution_engine = ConvolutionOperations()
+    
     @staticmethod
-    def calculate_histograms(img):
+    def calculate_histograms(img, use_cache=True, approximate=False):
         """
         Oblicza histogramy pikseli obrazu.
 
-        Parametr:
+        Parametry:
             img: obraz w formacie numpy.ndarray (mono lub BGR)
+            use_cache: False dla obrazów tymczasowych (np. podglądów),
+                       których nie warto trzymać w cache
+            approximate: True - szybki szacunek z próbki (HistogramEstimate),
+                         do podglądów na żywo; nie trafia do cache
 
         Zwraca:
             lista histogramów (każdy to numpy.ndarray 256-elementowy)
             - 1 element w liście dla obrazu mono
             - 3 elementy dla obrazu kolorowego (B, G, R)
         """        
-        return HistogramManager.calculate_histograms(img)
+        if approximate:
+            return HistogramManager.calculate_histograms(img, approximate=True)
+        if not use_cache:
+            return HistogramManager.calculate_histograms(img)
+        return AppManager.histogram_cache.get(img)
+
+    @staticmethod
+    def create_preview_sample(img):
+        """Warstwowa próbka obrazu - miniatura do szybkich podglądów w dialogach"""
+        return HistogramManager.stratified_sample(img)
+
+    @staticmethod
+    def estimate_sample_histograms(sample, population_pixels):
+        """Szacunek histogramów obrazu (z przedziałami błędu) na podstawie próbki"""
+        return HistogramManager.calculate_sample_histograms(sample, population_pixels)
     
+    @staticmethod
+    def calculate_histograms_streaming(source, tile_rows=None, workers=None):
+        """
+        Histogramy obrazu większego niż RAM (memmap, plik .npy lub iterator kafelków),
+        liczone kafelkami przy ograniczonym zużyciu pamięci.
+        """
+        return HistogramManager.calculate_histograms_streaming(source, tile_rows, workers)
+
+    @staticmethod
+    def invalidate_histograms(img):
+        """Unieważnia histogramy obrazu w cache (po modyfikacji lub zamknięciu obrazu)"""
+        AppManager.histogram_cache.invalidate(img)
+
+    @staticmethod
+    def get_image_data(img):
+        """
+        Obraz z zapamiętanymi metadanymi (rodzaj: gray/bgr/binary01/binary255,
+        min/max, typ) - klasyfikacja liczona raz, kolejne sprawdzenia w O(1).
+        """
+        return ImageData.of(img)
+
+    @staticmethod
+    def invalidate_image(img):
+        """Unieważnia wszystkie zapamiętane dane obrazu po modyfikacji w miejscu"""
+        ImageData.of(img).invalidate()
+        AppManager.histogram_cache.invalidate(img)
+
+    @staticmethod
+    def build_integral_histogram(img, max_bytes=None):
+        """
+        Histogram całkowy - histogramy i statystyki prostokątnych obszarów w czasie stałym.
+
+        Parametry:
+            img: obraz numpy.ndarray (grayscale)
+            max_bytes: limit pamięci tablicy; jeśli podany, jasność jest
+                       kwantyzowana do mniejszej liczby koszyków
+        """
+        if max_bytes is None:
+            return IntegralHistogram(img)
+        return IntegralHistogram.bounded(img, max_bytes)
+
     @staticmethod
     def apply_negate(img):
         return PointOperations.negate(img)
@@ -39,6 +110,18 @@ class AppManager:
     def apply_threshold_with_levels(img, threshold):
         return PointOperations.threshold_with_levels(img, threshold)
     
+    @staticmethod
+    def apply_point_operations(img, operations):
+        """
+        Łańcuch operacji punktowych złożony w jedną tablicę LUT i wykonany
+        jednym przebiegiem po obrazie.
+
+        Parametry:
+            img: obraz numpy.ndarray (grayscale)
+            operations: lista PointLUT (np. [PointLUT.negate(), PointLUT.posterize(8)])
+        """
+        return LUTPipeline(operations).apply(img)
+
     @staticmethod
     def apply_stretch_histogram(img, saturation_percent=0):
         return HistogramManager.stretch_histogram(img, saturation_percent)
@@ -68,6 +151,11 @@ class AppManager:
     def apply_logical_xor(img1, img2):
         """Operacja logiczna XOR"""
         return LogicalOperations.logical_xor(img1, img2)
+
+    @staticmethod
+    def apply_logical_combine(images, operation):
+        """Operacja logiczna AND/OR/XOR na dowolnej liczbie obrazów jednocześnie"""
+        return LogicalOperations.combine(images, operation)
     
     # === MASK CONVERSIONS (LAB 2) ===
     
@@ -80,14 +168,32 @@ class AppManager:
     def convert_to_binary_mask(img):
         """Konwertuje maskę 8-bitową (0/255) na maskę binarną (0/1)"""
         return MaskOperations.to_binary_mask(img)
+
+    @staticmethod
+    def convert_to_packed_mask(img):
+        """Pakuje maskę (0/1 lub 0/255) bitowo - 8 razy mniej pamięci"""
+        return MaskOperations.to_packed_mask(img)
     
     # === ARITHMETIC OPERATIONS (LAB 2) ===
 
     @staticmethod
     def apply_add_images(images, saturation=True):
-        """Dodawanie obrazów (2-5)"""
+        """Dodawanie obrazów (2 lub więcej)"""
         return ArithmeticOperations.add_images(images, saturation)
+
+    @staticmethod
+    def apply_accumulate_images(images, mode="sum", weights=None, saturation=True):
+        """Suma, średnia lub suma ważona dowolnej liczby obrazów (lista lub generator)"""
+        return ArithmeticOperations.accumulate_images(images, mode, weights, saturation)
     
+    @staticmethod
+    def apply_stack_projection(stack, statistic="mean", percentile=None, as_float=False):
+        """
+        Projekcja stosu obrazów (serii czasowej): mean, min, max, std, median
+        lub percentile - wartość dla każdego piksela
+        """
+        return StackOperations.project(stack, statistic, percentile, as_float)
+
     @staticmethod
     def apply_absolute_difference(img1, img2):
         """Różnica bezwzględna obrazów"""
@@ -108,72 +214,134 @@ class AppManager:
         """Dzielenie obrazu przez liczbę"""
         return ArithmeticOperations.divide_scalar(img, scalar)
 
+    @staticmethod
+    def apply_expression(expression, variables, saturation=True):
+        """Wyrażenie arytmetyczne na obrazach, np. "abs(a - b) * 2 + 10" """
+        return ArithmeticOperations.evaluate_expression(expression, variables, saturation)
+
     # === CONVOLUTION OPERATIONS (LAB 2 - ZADANIE 3) ===
     
     @staticmethod
     def apply_smoothing(img, mask_name, border_type="BORDER_REFLECT", border_value=0):
         """Wygładzanie liniowe"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_smoothing(img, mask_name, border_type, border_value)
+        return AppManager.convolution_engine.apply_smoothing(img, mask_name, border_type, border_value)
     
     @staticmethod
     def apply_sharpening(img, mask_name, border_type="BORDER_REFLECT", border_value=0):
         """Wyostrzanie (Laplacjan)"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_sharpening(img, mask_name, border_type, border_value)
+        return AppManager.convolution_engine.apply_sharpening(img, mask_name, border_type, border_value)
+    
+    @staticmethod
+    def apply_laplacian_sharpening(img, mask_name, amount=1.0, border_type="BORDER_REFLECT", border_value=0):
+        """Obraz wyostrzony Laplacjanem (obraz - k * Laplacjan) w jednym przebiegu"""
+        return AppManager.convolution_engine.apply_laplacian_sharpening(img, mask_name, amount, border_type,
+                                                                        border_value)
+    
+    @staticmethod
+    def apply_unsharp_mask(img, sigma=1.0, amount=1.0, threshold=0, border_type="BORDER_REFLECT", border_value=0):
+        """Maska wyostrzająca (unsharp) z siłą i progiem w jednym przebiegu"""
+        return AppManager.convolution_engine.apply_unsharp_mask(img, sigma, amount, threshold, border_type,
+                                                                border_value)
+    
+    @staticmethod
+    def get_sharpening_modes():
+        """Lista rodzajów wyniku wyostrzania"""
+        return AppManager.convolution_engine.get_sharpening_modes()
     
     @staticmethod
     def apply_prewitt(img, direction, border_type="BORDER_REFLECT", border_value=0):
         """Detekcja krawędzi Prewitt"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_prewitt(img, direction, border_type, border_value)
+        return AppManager.convolution_engine.apply_prewitt(img, direction, border_type, border_value)
+    
+    @staticmethod
+    def apply_prewitt_compass(img, border_type="BORDER_REFLECT", border_value=0):
+        """Kompasowy Prewitt - maksimum z 8 kierunków i mapa kierunku maksimum"""
+        return AppManager.convolution_engine.apply_prewitt_compass(img, border_type, border_value)
     
     @staticmethod
     def apply_sobel(img, border_type="BORDER_REFLECT", border_value=0):
         """Detekcja krawędzi Sobel"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_sobel(img, border_type, border_value)
+        return AppManager.convolution_engine.apply_sobel(img, border_type, border_value)
+    
+    @staticmethod
+    def compute_edge_features(img, features, border_type="BORDER_REFLECT", border_value=0):
+        """
+        Kilka cech krawędziowych naraz (Sobel X/Y/magnituda/orientacja, Laplacjany,
+        kierunki Prewitta) ze wspólnych pochodnych - słownik nazwa -> obraz
+        """
+        return AppManager.convolution_engine.compute_edge_features(img, features, border_type, border_value)
     
     @staticmethod
     def get_smoothing_masks():
         """Lista masek wygładzających"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.get_smoothing_mask_names()
+        return AppManager.convolution_engine.get_smoothing_mask_names()
+    
+    @staticmethod
+    def get_smoothing_filters():
+        """Lista filtrów wygładzających z parametrem (Gauss - sigma, uśrednienie - promień)"""
+        return AppManager.convolution_engine.get_smoothing_filters()
+    
+    @staticmethod
+    def apply_gaussian_smoothing(img, sigma, border_type="BORDER_REFLECT", border_value=0):
+        """Filtr Gaussa o dowolnej sigmie (dla dużych sigm - rekursywny, stały koszt)"""
+        return AppManager.convolution_engine.apply_gaussian_smoothing(img, sigma, border_type, border_value)
+    
+    @staticmethod
+    def apply_box_smoothing(img, radius, border_type="BORDER_REFLECT", border_value=0):
+        """Uśrednienie w oknie o dowolnym promieniu (sumy bieżące, stały koszt)"""
+        return AppManager.convolution_engine.apply_box_smoothing(img, radius, border_type, border_value)
+    
+    @staticmethod
+    def apply_custom_mask(img, mask, border_type="BORDER_REFLECT", border_value=0, method="auto"):
+        """Własna maska użytkownika (metoda: auto/direct/separable/fft)"""
+        return AppManager.convolution_engine.apply_custom_mask(img, mask, border_type, border_value, method=method)
     
     @staticmethod
-    def apply_custom_mask(img, mask, border_type="BORDER_REFLECT", border_value=0):
-        """Własna maska użytkownika"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_custom_mask(img, mask, border_type, border_value)
+    def decompose_custom_mask(mask):
+        """Rozkład maski na przebiegi 1-D (separowalność, rząd, błąd przybliżenia)"""
+        return AppManager.convolution_engine.prepare_kernel(mask).decomposition
+    
+    @staticmethod
+    def calibrate_convolution():
+        """
+        Mierzy koszt metod konwolucji (bezpośrednia, separowalna, FFT) na tym
+        komputerze i zapisuje model używany do wyboru metody
+        """
+        return ConvolutionCostModel.calibrate()
+    
+    @staticmethod
+    def get_custom_mask_sizes():
+        """Lista rozmiarów własnej maski"""
+        return AppManager.convolution_engine.get_custom_mask_sizes()
     
     @staticmethod
     def get_laplacian_masks():
         """Lista masek Laplacjana"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.get_laplacian_mask_names()
+        return AppManager.convolution_engine.get_laplacian_mask_names()
     
     @staticmethod
     def get_prewitt_directions():
         """Lista kierunków Prewitta"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.get_prewitt_directions()
+        return AppManager.convolution_engine.get_prewitt_directions()
     
     @staticmethod
     def get_border_types():
         """Lista typów brzegów"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.get_border_types()
+        return AppManager.convolution_engine.get_border_types()
+    
+    @staticmethod
+    def get_median_kernel_sizes():
+        """Lista rozmiarów otoczenia filtru medianowego"""
+        return AppManager.convolution_engine.get_median_kernel_sizes()
     
     @staticmethod
     def apply_median(img, kernel_size=3, border_type="BORDER_REFLECT", border_value=0):
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_median(img, kernel_size, border_type, border_value)
+        return AppManager.convolution_engine.apply_median(img, kernel_size, border_type, border_value)
     
     @staticmethod
     def apply_canny(img, threshold1=100, threshold2=200):
         """Detekcja krawędzi Canny"""
-        conv_ops = ConvolutionOperations()
-        return conv_ops.apply_canny(img, threshold1, threshold2)
+        return AppManager.convolution_engine.apply_canny(img, threshold1, threshold2)
     
     # ============ MORPHOLOGY OPERATIONS ============
 
@@ -2,6 +2,15 @@ import cv2
 import numpy as np
 from functools import wraps
 
+from backend.ImageExpression import ImageExpression
+from backend.PointLUT import PointLUT
+
+# Liczba pikseli kafelka przy akumulacji listy obrazów
+ACCUMULATE_TILE_PIXELS = 1 << 20
+
+# Tryby ArithmeticOperations.accumulate_images
+ACCUMULATE_MODES = ("sum", "mean", "weighted")
+
 
 def validate_arithmetic_operation(func):
     """
@@ -58,7 +67,7 @@ class ArithmeticOperations:
     @staticmethod
     def add_images(images, saturation=True):
         """
-        Dodawanie obrazów (2-5 obrazów).
+        Dodawanie obrazów (co najmniej 2).
         
         Parametry:
             images: lista obrazów numpy.ndarray (grayscale)
@@ -72,76 +81,196 @@ class ArithmeticOperations:
         if not images or len(images) < 2:
             raise ValueError("Potrzebujesz co najmniej 2 obrazów do dodawania")
         
-        if len(images) > 5:
-            raise ValueError("Maksymalnie 5 obrazów można dodać jednocześnie")
+        return ArithmeticOperations.accumulate_images(images, "sum", saturation=saturation)
+    
+    @staticmethod
+    def accumulate_images(images, mode="sum", weights=None, saturation=True, tile_rows=None):
+        """
+        Akumulacja dowolnej liczby obrazów: suma, średnia lub suma ważona.
+        
+        Lista obrazów (również np.memmap lub ścieżek do plików .npy) jest
+        przetwarzana kafelkami wierszy - dla każdego kafelka sumowane są wszystkie
+        obrazy, więc akumulator ma rozmiar kafelka, a nie obrazu. Inny iterator
+        (np. generator wczytujący klatki z dysku) jest czytany jednokrotnie,
+        obraz po obrazie, z akumulatorem o rozmiarze jednego obrazu.
+        
+        Akumulator jest całkowity: uint16 do 256 obrazów (z zapasem na zaokrąglenie
+        średniej), powyżej uint32.
+        Suma ważona używa akumulatora float32.
+        
+        Parametry:
+            images: lista obrazów / ścieżek .npy albo iterator obrazów (grayscale, ten sam rozmiar)
+            mode: "sum", "mean" lub "weighted"
+            weights: wagi obrazów (tylko dla "weighted")
+            saturation:
+                - True: z wysyceniem (obcięcie do 0-255)
+                - False: bez wysycenia - dla "sum" każdy obraz jest przed dodaniem
+                  normalizowany do [0, 255 // n] (wymaga listy obrazów, n <= 255)
+            tile_rows: liczba wierszy kafelka (domyślnie ACCUMULATE_TILE_PIXELS pikseli)
+        
+        Zwraca:
+            obraz wynikowy uint8 (średnia zaokrąglona do najbliższej liczby całkowitej)
+        """
+        if mode not in ACCUMULATE_MODES:
+            raise ValueError(f"Nieznany tryb akumulacji: {mode} (dostępne: {', '.join(ACCUMULATE_MODES)})")
+        if mode == "weighted":
+            if weights is None:
+                raise ValueError("Suma ważona wymaga podania wag")
+            weights = np.asarray(weights, dtype=np.float32)
+        elif weights is not None:
+            raise ValueError("Wagi można podać tylko dla sumy ważonej")
+        
+        if isinstance(images, (list, tuple)):
+            images = [np.load(img, mmap_mode='r') if isinstance(img, str) else img for img in images]
+            return ArithmeticOperations._accumulate_tiles(images, mode, weights, saturation, tile_rows)
         
-        # Sprawdź czy wszystkie grayscale
-        for i, img in enumerate(images):
-            if len(img.shape) != 2:
-                raise ValueError(f"Obraz {i+1} nie jest w odcieniach szarości")
+        if mode == "sum" and not saturation:
+            raise ValueError("Dodawanie bez wysycenia wymaga listy obrazów "
+                             "(normalizacja zależy od ich liczby)")
+        return ArithmeticOperations._accumulate_stream(iter(images), mode, weights)
+    
+    @staticmethod
+    def _validate_stack_image(img, index, base_shape):
+        """Sprawdza pojedynczy obraz akumulacji (numeracja od 1)"""
+        if len(img.shape) != 2:
+            raise ValueError(f"Obraz {index} nie jest w odcieniach szarości")
+        if base_shape is not None and img.shape != base_shape:
+            raise ValueError(f"Obraz {index} ma inny rozmiar: {img.shape[1]}x{img.shape[0]} "
+                             f"(oczekiwano: {base_shape[1]}x{base_shape[0]})")
+    
+    @staticmethod
+    def _accumulator_dtype(count):
+        """
+        Najmniejszy typ całkowity mieszczący sumę `count` obrazów uint8
+        wraz ze składnikiem zaokrąglenia średniej (count // 2)
+        """
+        return np.uint16 if count * 255 + count // 2 <= np.iinfo(np.uint16).max else np.uint32
+    
+    @staticmethod
+    def _normalize_lut(img, max_value):
+        """
+        Tablica LUT równoważna cv2.normalize(img, None, 0, max_value, NORM_MINMAX).
+        Normalizacja zależy tylko od min/max obrazu, więc wystarczy znormalizować rampę min..max.
+        """
+        lo, hi = int(img.min()), int(img.max())
+        ramp = np.arange(lo, hi + 1, dtype=np.uint8).reshape(1, -1)
+        lut = np.zeros(256, dtype=np.uint8)
+        lut[lo:hi + 1] = cv2.normalize(ramp, None, 0, max_value, cv2.NORM_MINMAX).ravel()
+        return lut
+    
+    @staticmethod
+    def _accumulate_tiles(images, mode, weights, saturation, tile_rows):
+        """Akumulacja listy obrazów kafelkami wierszy"""
+        if not images:
+            raise ValueError("Lista obrazów jest pusta")
         
-        # Sprawdź rozmiary
+        count = len(images)
         base_shape = images[0].shape
-        for i, img in enumerate(images[1:], start=2):
-            if img.shape != base_shape:
-                raise ValueError(f"Obraz {i} ma inny rozmiar: {img.shape[1]}x{img.shape[0]} "
-                            f"(oczekiwano: {base_shape[1]}x{base_shape[0]})")
-        
-        result = np.zeros_like(images[0], dtype=np.float32)
-        if saturation:
-            # Z wysyceniem
-            for img in images:
-                result += img.astype(np.float32)
-        else:
-            # Bez wysycenia
-            max_scale_value = 255 // len(images)
-            scaled_images = []
+        for i, img in enumerate(images, start=1):
+            ArithmeticOperations._validate_stack_image(img, i, base_shape)
+            if img.dtype != np.uint8:
+                raise ValueError(f"Obraz {i} musi być 8-bitowy (uint8)")
+        if weights is not None and len(weights) != count:
+            raise ValueError(f"Liczba wag ({len(weights)}) różni się od liczby obrazów ({count})")
+        
+        luts = None
+        if mode == "sum" and not saturation:
+            # Każdy obraz normalizowany do [0, 255 // n] - dla n > 255 byłby to
+            # zawsze zakres [0, 0]
+            if count > 255:
+                raise ValueError(f"Dodawanie bez wysycenia obsługuje maksymalnie 255 obrazów (podano: {count})")
+            luts = [ArithmeticOperations._normalize_lut(img, 255 // count) for img in images]
+        
+        height, width = base_shape
+        if tile_rows is None:
+            tile_rows = max(1, ACCUMULATE_TILE_PIXELS // max(width, 1))
+        acc_dtype = np.float32 if mode == "weighted" else ArithmeticOperations._accumulator_dtype(count)
+        
+        result = np.empty(base_shape, dtype=np.uint8)
+        acc = np.empty((tile_rows, width), dtype=acc_dtype)
+        
+        for top in range(0, height, tile_rows):
+            rows = min(tile_rows, height - top)
+            tile_acc = acc[:rows]
+            tile_acc[:] = 0
             
-            for img in images:
-                # Normalizacja do zakresu [0, max_scale_value]
-                scaled = cv2.normalize(img, None, 0, max_scale_value, cv2.NORM_MINMAX)
-                scaled_images.append(scaled)
+            for i, img in enumerate(images):
+                tile = np.asarray(img[top:top + rows])
+                if luts is not None:
+                    tile = cv2.LUT(tile, luts[i])
+                if weights is not None:
+                    tile_acc += tile * weights[i]
+                else:
+                    tile_acc += tile
             
-            for img in scaled_images:
-                result += img.astype(np.float32)
-
-        result = np.clip(result, 0, 255)
-        result = result.astype(np.uint8)
+            result[top:top + rows] = ArithmeticOperations._finish_accumulation(tile_acc, mode, count)
         
         return result
     
+    @staticmethod
+    def _accumulate_stream(images, mode, weights):
+        """Akumulacja obrazów z iteratora - jeden przebieg, akumulator o rozmiarze obrazu"""
+        acc = None
+        count = 0
+        
+        for img in images:
+            count += 1
+            ArithmeticOperations._validate_stack_image(img, count, None if acc is None else acc.shape)
+            if img.dtype != np.uint8:
+                raise ValueError(f"Obraz {count} musi być 8-bitowy (uint8)")
+            
+            if weights is not None:
+                if count > len(weights):
+                    raise ValueError(f"Za mało wag ({len(weights)}) dla kolejnych obrazów")
+                if acc is None:
+                    acc = np.zeros(img.shape, dtype=np.float32)
+                acc += img * weights[count - 1]
+                continue
+            
+            acc_dtype = ArithmeticOperations._accumulator_dtype(count)
+            if acc is None:
+                acc = np.zeros(img.shape, dtype=acc_dtype)
+            elif acc.dtype != acc_dtype:
+                acc = acc.astype(acc_dtype)
+            acc += img
+        
+        if acc is None:
+            raise ValueError("Brak obrazów do akumulacji")
+        if weights is not None and count != len(weights):
+            raise ValueError(f"Liczba wag ({len(weights)}) różni się od liczby obrazów ({count})")
+        
+        return ArithmeticOperations._finish_accumulation(acc, mode, count)
+    
+    @staticmethod
+    def _finish_accumulation(acc, mode, count):
+        """Zamienia akumulator na obraz uint8"""
+        if mode == "mean":
+            # Dzielenie całkowite z zaokrągleniem do najbliższej wartości
+            return ((acc + count // 2) // count).astype(np.uint8)
+        if mode == "weighted":
+            return np.clip(np.rint(acc), 0, 255).astype(np.uint8)
+        return np.minimum(acc, 255).astype(np.uint8)
+    
     @staticmethod
     def add_scalar(img, scalar, saturation=True):
         """
         Dodawanie liczby całkowitej do obrazu.
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
+            img: obraz numpy.ndarray (grayscale lub BGR)
             scalar: liczba całkowita do dodania
             saturation: True (z wysyceniem) / False (bez wysycenia - skalowanie)
         
         Zwraca:
             obraz wynikowy
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
-        
-        if saturation:
-            # Z wysyceniem - po prostu dodaj i obetnij
-            result = img.astype(np.int16) + scalar
-            result = np.clip(result, 0, 255).astype(np.uint8)
-        else:
-            # Bez wysycenia - skaluj do zakresu 0-255
-            result = img.astype(np.int16) + scalar
-            # Normalizuj wynik do 0-255
-            result_min = np.min(result)
-            result_max = np.max(result)
-            if result_max == result_min:
-                result = np.full_like(img, 128, dtype=np.uint8)
-            else:
-                result = ((result - result_min) * 255 / (result_max - result_min)).astype(np.uint8)
+        if len(img.shape) != 2 and (len(img.shape) != 3 or img.shape[2] != 3):
+            raise ValueError("Obraz musi być w odcieniach szarości lub kolorowy (BGR)")
         
-        return result
+        # Z wysyceniem - dodaj i obetnij do 0-255
+        # Bez wysycenia - wynik normalizowany liniowo do zakresu 0-255
+        # (dla obrazu BGR zakres liczony wspólnie ze wszystkich kanałów)
+        return PointLUT.add_scalar(scalar, saturation).apply(img)
     
     @staticmethod
     def multiply_scalar(img, scalar, saturation=True):
@@ -149,35 +278,19 @@ class ArithmeticOperations:
         Mnożenie obrazu przez liczbę całkowitą.
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
+            img: obraz numpy.ndarray (grayscale lub BGR)
             scalar: liczba całkowita do mnożenia
             saturation: True (z wysyceniem) / False (bez wysycenia - skalowanie)
         
         Zwraca:
             obraz wynikowy
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
-        
-        if scalar == 0:
-            return np.zeros_like(img)
-        
-        if saturation:
-            # Z wysyceniem
-            result = img.astype(np.float32) * scalar
-            result = np.clip(result, 0, 255).astype(np.uint8)
-        else:
-            # Bez wysycenia - skaluj obraz przed mnożeniem
-            if scalar > 1:
-                # Przeskaluj obraz do zakresu [0, 255/scalar]
-                max_scale_value = 255 // scalar
-                scaled = cv2.normalize(img, None, 0, max_scale_value, cv2.NORM_MINMAX)
-                result = (scaled.astype(np.float32) * scalar).astype(np.uint8)
-            else:
-                # Dla scalar <= 1 nie ma ryzyka przepełnienia
-                result = (img.astype(np.float32) * scalar).astype(np.uint8)
+        if len(img.shape) != 2 and (len(img.shape) != 3 or img.shape[2] != 3):
+            raise ValueError("Obraz musi być w odcieniach szarości lub kolorowy (BGR)")
         
-        return result
+        # Z wysyceniem - obcięcie do 0-255
+        # Bez wysycenia - obraz przeskalowany do [0, 255/scalar] przed mnożeniem
+        return PointLUT.multiply_scalar(scalar, saturation).apply(img)
     
     @staticmethod
     def divide_scalar(img, scalar):
@@ -185,19 +298,31 @@ class ArithmeticOperations:
         Dzielenie obrazu przez liczbę całkowitą.
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
+            img: obraz numpy.ndarray (grayscale lub BGR)
             scalar: liczba całkowita do dzielenia (> 0)
         
         Zwraca:
             obraz wynikowy
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
-        
-        if scalar == 0:
-            raise ValueError("Nie można dzielić przez zero!")
+        if len(img.shape) != 2 and (len(img.shape) != 3 or img.shape[2] != 3):
+            raise ValueError("Obraz musi być w odcieniach szarości lub kolorowy (BGR)")
         
         # Dzielenie nie powoduje przepełnienia, więc nie ma wysycenia
-        result = (img.astype(np.float32) / scalar).astype(np.uint8)
+        return PointLUT.divide_scalar(scalar).apply(img)
+    
+    @staticmethod
+    def evaluate_expression(expression, variables, saturation=True):
+        """
+        Wyrażenie arytmetyczne na obrazach i liczbach liczone jednym przebiegiem,
+        np. "abs(a - b) * 2 + 10" - bez pełnowymiarowych wyników pośrednich.
         
-        return result
\ No newline at end of file
+        Parametry:
+            expression: formuła (operatory + - * /, funkcje abs, min, max, floor, clip;
+                        clip(x) - jawne wysycenie wyniku pośredniego)
+            variables: słownik nazwa -> obraz numpy.ndarray lub liczba
+            saturation: True (obcięcie wyniku do 0-255) / False (normalizacja do 0-255)
+        
+        Zwraca:
+            obraz uint8
+        """
+        return ImageExpression(expression).evaluate(variables, saturation)
\ No newline at end of file
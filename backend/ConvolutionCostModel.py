@@ -0,0 +1,218 @@
+"""
+Model kosztu konwolucji - szacuje czas metod bezpośredniej, separowalnej i FFT
+dla danego rozmiaru obrazu i maski, żeby wybrać najszybszą.
+
+Współczynniki są mierzone na danym komputerze (calibrate) i zapisywane lokalnie
+w pliku JSON; bez kalibracji używane są wartości domyślne.
+"""
+
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Plik z wynikami kalibracji (katalog domowy użytkownika)
+COST_MODEL_PATH = os.path.join(os.path.expanduser("~"), ".apo", "convolution_cost_model.json")
+
+COST_MODEL_VERSION = 1
+
+# Rozmiary masek, dla których mierzone są współczynniki
+CALIBRATION_KERNEL_SIZES = [3, 5, 7, 9, 11, 15, 21, 31, 51]
+
+# Współczynniki domyślne [ns] (zmierzone na typowym komputerze, 1 wątek):
+#   direct      - na piksel (cv2.filter2D; dla dużych masek OpenCV sam przechodzi na DFT)
+#   direct_fill - na piksel i element maski ("Wypełnienie wyniku stałą", dokładne sumowanie)
+#   separable   - na piksel, element wektora i składnik rozkładu (cv2.sepFilter2D)
+#   fft         - na N * log2(N), N - liczba pikseli transformaty
+DEFAULT_COSTS = {
+    "kernel_sizes": CALIBRATION_KERNEL_SIZES,
+    "direct": [1.1, 2.6, 7.0, 7.3, 10.7, 76.0, 74.0, 64.0, 87.0],
+    "direct_fill": [3.9, 2.0, 1.8, 1.45, 1.36, 1.3, 1.3, 1.2, 1.2],
+    "separable": [0.63, 0.43, 0.32, 0.31, 0.3, 0.29, 0.28, 0.39, 0.42],
+    "fft": 2.3,
+}
+
+
+class ConvolutionCostModel:
+    """
+    Szacowanie czasu konwolucji (w sekundach) dla metod:
+        - "direct": maska 2-D (cv2.filter2D lub dokładne sumowanie dla
+          "Wypełnienie wyniku stałą")
+        - "separable": przebiegi 1-D dla każdego składnika rozkładu maski
+        - "fft": transformata Fouriera obrazu z ramką i maski
+    """
+
+    def __init__(self, costs=None):
+        costs = DEFAULT_COSTS if costs is None else costs
+        self.kernel_sizes = np.asarray(costs["kernel_sizes"], dtype=np.float64)
+        self.direct = np.asarray(costs["direct"], dtype=np.float64)
+        self.direct_fill = np.asarray(costs["direct_fill"], dtype=np.float64)
+        self.separable = np.asarray(costs["separable"], dtype=np.float64)
+        self.fft = float(costs["fft"])
+
+        for name in ("direct", "direct_fill", "separable"):
+            if len(getattr(self, name)) != len(self.kernel_sizes):
+                raise ValueError(f"Niepoprawny model kosztu: długość '{name}' różna od liczby rozmiarów masek")
+
+    # ==================== SZACOWANIE ====================
+
+    @staticmethod
+    def fft_shape(image_shape, kernel_shape):
+        """Rozmiar transformaty dla obrazu z ramką o szerokości połowy maski"""
+        height = image_shape[0] + kernel_shape[0] - 1
+        width = image_shape[1] + kernel_shape[1] - 1
+        return cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width)
+
+    def _per_unit(self, table, kernel_shape):
+        """Koszt jednostkowy dla rozmiaru maski (interpolacja, poza zakresem - wartość skrajna)"""
+        return np.interp(max(kernel_shape), self.kernel_sizes, table) * 1e-9
+
+    def estimate(self, method, image_shape, kernel_shape, rank=1, constant_fill=False):
+        """
+        Szacowany czas metody w sekundach.
+
+        Parametry:
+            method: "direct", "separable" lub "fft"
+            image_shape: (wysokość, szerokość) obrazu
+            kernel_shape: (wysokość, szerokość) maski
+            rank: liczba składników rozkładu (dla "separable")
+            constant_fill: True dla trybu "Wypełnienie wyniku stałą"
+        """
+        height, width = image_shape[:2]
+        kh, kw = kernel_shape
+        pixels = height * width
+
+        if method == "direct":
+            if constant_fill:
+                valid = max(height - kh + 1, 0) * max(width - kw + 1, 0)
+                return valid * kh * kw * self._per_unit(self.direct_fill, kernel_shape)
+            return pixels * self._per_unit(self.direct, kernel_shape)
+
+        if method == "separable":
+            return pixels * rank * (kh + kw) * self._per_unit(self.separable, kernel_shape)
+
+        if method == "fft":
+            fft_h, fft_w = self.fft_shape(image_shape, kernel_shape)
+            n = fft_h * fft_w
+            return n * np.log2(n) * self.fft * 1e-9
+
+        raise ValueError(f"Nieznana metoda konwolucji: {method}")
+
+    def choose(self, image_shape, kernel_shape, rank=None, constant_fill=False):
+        """
+        Najtańsza metoda wg modelu.
+
+        Parametry:
+            rank: rząd rozkładu maski lub None, jeśli maska nie jest separowalna
+
+        Zwraca:
+            nazwa metody ("direct", "separable" lub "fft")
+        """
+        costs = {
+            "direct": self.estimate("direct", image_shape, kernel_shape, constant_fill=constant_fill),
+            "fft": self.estimate("fft", image_shape, kernel_shape),
+        }
+        if rank is not None:
+            costs["separable"] = self.estimate("separable", image_shape, kernel_shape, rank)
+        return min(costs, key=costs.get)
+
+    # ==================== ZAPIS / ODCZYT ====================
+
+    def to_dict(self):
+        return {
+            "version": COST_MODEL_VERSION,
+            "kernel_sizes": [int(size) for size in self.kernel_sizes],
+            "direct": self.direct.tolist(),
+            "direct_fill": self.direct_fill.tolist(),
+            "separable": self.separable.tolist(),
+            "fft": self.fft,
+        }
+
+    def save(self, path=COST_MODEL_PATH):
+        """Zapisuje współczynniki do pliku JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path=COST_MODEL_PATH):
+        """
+        Model z pliku kalibracji; jeśli pliku nie ma lub jest nieaktualny/uszkodzony -
+        model z wartościami domyślnymi
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                costs = json.load(f)
+            if costs.get("version") != COST_MODEL_VERSION:
+                return cls()
+            return cls(costs)
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+
+    # ==================== KALIBRACJA ====================
+
+    @classmethod
+    def calibrate(cls, image_size=512, kernel_sizes=CALIBRATION_KERNEL_SIZES, repeats=3, path=COST_MODEL_PATH):
+        """
+        Mierzy współczynniki na tym komputerze i zapisuje je do pliku
+        (path=None - bez zapisu). Trwa kilka sekund.
+        """
+        rng = np.random.default_rng(0)
+        img = rng.random((image_size, image_size), dtype=np.float32) * 255
+        pixels = image_size * image_size
+
+        # Import lokalny - ConvolutionOperations importuje ten moduł
+        from backend.ConvolutionOperations import ConvolutionOperations
+
+        def best_time(func):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        direct, direct_fill, separable, fft = [], [], [], []
+        for size in kernel_sizes:
+            kernel = rng.random((size, size), dtype=np.float32)
+            vector = kernel[0]
+
+            t = best_time(lambda: cv2.filter2D(img, -1, kernel, borderType=cv2.BORDER_REFLECT))
+            direct.append(t / pixels * 1e9)
+
+            valid = (image_size - size + 1) ** 2
+            t = best_time(lambda: ConvolutionOperations._correlate_valid(img, kernel))
+            direct_fill.append(t / (valid * size * size) * 1e9)
+
+            t = best_time(lambda: cv2.sepFilter2D(img, -1, vector, vector, borderType=cv2.BORDER_REFLECT))
+            separable.append(t / (pixels * 2 * size) * 1e9)
+
+            fft_h, fft_w = cls.fft_shape(img.shape, kernel.shape)
+            n = fft_h * fft_w
+            t = best_time(lambda: ConvolutionOperations._fft_correlate_valid(
+                cv2.copyMakeBorder(img, size // 2, size // 2, size // 2, size // 2, cv2.BORDER_REFLECT),
+                kernel
+            ))
+            fft.append(t / (n * np.log2(n)) * 1e9)
+
+        model = cls({
+            "kernel_sizes": list(kernel_sizes),
+            "direct": direct,
+            "direct_fill": direct_fill,
+            "separable": separable,
+            "fft": float(np.median(fft)),
+        })
+        if path is not None:
+            model.save(path)
+        return model
+
+
+if __name__ == "__main__":
+    # Kalibracja z linii poleceń: python -m backend.ConvolutionCostModel
+    calibrated = ConvolutionCostModel.calibrate()
+    print(f"Zapisano model kosztu konwolucji: {COST_MODEL_PATH}")
+    print(json.dumps(calibrated.to_dict(), indent=2))
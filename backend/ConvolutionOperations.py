@@ -1,6 +1,51 @@
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from backend.ConvolutionCostModel import ConvolutionCostModel
+
+# Liczba pikseli bloku przy normalizacji wyniku - tymczasowe tablice mają rozmiar
+# bloku, a nie całego obrazu
+NORMALIZE_BLOCK_PIXELS = 1 << 16
+
+# Konwolucja kafelkowa: obrazy od CONVOLUTION_TILED_MIN_PIXELS pikseli są dzielone
+# na pasy wierszy po ok. CONVOLUTION_TILE_PIXELS pikseli (z zakładką o promieniu
+# maski) liczone równolegle; mniejsze obrazy - w całości
+CONVOLUTION_TILED_MIN_PIXELS = 1 << 20
+CONVOLUTION_TILE_PIXELS = 1 << 18
+
+# Maski o co najmniej tylu elementach cv2.filter2D liczy przez DFT całego obrazu -
+# wynik zależy wtedy od rozmiaru obrazu, więc takich masek nie dzielimy na pasy
+FILTER2D_DFT_KERNEL_AREA = 130
+
+# Wynik konwolucji w zakresie [-RESULT_RANGE_TOLERANCE, 255 + RESULT_RANGE_TOLERANCE]
+# jest tylko obcinany do 0-255 - błędy zaokrągleń float (DFT, przebiegi 1-D) tuż
+# poza zakresem nie mogą wymuszać normalizacji całego obrazu
+RESULT_RANGE_TOLERANCE = 0.5
+
+# Rozkład maski na sumę iloczynów wektorów (kolumna x wiersz) - każdy składnik
+# to dwa przebiegi 1-D zamiast jednej konwolucji 2-D
+KernelDecomposition = namedtuple('KernelDecomposition', ['separable', 'rank', 'columns', 'rows', 'max_error'])
+
+# Maska znormalizowana zapisana jako wagi całkowite / wspólny dzielnik
+# (np. maska Gaussa 3x3 = [[1, 2, 1], [2, 5, 2], [1, 2, 1]] / 17)
+FixedPointKernel = namedtuple('FixedPointKernel', ['weights', 'divisor'])
+
+# Największy dzielnik (i waga najmniejszego elementu) szukane dla masek całkowitych
+FIXED_POINT_MAX_DIVISOR = 1 << 16
+FIXED_POINT_MAX_WEIGHT = 255
+
+# Maska przygotowana raz do wielokrotnego użycia: tablica w postaci podawanej
+# do cv2 (ciągła, float32 dla masek predefiniowanych), zapis całkowity
+# (FixedPointKernel lub None) i rozkład na przebiegi 1-D (KernelDecomposition)
+PreparedKernel = namedtuple('PreparedKernel', ['kernel', 'fixed', 'decomposition'])
+
+# Liczba ostatnio używanych własnych masek pamiętanych przez instancję
+PREPARED_KERNEL_CACHE_SIZE = 16
+
 
 class ConvolutionOperations:
     """
@@ -122,11 +167,75 @@ class ConvolutionOperations:
         "Wypełnienie wyniku stałą": None  # Specjalna obsługa
     }
     
-    def __init__(self):
-        pass
+    # Metody konwolucji dla własnej maski ("auto" - wybór wg modelu kosztu)
+    CONVOLUTION_METHODS = ["auto", "direct", "separable", "fft"]
+    
+    def __init__(self, workers=None, tile_pixels=CONVOLUTION_TILE_PIXELS):
+        """
+        Args:
+            workers: Liczba wątków konwolucji kafelkowej; None - liczba procesorów,
+                     1 - pasy liczone sekwencyjnie
+            tile_pixels: Przybliżona liczba pikseli jednego pasa wierszy
+        """
+        self.workers = workers
+        self.tile_pixels = tile_pixels
+        self._cost_model = None
+        
+        # Bank masek predefiniowanych - typ, zapis całkowity i rozkład liczone
+        # raz dla instancji, nie przy każdym podglądzie w dialogu
+        self._kernel_bank = {}
+        for masks in (self.SMOOTHING_MASKS, self.LAPLACIAN_MASKS, self.PREWITT_MASKS,
+                      {"Sobel X": self.SOBEL_X, "Sobel Y": self.SOBEL_Y}):
+            for name, kernel in masks.items():
+                self._kernel_bank[name] = self._prepare(np.ascontiguousarray(kernel, dtype=np.float32))
+        
+        # Ostatnio używane własne maski (klucz: typ, kształt i zawartość maski)
+        self._prepared_kernels = OrderedDict()
+    
+    @property
+    def cost_model(self):
+        """Model kosztu metod konwolucji (wczytywany przy pierwszym użyciu)"""
+        if self._cost_model is None:
+            self._cost_model = ConvolutionCostModel.load()
+        return self._cost_model
     
     # ==================== METODY POMOCNICZE ====================
     
+    def _prepare(self, kernel, tolerance=None):
+        """Maska z zapisem całkowitym i rozkładem na przebiegi 1-D"""
+        if tolerance is None:
+            tolerance = self.CUSTOM_MASK_TOLERANCE
+        return PreparedKernel(kernel, self.fixed_point_kernel(kernel), self.decompose_kernel(kernel, tolerance))
+    
+    def prepare_kernel(self, kernel, tolerance=None):
+        """
+        Przygotowana maska (PreparedKernel) - dla masek predefiniowanych z banku,
+        dla własnych z pamięci ostatnio używanych masek (rozkład SVD i zapis
+        całkowity liczone tylko przy pierwszym użyciu danej maski)
+        
+        Args:
+            kernel: Nazwa maski predefiniowanej albo maska (numpy array 2D)
+            tolerance: Dopuszczalny błąd rozkładu maski (domyślnie CUSTOM_MASK_TOLERANCE)
+        """
+        if isinstance(kernel, str):
+            if kernel not in self._kernel_bank:
+                raise ValueError(f"Nieznana maska: {kernel}")
+            return self._kernel_bank[kernel]
+        
+        if tolerance is None:
+            tolerance = self.CUSTOM_MASK_TOLERANCE
+        kernel = np.ascontiguousarray(kernel)
+        key = (kernel.dtype.str, kernel.shape, kernel.tobytes(), tolerance)
+        prepared = self._prepared_kernels.get(key)
+        if prepared is None:
+            prepared = self._prepare(kernel, tolerance)
+            self._prepared_kernels[key] = prepared
+            if len(self._prepared_kernels) > PREPARED_KERNEL_CACHE_SIZE:
+                self._prepared_kernels.popitem(last=False)
+        else:
+            self._prepared_kernels.move_to_end(key)
+        return prepared
+    
     @staticmethod
     def _validate_image(img):
         """Sprawdza czy obraz jest monochromatyczny"""
@@ -138,16 +247,271 @@ class ConvolutionOperations:
     
     @staticmethod
     def _normalize_result(img):
-        """Normalizuje wynik do zakresu 0-255"""
+        """
+        Normalizuje wynik do zakresu 0-255
+        
+        Po wyznaczeniu min/max wynik jest zapisywany blokami wierszy prosto
+        do obrazu uint8 - bez pełnowymiarowych tablic pośrednich.
+        """
         img_min = np.min(img)
         img_max = np.max(img)
         
         if img_max - img_min == 0:
             return np.zeros_like(img, dtype=np.uint8)
         
-        normalized = ((img - img_min) / (img_max - img_min) * 255).astype(np.uint8)
+        normalized = np.empty(img.shape, dtype=np.uint8)
+        rows = max(1, NORMALIZE_BLOCK_PIXELS // max(img.shape[1], 1))
+        for top in range(0, img.shape[0], rows):
+            block = img[top:top + rows]
+            normalized[top:top + rows] = (block - img_min) / (img_max - img_min) * 255
         return normalized
     
+    def _finish_result(self, result):
+        """
+        Zamiana wyniku konwolucji float na obraz uint8 - wynik poza zakresem 0-255
+        (z tolerancją RESULT_RANGE_TOLERANCE) jest normalizowany, w zakresie obcinany
+        do 0-255 i zaokrąglany w dół (jak dzielenie całkowite w _fixed_point_valid).
+        Ten sam krok dla wszystkich metod, więc szum numeryczny jednej z nich
+        nie zmienia sposobu odwzorowania wyniku.
+        """
+        if np.min(result) < -RESULT_RANGE_TOLERANCE or np.max(result) > 255 + RESULT_RANGE_TOLERANCE:
+            return self._normalize_result(result)
+        return np.clip(result, 0, 255).astype(np.uint8)
+    
+    @staticmethod
+    def _correlate_valid(img, kernel):
+        """
+        Korelacja obrazu z maską tylko dla pozycji, w których maska mieści się
+        w całości w obrazie (wynik mniejszy o rozmiar maski - 1).
+        
+        Zamiast pętli po pikselach liczone są całe obrazy iloczynów obrazu
+        przesuniętego o (dy, dx) i wagi maski. Iloczyny są sumowane w tej samej
+        kolejności, w jakiej np.sum sumuje elementy maski (sumowanie parami),
+        więc wynik jest identyczny co do bitu z np.sum(roi * kernel) dla
+        każdego piksela.
+        """
+        kh, kw = kernel.shape
+        h, w = img.shape
+        out_h, out_w = h - kh + 1, w - kw + 1
+        
+        img_float = img.astype(np.float32)
+        weights = kernel.astype(np.result_type(np.float32, kernel.dtype)).ravel()
+        
+        def term(k):
+            dy, dx = divmod(k, kw)
+            return img_float[dy:dy + out_h, dx:dx + out_w] * weights[k]
+        
+        result = ConvolutionOperations._pairwise_sum(term, 0, kh * kw)
+        return result.astype(np.float32, copy=False)
+    
+    @staticmethod
+    def _pairwise_sum(term, start, count):
+        """
+        Suma składników term(start) ... term(start + count - 1) w kolejności
+        sumowania parami z numpy (8 sum częściowych, podział na połowy
+        powyżej 128 elementów).
+        """
+        if count < 8:
+            total = term(start)
+            for k in range(start + 1, start + count):
+                total += term(k)
+            return total
+        
+        if count <= 128:
+            partial = [term(start + j) for j in range(8)]
+            k = 8
+            while k < count - count % 8:
+                for j in range(8):
+                    partial[j] += term(start + k + j)
+                k += 8
+            total = ((partial[0] + partial[1]) + (partial[2] + partial[3])) + \
+                    ((partial[4] + partial[5]) + (partial[6] + partial[7]))
+            for k in range(start + k, start + count):
+                total += term(k)
+            return total
+        
+        half = count // 2
+        half -= half % 8
+        return ConvolutionOperations._pairwise_sum(term, start, half) + \
+            ConvolutionOperations._pairwise_sum(term, start + half, count - half)
+    
+    @staticmethod
+    def _filter2d_valid(img_float, kernel):
+        """Wynik cv2.filter2D tylko dla pozycji, w których maska mieści się w obrazie"""
+        pad_y, pad_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        h, w = img_float.shape
+        result = cv2.filter2D(
+            src=img_float,
+            ddepth=-1,
+            kernel=kernel,
+            anchor=(-1, -1),
+            borderType=cv2.BORDER_ISOLATED
+        )
+        return result[pad_y:h - pad_y, pad_x:w - pad_x]
+    
+    def _use_tiles(self, img, kernel_shape):
+        """Czy obraz liczyć pasami wierszy (duży obraz, większy od maski)"""
+        h, w = img.shape
+        return img.size >= CONVOLUTION_TILED_MIN_PIXELS and h > kernel_shape[0] and w > kernel_shape[1]
+    
+    def _run_tiled(self, img, pad_y, pad_x, border_type, border_value, valid_filter, dtype=np.float32,
+                   result_dtype=None):
+        """
+        Konwolucja pasami wierszy z zakładką o promieniu maski, w wielu wątkach.
+        
+        Każdy pas dostaje dokładnie te wiersze (z ramką), które widziałaby
+        konwolucja całego obrazu: wewnątrz obrazu zakładkę tworzą sąsiednie
+        wiersze, na górnym i dolnym brzegu - ramka wg typu brzegu. Wynik pasa
+        trafia do zaalokowanej z góry tablicy wyniku; pasy się nie nakładają,
+        więc wątki nie wymagają synchronizacji, a w pamięci są naraz tylko
+        pasy liczone w danej chwili.
+        
+        Args:
+            img: Obraz wejściowy
+            pad_y, pad_x: Promień maski
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT / wypełnienia
+            valid_filter: Funkcja (pas z ramką) -> wynik pasa bez ramki
+            dtype: Typ pasów (float32; uint8 dla arytmetyki całkowitej)
+            result_dtype: Typ wyniku (domyślnie jak pasów)
+        
+        Returns:
+            Wynik o rozmiarze obrazu
+        """
+        h, w = img.shape
+        result = np.empty((h, w), dtype=dtype if result_dtype is None else result_dtype)
+        
+        if border_type == "Wypełnienie wyniku stałą":
+            # Wynik tylko we wnętrzu obrazu, pas brzegowy wypełniony stałą
+            result[:pad_y] = border_value
+            result[h - pad_y:] = border_value
+            result[:, :pad_x] = border_value
+            result[:, w - pad_x:] = border_value
+            out_h, offset, columns = h - 2 * pad_y, pad_y, slice(pad_x, w - pad_x)
+            
+            def band(top, bottom):
+                return np.asarray(img[top:bottom + 2 * pad_y], dtype=dtype)
+        else:
+            border = self.BORDER_TYPES[border_type]
+            out_h, offset, columns = h, 0, slice(None)
+            
+            def band(top, bottom):
+                first, last = max(top - pad_y, 0), min(bottom + pad_y, h)
+                return cv2.copyMakeBorder(
+                    src=np.asarray(img[first:last], dtype=dtype),
+                    top=first - (top - pad_y),
+                    bottom=bottom + pad_y - last,
+                    left=pad_x,
+                    right=pad_x,
+                    borderType=border,
+                    value=float(border_value)
+                )
+        
+        # Pas co najmniej 4 razy wyższy od promienia - zakładki to najwyżej
+        # połowa pracy także dla dużych masek
+        rows = max(1, self.tile_pixels // max(w, 1), 4 * pad_y)
+        
+        def process(top):
+            bottom = min(top + rows, out_h)
+            result[offset + top:offset + bottom, columns] = valid_filter(band(top, bottom))
+        
+        tops = range(0, out_h, rows)
+        workers = self.workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(tops) == 1:
+            for top in tops:
+                process(top)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(process, tops))
+        
+        return result
+    
+    @staticmethod
+    def _fft_correlate_valid(img, kernel):
+        """
+        Korelacja obrazu z maską przez transformatę Fouriera - tylko pozycje,
+        w których maska mieści się w obrazie (jak _correlate_valid).
+        
+        Iloczyn widma obrazu i sprzężonego widma maski daje korelację
+        cykliczną; dla pozycji "valid" indeksy nie zawijają się, więc
+        transformata może mieć rozmiar obrazu (zaokrąglony w górę do
+        rozmiaru szybkiego dla DFT). Koszt nie zależy od rozmiaru maski.
+        Wynik ma szum zaokrągleń float32 także tam, gdzie dokładna wartość
+        wynosi 0 (np. -3e-5) - zakres ocenia _finish_result z tolerancją.
+        """
+        h, w = img.shape
+        kh, kw = kernel.shape
+        out_h, out_w = h - kh + 1, w - kw + 1
+        fft_h, fft_w = cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w)
+        
+        img_padded = np.zeros((fft_h, fft_w), dtype=np.float32)
+        img_padded[:h, :w] = img
+        kernel_padded = np.zeros((fft_h, fft_w), dtype=np.float32)
+        kernel_padded[:kh, :kw] = kernel
+        
+        img_spectrum = cv2.dft(img_padded, nonzeroRows=h)
+        kernel_spectrum = cv2.dft(kernel_padded, nonzeroRows=kh)
+        spectrum = cv2.mulSpectrums(img_spectrum, kernel_spectrum, 0, conjB=True)
+        result = cv2.dft(
+            spectrum,
+            flags=cv2.DFT_INVERSE | cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT,
+            nonzeroRows=out_h
+        )
+        return result[:out_h, :out_w]
+    
+    def _apply_fft_with_border(self, img, kernel, border_type, border_value):
+        """
+        Odpowiednik _apply_convolution_with_border liczony przez FFT - obraz
+        dostaje jawną ramkę (odbicie lub stała), z której liczony jest
+        wynik "valid" o rozmiarze obrazu
+        """
+        pad_y, pad_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        img_float = img.astype(np.float32)
+        
+        # Obsługa "Wypełnienie wyniku stałą"
+        if border_type == "Wypełnienie wyniku stałą":
+            result = np.full_like(img, border_value, dtype=np.float32)
+            h, w = img.shape
+            if h > 2 * pad_y and w > 2 * pad_x:
+                result[pad_y:h - pad_y, pad_x:w - pad_x] = self._fft_correlate_valid(img_float, kernel)
+            return result
+        
+        border = self.BORDER_TYPES[border_type]
+        padded = cv2.copyMakeBorder(
+            src=img_float,
+            top=pad_y,
+            bottom=pad_y,
+            left=pad_x,
+            right=pad_x,
+            borderType=border,
+            value=float(border_value)
+        )
+        return self._fft_correlate_valid(padded, kernel)
+    
+    def choose_convolution_method(self, image_shape, kernel, border_type="BORDER_REFLECT",
+                                  tolerance=None):
+        """
+        Wybiera metodę konwolucji (direct, separable lub fft) wg modelu kosztu
+        
+        Args:
+            image_shape: Rozmiar obrazu (wysokość, szerokość)
+            kernel: Maska konwolucji
+            border_type: Typ brzegu
+            tolerance: Dopuszczalny błąd rozkładu maski (domyślnie CUSTOM_MASK_TOLERANCE)
+        
+        Returns:
+            (metoda, rozkład maski - KernelDecomposition)
+        """
+        decomposition = self.prepare_kernel(kernel, tolerance).decomposition
+        rank = decomposition.rank if decomposition.separable else None
+        method = self.cost_model.choose(
+            image_shape, kernel.shape, rank,
+            constant_fill=(border_type == "Wypełnienie wyniku stałą")
+        )
+        return method, decomposition
+    
     def _apply_convolution_with_border(self, img, kernel, border_type, border_value):
         """
         Wspólna metoda do stosowania konwolucji z obsługą brzegów
@@ -161,17 +525,26 @@ class ConvolutionOperations:
         Returns:
             Przetworzony obraz
         """
+        pad_y, pad_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        
+        # Duże obrazy - pasami wierszy w wielu wątkach (wynik identyczny)
+        if self._use_tiles(img, kernel.shape):
+            if border_type == "Wypełnienie wyniku stałą":
+                return self._run_tiled(img, pad_y, pad_x, border_type, border_value,
+                                       lambda band: self._correlate_valid(band, kernel))
+            if kernel.size < FILTER2D_DFT_KERNEL_AREA:
+                return self._run_tiled(img, pad_y, pad_x, border_type, border_value,
+                                       lambda band: self._filter2d_valid(band, kernel))
+        
         # Obsługa "Wypełnienie wyniku stałą"
         if border_type == "Wypełnienie wyniku stałą":
             result = np.full_like(img, border_value, dtype=np.float32)
             
-            pad = kernel.shape[0] // 2
+            # Konwolucja tylko w obszarze, gdzie maska mieści się w obrazie;
+            # pas brzegowy zostaje wypełniony stałą
             h, w = img.shape
-            
-            for i in range(pad, h - pad):
-                for j in range(pad, w - pad):
-                    roi = img[i-pad:i+pad+1, j-pad:j+pad+1].astype(np.float32)
-                    result[i, j] = np.sum(roi * kernel)
+            if h > 2 * pad_y and w > 2 * pad_x:
+                result[pad_y:h - pad_y, pad_x:w - pad_x] = self._correlate_valid(img, kernel)
             
             return result
         else:
@@ -211,6 +584,138 @@ class ConvolutionOperations:
             
             return result.astype(np.float32)
     
+    # ==================== ARYTMETYKA CAŁKOWITA ====================
+    
+    @staticmethod
+    def fixed_point_kernel(kernel):
+        """
+        Zapis maski jako nieujemnych wag całkowitych i wspólnego dzielnika
+        równego sumie wag (maska znormalizowana, np. SMOOTHING_MASKS).
+        
+        Args:
+            kernel: Maska konwolucji (numpy array 2D)
+        
+        Returns:
+            FixedPointKernel(weights, divisor) - wagi int32 i dzielnik,
+            albo None, jeśli maska nie ma takiej postaci
+        """
+        kernel = np.asarray(kernel, dtype=np.float64)
+        if kernel.ndim != 2 or not np.all(np.isfinite(kernel)) or np.any(kernel < 0) \
+                or not np.any(kernel > 0):
+            return None
+        
+        # Dzielnik = waga najmniejszego elementu / jego wartość; wagi float32
+        # są zaokrąglone względnie o ~6e-8, stąd tolerancja zależna od dzielnika
+        smallest = kernel[kernel > 0].min()
+        for weight in range(1, FIXED_POINT_MAX_WEIGHT + 1):
+            divisor = int(round(weight / smallest))
+            if divisor > FIXED_POINT_MAX_DIVISOR:
+                return None
+            scaled = kernel * divisor
+            weights = np.rint(scaled)
+            if weights.sum() == divisor and np.all(np.abs(scaled - weights) <= 1e-6 * divisor):
+                return FixedPointKernel(weights.astype(np.int32), divisor)
+        return None
+    
+    @staticmethod
+    def _fixed_point_valid(img, fixed):
+        """
+        Konwolucja obrazu uint8 wagami całkowitymi, tylko dla pozycji, w których
+        maska mieści się w obrazie, z dzieleniem całkowitym przez dzielnik -
+        zaokrąglenie w dół, jak rzutowanie wyniku float na uint8 w pozostałych
+        metodach.
+        
+        Suma ważona mieści się w int16 dla dzielnika do 128 (255 * 128)
+        i liczy ją wtedy cv2.filter2D prosto z obrazu uint8; większe dzielniki
+        sumowane są w int32. Wynik jest dokładny - bez błędów zaokrągleń float.
+        """
+        kh, kw = fixed.weights.shape
+        h, w = img.shape
+        out_h, out_w = h - kh + 1, w - kw + 1
+        divisor = fixed.divisor
+        
+        if 255 * divisor <= np.iinfo(np.int16).max \
+                and fixed.weights.size < FILTER2D_DFT_KERNEL_AREA:
+            acc = cv2.filter2D(
+                src=img,
+                ddepth=cv2.CV_16S,
+                kernel=fixed.weights.astype(np.float32),
+                anchor=(-1, -1),
+                borderType=cv2.BORDER_ISOLATED
+            )
+            top, left = kh // 2, kw // 2
+        else:
+            acc = np.zeros((out_h, out_w), dtype=np.int32)
+            for (dy, dx), weight in np.ndenumerate(fixed.weights):
+                if weight:
+                    acc += img[dy:dy + out_h, dx:dx + out_w] * np.int32(weight)
+            top, left = 0, 0
+        
+        # Dzielenie na całej (ciągłej) tablicy, wycięcie wyniku dopiero na końcu
+        np.floor_divide(acc, divisor, out=acc)
+        return acc[top:top + out_h, left:left + out_w].astype(np.uint8)
+    
+    @staticmethod
+    def _divide_rounded(acc, divisor):
+        """Dzielenie całkowite (w miejscu) z zaokrągleniem do najbliższej wartości"""
+        acc += divisor // 2
+        np.floor_divide(acc, divisor, out=acc)
+        return acc
+    
+    @staticmethod
+    def _is_uint8_value(value):
+        """Czy wartość jest poziomem jasności obrazu uint8 (liczba całkowita 0-255)"""
+        return float(value).is_integer() and 0 <= value <= 255
+    
+    def _can_use_fixed_point(self, img, fixed, border_value):
+        """Czy konwolucję można liczyć w arytmetyce całkowitej"""
+        return fixed is not None and img.dtype == np.uint8 and self._is_uint8_value(border_value)
+    
+    def _apply_fixed_point_with_border(self, img, fixed, border_type, border_value):
+        """
+        Odpowiednik _apply_convolution_with_border w arytmetyce całkowitej -
+        obraz uint8 z ramką, bez kopii float32; wynik od razu uint8
+        """
+        pad_y, pad_x = fixed.weights.shape[0] // 2, fixed.weights.shape[1] // 2
+        return self._apply_uint8_with_border(img, pad_y, pad_x, border_type, border_value,
+                                             lambda band: self._fixed_point_valid(band, fixed))
+    
+    def _apply_uint8_with_border(self, img, pad_y, pad_x, border_type, border_value, valid_filter):
+        """
+        Filtr liczony w całości na obrazach uint8 z obsługą brzegów
+        
+        Args:
+            img: Obraz wejściowy (uint8)
+            pad_y, pad_x: Promień filtru
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT (liczba całkowita 0-255)
+            valid_filter: Funkcja (obraz uint8 z ramką) -> wynik uint8 bez ramki
+        
+        Returns:
+            Przefiltrowany obraz uint8
+        """
+        if self._use_tiles(img, (2 * pad_y + 1, 2 * pad_x + 1)):
+            return self._run_tiled(img, pad_y, pad_x, border_type, border_value, valid_filter, dtype=np.uint8)
+        
+        # Obsługa "Wypełnienie wyniku stałą"
+        if border_type == "Wypełnienie wyniku stałą":
+            result = np.full_like(img, border_value, dtype=np.uint8)
+            h, w = img.shape
+            if h > 2 * pad_y and w > 2 * pad_x:
+                result[pad_y:h - pad_y, pad_x:w - pad_x] = valid_filter(img)
+            return result
+        
+        padded = cv2.copyMakeBorder(
+            src=img,
+            top=pad_y,
+            bottom=pad_y,
+            left=pad_x,
+            right=pad_x,
+            borderType=self.BORDER_TYPES[border_type],
+            value=float(border_value)
+        )
+        return valid_filter(padded)
+    
     # ==================== WYGŁADZANIE LINIOWE ====================
     
     def apply_smoothing(self, img, mask_name, border_type="BORDER_REFLECT", border_value=0):
@@ -231,11 +736,202 @@ class ConvolutionOperations:
         if mask_name not in self.SMOOTHING_MASKS:
             raise ValueError(f"Nieznana maska: {mask_name}")
         
-        kernel = self.SMOOTHING_MASKS[mask_name]
-        result = self._apply_convolution_with_border(img, kernel, border_type, border_value)
+        prepared = self._kernel_bank[mask_name]
+        
+        # Maski wygładzające to wagi całkowite / 5 lub 17 - arytmetyka całkowita
+        # (wynik jak dla konwolucji float rzutowanej na uint8)
+        if self._can_use_fixed_point(img, prepared.fixed, border_value):
+            return self._apply_fixed_point_with_border(img, prepared.fixed, border_type, border_value)
+        
+        result = self._apply_convolution_with_border(img, prepared.kernel, border_type, border_value)
         
         return result.astype(np.uint8)
     
+    # ==================== WYGŁADZANIE O DOWOLNYM ROZMIARZE ====================
+    
+    # Wygładzanie z parametrem (oprócz masek 3x3 z SMOOTHING_MASKS)
+    GAUSSIAN_SMOOTHING = "Filtr Gaussa (dowolna sigma)"
+    BOX_SMOOTHING = "Uśrednienie (dowolny promień)"
+    
+    GAUSSIAN_SIGMA_MIN = 0.5
+    GAUSSIAN_SIGMA_MAX = 100.0
+    BOX_RADIUS_MAX = 500
+    
+    # Promień maski Gaussa (obcięcie) w wielokrotnościach sigmy - szerokość
+    # pasa brzegowego dla "Wypełnienie wyniku stałą"
+    GAUSSIAN_RADIUS_SIGMAS = 4
+    
+    # Od tej sigmy filtr Gaussa liczony jest rekursywnie - koszt nie zależy od
+    # sigmy; dla mniejszych maska separowalna jest szybsza i dokładniejsza
+    GAUSSIAN_RECURSIVE_MIN_SIGMA = 10.0
+    
+    @classmethod
+    def gaussian_radius(cls, sigma):
+        """Promień maski Gaussa dla danej sigmy"""
+        return int(np.ceil(cls.GAUSSIAN_RADIUS_SIGMAS * sigma))
+    
+    @staticmethod
+    def _recursive_gaussian_coefficients(sigma):
+        """
+        Współczynniki rekursywnego filtru Gaussa 3. rzędu (Young, van Vliet 1995):
+        w[n] = B * x[n] + a1 * w[n-1] + a2 * w[n-2] + a3 * w[n-3]
+        
+        Returns:
+            (B, a1, a2, a3)
+        """
+        if sigma >= 2.5:
+            q = 0.98711 * sigma - 0.96330
+        else:
+            q = 3.97156 - 4.14554 * np.sqrt(1 - 0.26891 * sigma)
+        b0 = 1.57825 + 2.44413 * q + 1.4281 * q ** 2 + 0.422205 * q ** 3
+        b1 = 2.44413 * q + 2.85619 * q ** 2 + 1.26661 * q ** 3
+        b2 = -(1.4281 * q ** 2 + 1.26661 * q ** 3)
+        b3 = 0.422205 * q ** 3
+        return 1 - (b1 + b2 + b3) / b0, b1 / b0, b2 / b0, b3 / b0
+    
+    @staticmethod
+    def _recursive_filter_rows(data, coefficients):
+        """
+        Rekursywny filtr Gaussa wzdłuż osi 0 (w miejscu): przebieg w przód
+        i w tył, każdy krok to operacje na całym wierszu. Początkowe wartości
+        rekursji równe pierwszej próbce (stan ustalony dla stałego sygnału).
+        """
+        scale, a1, a2, a3 = coefficients
+        tmp = np.empty_like(data[0])
+        for rows in (data, data[::-1]):
+            prev1 = prev2 = prev3 = rows[0].copy()
+            rows *= scale
+            for row in rows:
+                np.multiply(prev1, a1, out=tmp)
+                row += tmp
+                np.multiply(prev2, a2, out=tmp)
+                row += tmp
+                np.multiply(prev3, a3, out=tmp)
+                row += tmp
+                prev3, prev2, prev1 = prev2, prev1, row
+        return data
+    
+    def _apply_recursive_gaussian_with_border(self, img, sigma, border_type, border_value):
+        """
+        Filtr Gaussa liczony rekursywnie (IIR) - stały koszt na piksel.
+        
+        Obraz dostaje ramkę o szerokości promienia maski wg typu brzegu, więc
+        rekursja zaczyna się daleko od obrazu. Obliczenia w float64 - we float32
+        błąd rekursji rośnie z sigmą (do ~1 poziomu jasności dla sigma = 40).
+        Dla "Wypełnienie wyniku stałą" wnętrze liczone jest z ramką replikującą
+        brzeg (odpowiedź IIR nie ma skończonego zasięgu; wpływ ramki na
+        piksele odległe o promień maski jest pomijalny).
+        """
+        h, w = img.shape
+        radius = self.gaussian_radius(sigma)
+        constant_fill = border_type == "Wypełnienie wyniku stałą"
+        border = cv2.BORDER_REPLICATE if constant_fill else self.BORDER_TYPES[border_type]
+        
+        padded = cv2.copyMakeBorder(
+            src=img.astype(np.float64),
+            top=radius,
+            bottom=radius,
+            left=radius,
+            right=radius,
+            borderType=border,
+            value=float(border_value)
+        )
+        coefficients = self._recursive_gaussian_coefficients(sigma)
+        
+        # Przebieg pionowy, potem poziomy na transpozycji - wiersze obrazu
+        # wyjściowego z przebiegu pionowego wystarczą
+        self._recursive_filter_rows(padded, coefficients)
+        columns = np.ascontiguousarray(padded[radius:radius + h].T)
+        self._recursive_filter_rows(columns, coefficients)
+        result = columns[radius:radius + w].T
+        
+        if constant_fill:
+            filled = np.full((h, w), border_value, dtype=np.float64)
+            if h > 2 * radius and w > 2 * radius:
+                filled[radius:h - radius, radius:w - radius] = result[radius:h - radius, radius:w - radius]
+            return filled
+        return result
+    
+    def apply_gaussian_smoothing(self, img, sigma, border_type="BORDER_REFLECT", border_value=0):
+        """
+        Filtr Gaussa o dowolnej sigmie
+        
+        Małe sigmy - maska separowalna o promieniu GAUSSIAN_RADIUS_SIGMAS * sigma;
+        od GAUSSIAN_RECURSIVE_MIN_SIGMA - filtr rekursywny, którego koszt nie
+        zależy od sigmy (przybliżenie Gaussa - błąd rzędu 1% kontrastu
+        krawędzi, zwykle poniżej 1 poziomu jasności).
+        
+        Args:
+            img: Obraz wejściowy (grayscale)
+            sigma: Odchylenie standardowe (GAUSSIAN_SIGMA_MIN - GAUSSIAN_SIGMA_MAX)
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT
+        
+        Returns:
+            Wygładzony obraz uint8
+        """
+        self._validate_image(img)
+        
+        if not self.GAUSSIAN_SIGMA_MIN <= sigma <= self.GAUSSIAN_SIGMA_MAX:
+            raise ValueError(f"Sigma musi być w zakresie {self.GAUSSIAN_SIGMA_MIN:g}-{self.GAUSSIAN_SIGMA_MAX:g}")
+        
+        if sigma >= self.GAUSSIAN_RECURSIVE_MIN_SIGMA:
+            result = self._apply_recursive_gaussian_with_border(img, sigma, border_type, border_value)
+        else:
+            size = 2 * self.gaussian_radius(sigma) + 1
+            vector = cv2.getGaussianKernel(size, sigma, cv2.CV_32F).ravel()
+            decomposition = KernelDecomposition(True, 1, [vector], [vector], 0.0)
+            result = self._apply_separable_with_border(img, decomposition, border_type, border_value)
+        
+        return np.clip(np.rint(result), 0, 255).astype(np.uint8)
+    
+    @staticmethod
+    def _box_mean_valid(img, size):
+        """
+        Średnia w oknie size x size (tylko pozycje, w których okno mieści się
+        w obrazie) z sum bieżących cv2.boxFilter - stały koszt na piksel,
+        suma int32 i dzielenie z zaokrągleniem do najbliższej wartości
+        """
+        acc = cv2.boxFilter(
+            src=img,
+            ddepth=cv2.CV_32S,
+            ksize=(size, size),
+            anchor=(-1, -1),
+            normalize=False,
+            borderType=cv2.BORDER_ISOLATED
+        )
+        ConvolutionOperations._divide_rounded(acc, size * size)
+        pad = size // 2
+        h, w = img.shape
+        return acc[pad:h - pad, pad:w - pad].astype(np.uint8)
+    
+    def apply_box_smoothing(self, img, radius, border_type="BORDER_REFLECT", border_value=0):
+        """
+        Uśrednienie w kwadratowym oknie o dowolnym promieniu
+        
+        Args:
+            img: Obraz wejściowy (grayscale, uint8)
+            radius: Promień okna (okno (2 * radius + 1) x (2 * radius + 1))
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT (0-255)
+        
+        Returns:
+            Wygładzony obraz uint8
+        """
+        self._validate_image(img)
+        
+        if img.dtype != np.uint8:
+            raise ValueError("Obraz musi być 8-bitowy (uint8)")
+        if int(radius) != radius or not 1 <= radius <= self.BOX_RADIUS_MAX:
+            raise ValueError(f"Promień musi być liczbą całkowitą w zakresie 1-{self.BOX_RADIUS_MAX}")
+        if not self._is_uint8_value(border_value):
+            raise ValueError("Wartość stała musi być liczbą całkowitą 0-255")
+        
+        radius = int(radius)
+        size = 2 * radius + 1
+        return self._apply_uint8_with_border(img, radius, radius, border_type, border_value,
+                                             lambda band: self._box_mean_valid(band, size))
+    
     # ==================== WYOSTRZANIE (LAPLACJAN) ====================
     
     def apply_sharpening(self, img, mask_name, border_type="BORDER_REFLECT", border_value=0):
@@ -256,10 +952,152 @@ class ConvolutionOperations:
         if mask_name not in self.LAPLACIAN_MASKS:
             raise ValueError(f"Nieznana maska: {mask_name}")
         
-        kernel = self.LAPLACIAN_MASKS[mask_name]
-        result = self._apply_convolution_with_border(img, kernel, border_type, border_value)
+        features = EdgeFeatures(img, self.BORDER_TYPES[border_type], border_value)
+        return self._normalize_result(features.response(self._kernel_bank[mask_name].kernel))
+    
+    # ==================== WYOSTRZANIE W JEDNYM PRZEBIEGU ====================
+    
+    # Wynik wyostrzania: sama odpowiedź Laplacjanu (apply_sharpening), obraz
+    # wyostrzony Laplacjanem (apply_laplacian_sharpening) lub maską
+    # wyostrzającą (apply_unsharp_mask)
+    SHARPENING_MODES = [
+        "Odpowiedź Laplacjanu (znormalizowana)",
+        "Obraz - k · Laplacjan",
+        "Maska wyostrzająca (unsharp)",
+    ]
+    
+    SHARPENING_AMOUNT_MAX = 10.0
+    
+    def sharpening_kernel(self, mask_name, amount=1.0):
+        """
+        Maska 3x3 dająca od razu obraz wyostrzony: tożsamość - amount * Laplacjan
+        
+        Laplacjan o dodatnim środku (wariant 2) jest dodawany zamiast odejmowany -
+        w obu przypadkach wzmacniana jest różnica piksela od otoczenia.
+        """
+        if mask_name not in self.LAPLACIAN_MASKS:
+            raise ValueError(f"Nieznana maska: {mask_name}")
         
-        return self._normalize_result(result)
+        laplacian = self._kernel_bank[mask_name].kernel
+        center = laplacian.shape[0] // 2, laplacian.shape[1] // 2
+        sign = 1 if laplacian[center] < 0 else -1
+        
+        kernel = laplacian * np.float32(-sign * amount)
+        kernel[center] += 1
+        return kernel
+    
+    def _validate_sharpening(self, img, amount, border_value):
+        """Wspólna walidacja parametrów wyostrzania"""
+        self._validate_image(img)
+        if img.dtype != np.uint8:
+            raise ValueError("Obraz musi być 8-bitowy (uint8)")
+        if not 0 <= amount <= self.SHARPENING_AMOUNT_MAX:
+            raise ValueError(f"Siła wyostrzania musi być w zakresie 0-{self.SHARPENING_AMOUNT_MAX:g}")
+        if not self._is_uint8_value(border_value):
+            raise ValueError("Wartość stała musi być liczbą całkowitą 0-255")
+    
+    def apply_laplacian_sharpening(self, img, mask_name, amount=1.0, border_type="BORDER_REFLECT",
+                                   border_value=0):
+        """
+        Wyostrzanie Laplacjanem w jednym przebiegu: obraz - amount * Laplacjan
+        
+        Tożsamość i Laplacjan są złożone w jedną maskę (sharpening_kernel), którą
+        cv2.filter2D liczy prosto z obrazu uint8 do uint8 - z zaokrągleniem
+        i wysyceniem do 0-255, bez odpowiedzi Laplacjanu jako obrazu pośredniego.
+        
+        Args:
+            img: Obraz wejściowy (grayscale, uint8)
+            mask_name: Nazwa maski z LAPLACIAN_MASKS
+            amount: Siła wyostrzania k (0 - SHARPENING_AMOUNT_MAX)
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT (0-255)
+        
+        Returns:
+            Wyostrzony obraz uint8
+        """
+        self._validate_sharpening(img, amount, border_value)
+        kernel = self.sharpening_kernel(mask_name, amount)
+        return self._apply_uint8_with_border(img, 1, 1, border_type, border_value,
+                                             lambda band: self._filter2d_valid(band, kernel))
+    
+    @staticmethod
+    def _unsharp_combine(original, blurred, amount, threshold):
+        """
+        obraz + amount * (obraz - rozmyty) z progiem: różnice mniejsze co do
+        modułu od threshold nie są wzmacniane; wynik zaokrąglony i wysycony
+        """
+        detail = original - blurred
+        if threshold > 0:
+            detail[np.abs(detail) < threshold] = 0
+        detail *= amount
+        detail += original
+        return np.clip(np.rint(detail), 0, 255).astype(np.uint8)
+    
+    def apply_unsharp_mask(self, img, sigma=1.0, amount=1.0, threshold=0, border_type="BORDER_REFLECT",
+                           border_value=0):
+        """
+        Maska wyostrzająca (unsharp masking) w jednym przebiegu
+        
+        Dla sigmy poniżej GAUSSIAN_RECURSIVE_MIN_SIGMA rozmycie, różnica, próg
+        i wysycenie liczone są razem dla każdego pasa wierszy (konwolucja
+        kafelkowa) - bez pełnowymiarowych obrazów pośrednich. Dla większych
+        sigm rozmycie liczone jest rekursywnie dla całego obrazu, a reszta
+        blokami wierszy.
+        
+        Args:
+            img: Obraz wejściowy (grayscale, uint8)
+            sigma: Sigma rozmycia Gaussa (GAUSSIAN_SIGMA_MIN - GAUSSIAN_SIGMA_MAX)
+            amount: Siła wyostrzania (0 - SHARPENING_AMOUNT_MAX)
+            threshold: Minimalna różnica piksela od rozmycia (0-255), od której
+                       piksel jest wyostrzany - chroni gładkie obszary przed
+                       wzmocnieniem szumu
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT (0-255)
+        
+        Returns:
+            Wyostrzony obraz uint8
+        """
+        self._validate_sharpening(img, amount, border_value)
+        if not self.GAUSSIAN_SIGMA_MIN <= sigma <= self.GAUSSIAN_SIGMA_MAX:
+            raise ValueError(f"Sigma musi być w zakresie {self.GAUSSIAN_SIGMA_MIN:g}-{self.GAUSSIAN_SIGMA_MAX:g}")
+        if not 0 <= threshold <= 255:
+            raise ValueError("Próg musi być w zakresie 0-255")
+        
+        amount = np.float32(amount)
+        pad = self.gaussian_radius(sigma)
+        
+        if sigma < self.GAUSSIAN_RECURSIVE_MIN_SIGMA:
+            vector = cv2.getGaussianKernel(2 * pad + 1, sigma, cv2.CV_32F).ravel()
+            
+            def sharpen(band):
+                blurred = cv2.sepFilter2D(
+                    src=band,
+                    ddepth=-1,
+                    kernelX=vector,
+                    kernelY=vector,
+                    anchor=(-1, -1),
+                    borderType=cv2.BORDER_ISOLATED
+                )
+                h, w = band.shape
+                return self._unsharp_combine(band[pad:h - pad, pad:w - pad], blurred[pad:h - pad, pad:w - pad],
+                                             amount, threshold)
+            
+            return self._run_tiled(img, pad, pad, border_type, border_value, sharpen, result_dtype=np.uint8)
+        
+        blurred = self._apply_recursive_gaussian_with_border(img, sigma, border_type, border_value)
+        h, w = img.shape
+        result = np.empty((h, w), dtype=np.uint8)
+        rows = max(1, NORMALIZE_BLOCK_PIXELS // max(w, 1))
+        for top in range(0, h, rows):
+            original = img[top:top + rows].astype(np.float32)
+            result[top:top + rows] = self._unsharp_combine(original, blurred[top:top + rows], amount, threshold)
+        
+        if border_type == "Wypełnienie wyniku stałą":
+            result[:pad] = border_value
+            result[h - pad:] = border_value
+            result[:, :pad] = border_value
+            result[:, w - pad:] = border_value
+        return result
     
     # ==================== DETEKCJA KRAWĘDZI - PREWITT ====================
     
@@ -281,10 +1119,94 @@ class ConvolutionOperations:
         if direction not in self.PREWITT_MASKS:
             raise ValueError(f"Nieznany kierunek: {direction}")
         
-        kernel = self.PREWITT_MASKS[direction]
-        result = self._apply_convolution_with_border(img, kernel, border_type, border_value)
+        features = EdgeFeatures(img, self.BORDER_TYPES[border_type], border_value)
+        return self._normalize_result(features.response(self._kernel_bank[direction].kernel))
+    
+    # Wartość mapy kierunków dla pikseli bez odpowiedzi
+    # (pas brzegowy w trybie "Wypełnienie wyniku stałą")
+    PREWITT_NO_DIRECTION = 255
+    
+    def apply_prewitt_compass(self, img, border_type="BORDER_REFLECT", border_value=0):
+        """
+        Kompasowy operator Prewitta - odpowiedź wszystkich 8 kierunków naraz
+        
+        Maski przeciwnych kierunków różnią się tylko znakiem (S = -N, SW = -NE,
+        W = -E, NW = -SE), więc wystarczą 4 konwolucje wspólnej ramki obrazu.
+        Dla obrazu 8-bitowego odpowiedzi są liczbami całkowitymi z zakresu
+        -765..765, liczonymi od razu w int16 (bez konwersji do float32).
+        
+        Args:
+            img: Obraz wejściowy (grayscale, uint8)
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT
         
-        return self._normalize_result(result)
+        Returns:
+            (magnitude, directions):
+                magnitude - maksymalna odpowiedź po kierunkach, znormalizowana do 0-255
+                directions - indeks kierunku o maksymalnej odpowiedzi (uint8,
+                kolejność jak w get_prewitt_directions(); przy remisie pierwszy
+                z listy; PREWITT_NO_DIRECTION dla pasa brzegowego w trybie
+                "Wypełnienie wyniku stałą")
+        """
+        self._validate_image(img)
+        if img.dtype != np.uint8:
+            raise ValueError("Kompasowy operator Prewitta wymaga obrazu 8-bitowego")
+        
+        directions = list(self.PREWITT_MASKS.keys())
+        base_count = len(directions) // 2
+        base_kernels = [self.PREWITT_MASKS[name] for name in directions[:base_count]]
+        pad = base_kernels[0].shape[0] // 2
+        h, w = img.shape
+        
+        if border_type == "Wypełnienie wyniku stałą":
+            magnitude = np.full((h, w), border_value, dtype=np.float32)
+            direction_map = np.full((h, w), self.PREWITT_NO_DIRECTION, dtype=np.uint8)
+            if h <= 2 * pad or w <= 2 * pad:
+                return self._normalize_result(magnitude), direction_map
+            # Wnętrze wyniku nie zależy od obsługi brzegu
+            source = img
+            border = cv2.BORDER_REPLICATE
+            interior = (slice(pad, h - pad), slice(pad, w - pad))
+        else:
+            # Wspólna ramka dla wszystkich kierunków
+            source = cv2.copyMakeBorder(
+                src=img,
+                top=pad,
+                bottom=pad,
+                left=pad,
+                right=pad,
+                borderType=self.BORDER_TYPES[border_type],
+                value=float(border_value)
+            )
+            border = cv2.BORDER_ISOLATED
+            magnitude = np.empty((h, w), dtype=np.float32)
+            direction_map = np.empty((h, w), dtype=np.uint8)
+            interior = (slice(None), slice(None))
+        
+        # Klucz = odpowiedź * 8 + (7 - indeks kierunku): maksimum klucza to
+        # maksymalna odpowiedź, a przy remisie - kierunek wcześniejszy na liście
+        # (jak np.argmax). Zakres -6120..6127 mieści się w int16.
+        best = None
+        for index, kernel in enumerate(base_kernels):
+            response = cv2.filter2D(
+                src=source,
+                ddepth=cv2.CV_16S,
+                kernel=kernel,
+                anchor=(-1, -1),
+                borderType=border
+            )[pad:-pad, pad:-pad]
+            response <<= 3
+            positive = response + np.int16(len(directions) - 1 - index)
+            negative = np.int16(base_count - 1 - index) - response
+            if best is None:
+                best = np.maximum(positive, negative)
+            else:
+                np.maximum(best, positive, out=best)
+                np.maximum(best, negative, out=best)
+        
+        magnitude[interior] = best >> 3
+        direction_map[interior] = (len(directions) - 1) - (best & 7)
+        return self._normalize_result(magnitude), direction_map
     
     # ==================== DETEKCJA KRAWĘDZI - SOBEL ====================
     
@@ -302,41 +1224,239 @@ class ConvolutionOperations:
         """
         self._validate_image(img)
         
-        # Gradient X i Y
-        grad_x = self._apply_convolution_with_border(img, self.SOBEL_X, border_type, border_value)
-        grad_y = self._apply_convolution_with_border(img, self.SOBEL_Y, border_type, border_value)
+        features = EdgeFeatures(img, self.BORDER_TYPES[border_type], border_value)
+        return self._normalize_result(features.sobel_magnitude())
+    
+    # ==================== CECHY KRAWĘDZI (WSPÓLNE POCHODNE) ====================
+    
+    # Cechy obliczane przez compute_edge_features (oprócz nazw masek
+    # LAPLACIAN_MASKS i kierunków PREWITT_MASKS)
+    EDGE_FEATURES = ["Sobel X", "Sobel Y", "Sobel - magnituda", "Sobel - orientacja"]
+    
+    def compute_edge_features(self, img, features, border_type="BORDER_REFLECT", border_value=0):
+        """
+        Wiele cech krawędziowych jednego obrazu ze wspólnych pochodnych
+        
+        Obraz jest konwertowany i otaczany ramką raz dla wszystkich żądanych
+        cech. Każda maska liczona jest jedną konwolucją 2-D; powtórzone maski
+        (np. gradienty Sobela dla magnitudy i orientacji) liczone są raz,
+        a maska przeciwna (Prewitt W = -E) to negacja zapamiętanej odpowiedzi.
+        
+        Args:
+            img: Obraz wejściowy (grayscale)
+            features: Lista nazw cech - z EDGE_FEATURES, nazwy masek Laplacjana
+                      lub kierunki Prewitta
+            border_type: Typ brzegu
+            border_value: Wartość dla BORDER_CONSTANT
+        
+        Returns:
+            Słownik nazwa cechy -> obraz uint8 (cechy znormalizowane do 0-255,
+            orientacja: kąt 0-360° przeskalowany liniowo do 0-255)
+        """
+        self._validate_image(img)
+        
+        unknown = [name for name in features
+                   if name not in self.EDGE_FEATURES
+                   and name not in self.LAPLACIAN_MASKS
+                   and name not in self.PREWITT_MASKS]
+        if unknown:
+            raise ValueError(f"Nieznane cechy: {', '.join(unknown)}")
         
-        # Magnituda gradientu
-        magnitude = np.sqrt(grad_x**2 + grad_y**2)
-        return self._normalize_result(magnitude)
+        edge_features = EdgeFeatures(img, self.BORDER_TYPES[border_type], border_value)
+        results = {}
+        for name in features:
+            if name == "Sobel - magnituda":
+                results[name] = self._normalize_result(edge_features.sobel_magnitude())
+            elif name == "Sobel - orientacja":
+                orientation = edge_features.sobel_orientation()
+                results[name] = (np.mod(orientation, 360) * np.float32(255 / 360)).astype(np.uint8)
+            else:
+                # Sobel X/Y, maski Laplacjana i kierunki Prewitta - z banku masek
+                results[name] = self._normalize_result(edge_features.response(self._kernel_bank[name].kernel))
+        return results
     
     # ==================== WŁASNA MASKA ====================
     
-    def apply_custom_mask(self, img, mask, border_type="BORDER_REFLECT", border_value=0):
+    # Rozmiary własnej maski proponowane w interfejsie
+    CUSTOM_MASK_SIZES = list(range(3, 32, 2))
+    
+    # Dopuszczalny błąd rozkładu maski - maksymalna różnica wyniku
+    # (w poziomach jasności) względem pełnej konwolucji 2-D
+    CUSTOM_MASK_TOLERANCE = 1e-3
+    
+    @staticmethod
+    def decompose_kernel(kernel, tolerance=CUSTOM_MASK_TOLERANCE):
+        """
+        Szuka rozkładu maski na sumę masek separowalnych (SVD).
+        
+        Maska rzędu r to suma r iloczynów kolumna x wiersz, więc zamiast
+        kh * kw mnożeń na piksel wystarcza r * (kh + kw) - dwa przebiegi 1-D
+        na każdy składnik. Wybierany jest najmniejszy rząd, dla którego
+        oszacowanie błędu nie przekracza tolerancji; rozkład jest używany
+        tylko wtedy, gdy jest tańszy od pełnej konwolucji.
+        
+        Args:
+            kernel: Maska konwolucji (numpy array 2D)
+            tolerance: Dopuszczalny błąd wyniku w poziomach jasności
+        
+        Returns:
+            KernelDecomposition(separable, rank, columns, rows, max_error):
+            columns/rows - wektory 1-D kolejnych składników (float32),
+            max_error - górne oszacowanie błędu wyniku dla obrazu 0-255
+            (255 * suma |maska - przybliżenie|)
+        """
+        kernel = np.asarray(kernel, dtype=np.float64)
+        kh, kw = kernel.shape
+        
+        def approximation_error(columns, rows):
+            # Błąd liczony dla wektorów już zaokrąglonych do float32
+            approximation = columns.astype(np.float64).T @ rows.astype(np.float64)
+            return 255 * float(np.sum(np.abs(kernel - approximation)))
+        
+        # Rząd 1: kolumna i wiersz przechodzące przez największy element - dla
+        # masek całkowitych (Sobel, Prewitt, uśrednienie) wektory są dokładne,
+        # bez błędów zaokrągleń SVD
+        pivot_row, pivot_col = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+        pivot = kernel[pivot_row, pivot_col]
+        if pivot != 0:
+            columns = kernel[:, pivot_col][None].astype(np.float32)
+            rows = (kernel[pivot_row] / pivot)[None].astype(np.float32)
+            max_error = approximation_error(columns, rows)
+            if max_error <= tolerance:
+                return KernelDecomposition(True, 1, list(columns), list(rows), max_error)
+        
+        u, singular, vt = np.linalg.svd(kernel)
+        
+        rank = 1
+        while rank * (kh + kw) < kh * kw:
+            scale = np.sqrt(singular[:rank])
+            columns = (u[:, :rank] * scale).T.astype(np.float32)
+            rows = (vt[:rank] * scale[:, None]).astype(np.float32)
+            
+            max_error = approximation_error(columns, rows)
+            if max_error <= tolerance:
+                return KernelDecomposition(True, rank, list(columns), list(rows), max_error)
+            rank += 1
+        
+        return KernelDecomposition(False, int(np.linalg.matrix_rank(kernel)), [], [], 0.0)
+    
+    @staticmethod
+    def _separable_filter(img_float, decomposition, border):
+        """Suma przebiegów 1-D (kolumny, potem wiersze) dla każdego składnika rozkładu"""
+        result = None
+        for column, row in zip(decomposition.columns, decomposition.rows):
+            term = cv2.sepFilter2D(
+                src=img_float,
+                ddepth=-1,
+                kernelX=row,
+                kernelY=column,
+                anchor=(-1, -1),
+                borderType=border
+            )
+            if result is None:
+                result = term
+            else:
+                result += term
+        return result
+    
+    def _apply_separable_with_border(self, img, decomposition, border_type, border_value):
+        """
+        Odpowiednik _apply_convolution_with_border dla maski rozłożonej
+        na przebiegi 1-D
+        """
+        pad = len(decomposition.columns[0]) // 2
+        
+        # Duże obrazy - pasami wierszy w wielu wątkach (wynik identyczny)
+        if self._use_tiles(img, (2 * pad + 1, 2 * pad + 1)):
+            return self._run_tiled(
+                img, pad, pad, border_type, border_value,
+                lambda band: self._separable_filter(band, decomposition, cv2.BORDER_ISOLATED)[pad:-pad, pad:-pad]
+            )
+        
+        img_float = img.astype(np.float32)
+        
+        # Obsługa "Wypełnienie wyniku stałą" - wnętrze wyniku nie zależy od brzegu
+        if border_type == "Wypełnienie wyniku stałą":
+            result = np.full_like(img, border_value, dtype=np.float32)
+            h, w = img.shape
+            if h > 2 * pad and w > 2 * pad:
+                filtered = self._separable_filter(img_float, decomposition, cv2.BORDER_REPLICATE)
+                result[pad:h - pad, pad:w - pad] = filtered[pad:h - pad, pad:w - pad]
+            return result
+        
+        border = self.BORDER_TYPES[border_type]
+        
+        # Dla BORDER_CONSTANT musimy ręcznie dodać ramkę
+        if border == cv2.BORDER_CONSTANT:
+            padded = cv2.copyMakeBorder(
+                src=img_float,
+                top=pad,
+                bottom=pad,
+                left=pad,
+                right=pad,
+                borderType=cv2.BORDER_CONSTANT,
+                value=float(border_value)
+            )
+            result = self._separable_filter(padded, decomposition, cv2.BORDER_ISOLATED)
+            return result[pad:-pad, pad:-pad]
+        
+        return self._separable_filter(img_float, decomposition, border)
+    
+    def apply_custom_mask(self, img, mask, border_type="BORDER_REFLECT", border_value=0,
+                          tolerance=CUSTOM_MASK_TOLERANCE, method="auto"):
         """
         Stosuje własną maskę zdefiniowaną przez użytkownika
         
         Args:
             img: Obraz wejściowy (grayscale)
-            mask: Maska konwolucji (numpy array)
+            mask: Maska konwolucji (numpy array) - kwadratowa, nieparzysty rozmiar
+                  (np. 3x3, 7x7, 31x31)
             border_type: Typ brzegu
             border_value: Wartość dla BORDER_CONSTANT
+            tolerance: Dopuszczalny błąd (w poziomach jasności) przy zastąpieniu
+                       maski przebiegami 1-D - patrz decompose_kernel
+            method: Metoda konwolucji: "direct", "separable", "fft" lub "auto" -
+                    najszybsza wg modelu kosztu (ConvolutionCostModel); maski
+                    znormalizowane o wagach całkowitych (fixed_point_kernel) liczone
+                    są wtedy w arytmetyce całkowitej
         
         Returns:
             Przefiltrowany obraz
         """
         self._validate_image(img)
         
-        if mask.shape != (3, 3):
-            raise ValueError("Maska musi być rozmiaru 3x3")
+        mask = np.asarray(mask)
+        if mask.ndim != 2 or mask.shape[0] != mask.shape[1] \
+                or mask.shape[0] < 3 or mask.shape[0] % 2 == 0:
+            raise ValueError("Maska musi być kwadratowa o nieparzystym rozmiarze (3x3, 5x5, ...)")
+        if not np.all(np.isfinite(mask)):
+            raise ValueError("Maska zawiera nieprawidłowe wartości")
         
-        result = self._apply_convolution_with_border(img, mask, border_type, border_value)
+        if method not in self.CONVOLUTION_METHODS:
+            raise ValueError(f"Nieznana metoda konwolucji: {method}")
         
-        # Sprawdź czy wartości są w rozsądnym zakresie
-        if np.min(result) < 0 or np.max(result) > 255:
-            return self._normalize_result(result)
+        # Zapis całkowity i rozkład maski - liczone raz dla danej maski
+        prepared = self.prepare_kernel(mask, tolerance)
+        decomposition = prepared.decomposition
+        
+        if method == "auto":
+            if self._can_use_fixed_point(img, prepared.fixed, border_value):
+                return self._apply_fixed_point_with_border(img, prepared.fixed, border_type, border_value)
+            method, decomposition = self.choose_convolution_method(img.shape, mask, border_type, tolerance)
+        elif method == "separable":
+            if not decomposition.separable:
+                raise ValueError(f"Maska nie jest separowalna z tolerancją {tolerance:g}")
+        
+        # Maski separowalne (lub niskiego rzędu) - przebiegi 1-D zamiast konwolucji 2-D;
+        # duże maski - FFT, której koszt nie zależy od rozmiaru maski
+        if method == "separable":
+            result = self._apply_separable_with_border(img, decomposition, border_type, border_value)
+        elif method == "fft":
+            result = self._apply_fft_with_border(img, mask, border_type, border_value)
         else:
-            return np.clip(result, 0, 255).astype(np.uint8)
+            result = self._apply_convolution_with_border(img, mask, border_type, border_value)
+        
+        return self._finish_result(result)
     
     # ==================== GETTERY DLA UI ====================
     
@@ -344,6 +1464,14 @@ class ConvolutionOperations:
         """Zwraca listę nazw masek wygładzających"""
         return list(self.SMOOTHING_MASKS.keys())
     
+    def get_smoothing_filters(self):
+        """Zwraca listę filtrów wygładzających z parametrem (sigma, promień)"""
+        return [self.GAUSSIAN_SMOOTHING, self.BOX_SMOOTHING]
+    
+    def get_sharpening_modes(self):
+        """Zwraca listę rodzajów wyniku wyostrzania"""
+        return list(self.SHARPENING_MODES)
+    
     def get_laplacian_mask_names(self):
         """Zwraca listę nazw masek Laplacjana"""
         return list(self.LAPLACIAN_MASKS.keys())
@@ -356,6 +1484,14 @@ class ConvolutionOperations:
         """Zwraca listę typów brzegów"""
         return list(self.BORDER_TYPES.keys())
     
+    def get_custom_mask_sizes(self):
+        """Zwraca listę rozmiarów własnej maski"""
+        return list(self.CUSTOM_MASK_SIZES)
+    
+    def get_median_kernel_sizes(self):
+        """Zwraca listę rozmiarów otoczenia filtru medianowego"""
+        return list(self.MEDIAN_KERNEL_SIZES)
+    
     # ==================== CANNY EDGE DETECTION ====================
     
     def apply_canny(self, img, threshold1=100, threshold2=200):
@@ -384,13 +1520,32 @@ class ConvolutionOperations:
     
     # ==================== MEDIAN FILTER ====================
     
+    # Rozmiary otoczenia proponowane w interfejsie (apply_median przyjmuje dowolny nieparzysty)
+    MEDIAN_KERNEL_SIZES = [3, 5, 7, 9, 11, 15, 21, 31, 51]
+    
+    @staticmethod
+    def _median_blur(img, kernel_size):
+        """
+        Mediana w otoczeniu kernel_size x kernel_size.
+        
+        Dla obrazów 8-bitowych i rozmiarów > 5 cv2.medianBlur używa algorytmu
+        z przesuwanym histogramem (Perreault-Hébert): histogramy kolumn są
+        aktualizowane o jeden piksel przy przesunięciu okna, więc czas na
+        piksel nie zależy od rozmiaru maski - mediana 51x51 liczy się
+        w podobnym czasie co 7x7. Rozmiary 3 i 5 liczone są sieciami sortującymi.
+        """
+        if kernel_size > 5 and img.dtype != np.uint8:
+            raise ValueError("Filtr medianowy o rozmiarze większym niż 5 wymaga obrazu 8-bitowego")
+        return cv2.medianBlur(src=img, ksize=kernel_size)
+    
     def apply_median(self, img, kernel_size=3, border_type="BORDER_REFLECT", border_value=0):
         """
         Filtr medianowy
         
         Args:
             img: Obraz wejściowy (grayscale)
-            kernel_size: Rozmiar kernela (3, 5, 7, 9)
+            kernel_size: Rozmiar kernela - dowolna nieparzysta liczba >= 3
+                         (np. 3, 5, 7, ..., 31, 51)
             border_type: Typ brzegu
             border_value: Wartość dla BORDER_CONSTANT
         
@@ -399,20 +1554,21 @@ class ConvolutionOperations:
         """
         self._validate_image(img)
         
-        if kernel_size not in [3, 5, 7, 9]:
-            raise ValueError("Rozmiar kernela musi być 3, 5, 7 lub 9")
+        if isinstance(kernel_size, bool) or not isinstance(kernel_size, (int, np.integer)) \
+                or kernel_size < 3 or kernel_size % 2 == 0:
+            raise ValueError("Rozmiar kernela musi być nieparzystą liczbą całkowitą >= 3")
+        kernel_size = int(kernel_size)
+        pad = kernel_size // 2
         
         # Obsługa "Wypełnienie wyniku stałą"
         if border_type == "Wypełnienie wyniku stałą":
             result = np.full_like(img, border_value, dtype=np.uint8)
             
-            pad = kernel_size // 2
+            # Mediana pikseli, których otoczenie mieści się w obrazie, nie zależy
+            # od sposobu obsługi brzegu - wystarczy wyciąć wnętrze wyniku
             h, w = img.shape
-            
-            for i in range(pad, h - pad):
-                for j in range(pad, w - pad):
-                    roi = img[i-pad:i+pad+1, j-pad:j+pad+1]
-                    result[i, j] = np.median(roi)
+            if h > 2 * pad and w > 2 * pad:
+                result[pad:h - pad, pad:w - pad] = self._median_blur(img, kernel_size)[pad:h - pad, pad:w - pad]
             
             return result
         else:
@@ -420,7 +1576,6 @@ class ConvolutionOperations:
             
             # Dla BORDER_CONSTANT dodaj ramkę
             if border == cv2.BORDER_CONSTANT:
-                pad = kernel_size // 2
                 padded = cv2.copyMakeBorder(
                     src=img,
                     top=pad,
@@ -430,9 +1585,130 @@ class ConvolutionOperations:
                     borderType=cv2.BORDER_CONSTANT,
                     value=float(border_value)
                 )
-                result = cv2.medianBlur(src=padded, ksize=kernel_size)
+                result = self._median_blur(padded, kernel_size)
                 result = result[pad:-pad, pad:-pad]
             else:
-                result = cv2.medianBlur(src=img, ksize=kernel_size)
+                result = self._median_blur(img, kernel_size)
             
-            return result
\ No newline at end of file
+            return result
+
+
+class EdgeFeatures:
+    """
+    Wspólne pochodne obrazu dla operatorów krawędziowych (Sobel, Prewitt,
+    Laplacjan).
+    
+    Obraz jest raz konwertowany do float32 (i raz otaczany ramką dla
+    BORDER_CONSTANT); odpowiedzi kolejnych masek liczone są na tym samym
+    buforze i zapamiętywane, więc np. gradienty Sobela są liczone raz dla
+    magnitudy i orientacji, a odpowiedź maski przeciwnej (Prewitt W = -E)
+    to tylko negacja.
+    """
+    
+    def __init__(self, img, border=cv2.BORDER_REFLECT, border_value=0, pad=1):
+        """
+        Args:
+            img: Obraz wejściowy (grayscale)
+            border: Typ brzegu OpenCV lub None dla "Wypełnienie wyniku stałą"
+                    (wartości ConvolutionOperations.BORDER_TYPES)
+            border_value: Wartość dla BORDER_CONSTANT i wypełnienia
+            pad: Połowa rozmiaru obsługiwanych masek (1 dla 3x3)
+        """
+        self.shape = img.shape
+        self.pad = pad
+        self.border_value = border_value
+        self.constant_fill = border is None
+        
+        img_float = img.astype(np.float32)
+        if self.constant_fill:
+            # Wnętrze wyniku nie zależy od obsługi brzegu - liczone bez ramki,
+            # potem wycinane
+            self._source, self._border, self._crop = img_float, cv2.BORDER_REPLICATE, True
+        elif border == cv2.BORDER_CONSTANT:
+            # filter2D wypełnia brzeg tylko zerami - jawna ramka z wartością,
+            # wspólna dla wszystkich masek
+            padded = cv2.copyMakeBorder(
+                src=img_float,
+                top=pad,
+                bottom=pad,
+                left=pad,
+                right=pad,
+                borderType=cv2.BORDER_CONSTANT,
+                value=float(border_value)
+            )
+            self._source, self._border, self._crop = padded, cv2.BORDER_ISOLATED, True
+        else:
+            self._source, self._border, self._crop = img_float, border, False
+        
+        self._responses = {}
+        self._gradients = None
+    
+    def _valid_response(self, kernel):
+        """
+        Odpowiedź maski na buforze źródłowym - w trybie wypełnienia tylko dla
+        pozycji, w których maska mieści się w obrazie, w pozostałych o rozmiarze obrazu
+        """
+        kernel = np.asarray(kernel, dtype=np.float32)
+        if kernel.shape[0] > 2 * self.pad + 1 or kernel.shape[1] > 2 * self.pad + 1:
+            raise ValueError(f"Maska większa niż {2 * self.pad + 1}x{2 * self.pad + 1}")
+        
+        key = kernel.tobytes() + bytes(kernel.shape)
+        if key in self._responses:
+            return self._responses[key]
+        
+        negated_key = (-kernel).tobytes() + bytes(kernel.shape)
+        if negated_key in self._responses:
+            response = -self._responses[negated_key]
+        else:
+            response = cv2.filter2D(
+                src=self._source,
+                ddepth=-1,
+                kernel=kernel,
+                anchor=(-1, -1),
+                borderType=self._border
+            )
+            if self._crop:
+                pad_y, pad_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+                height, width = response.shape
+                response = response[pad_y:height - pad_y, pad_x:width - pad_x]
+        
+        self._responses[key] = response
+        return response
+    
+    def response(self, kernel):
+        """
+        Odpowiedź maski (korelacja, jak cv2.filter2D) o rozmiarze obrazu;
+        w trybie wypełnienia pas brzegowy ma wartość border_value
+        """
+        kernel = np.asarray(kernel, dtype=np.float32)
+        h, w = self.shape
+        pad_y, pad_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        
+        if not self.constant_fill:
+            return self._valid_response(kernel)
+        
+        result = np.full(self.shape, self.border_value, dtype=np.float32)
+        if h > 2 * pad_y and w > 2 * pad_x:
+            result[pad_y:h - pad_y, pad_x:w - pad_x] = self._valid_response(kernel)
+        return result
+    
+    def sobel_gradients(self):
+        """Pochodne Sobela (X, Y) - liczone raz"""
+        if self._gradients is None:
+            self._gradients = (
+                self.response(ConvolutionOperations.SOBEL_X),
+                self.response(ConvolutionOperations.SOBEL_Y)
+            )
+        return self._gradients
+    
+    def sobel_magnitude(self):
+        """Magnituda gradientu Sobela sqrt(gx^2 + gy^2) (float32, bez dodatkowych tablic pośrednich)"""
+        grad_x, grad_y = self.sobel_gradients()
+        magnitude = grad_x * grad_x
+        magnitude += grad_y * grad_y
+        return np.sqrt(magnitude, out=magnitude)
+    
+    def sobel_orientation(self):
+        """Kierunek gradientu Sobela w stopniach (-180, 180] (float32)"""
+        grad_x, grad_y = self.sobel_gradients()
+        return np.degrees(np.arctan2(grad_y, grad_x)).astype(np.float32, copy=False)
@@ -1,22 +1,139 @@
+import statistics
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import cv2
 import numpy as np
-from collections import namedtuple
+from collections import namedtuple, OrderedDict, deque
 
 Histogram = namedtuple('Histogram', ['histogram', 'mean', 'median', 'std', 'pixels_num', 'min', 'max'])
 
+# Liczba pikseli zliczanych jednym wywołaniem np.bincount (ogranicza pamięć tymczasową)
+HISTOGRAM_CHUNK_PIXELS = 1 << 22
+
+# Tryb przybliżony: wynik z przedziałami błędu (pola Histogram + dodatkowe)
+HistogramEstimate = namedtuple('HistogramEstimate', Histogram._fields + (
+    'sampled_pixels', 'mean_error', 'median_interval', 'cdf_error'
+))
+
+# Domyślna liczba pikseli próbki w trybie przybliżonym (ok. 512x512)
+APPROXIMATE_SAMPLE_SIZE = 1 << 18
+
+
+class HistogramCache:
+    """
+    Współdzielony cache histogramów i statystyk (LRU).
+
+    Klucz tworzy tożsamość bufora (adres danych, kształt, kroki, typ) oraz wersja
+    zawartości obrazu. Wersję podbija invalidate() - po modyfikacji obrazu w miejscu
+    stare wpisy przestają pasować i zostają wyparte przez LRU. Dodatkowo każdy wpis
+    trzyma słabą referencję do tablicy, więc ponowne użycie adresu przez inny obraz
+    nie zwróci cudzych statystyk. Wersja bufora jest pamiętana tylko do śmierci
+    obrazu, który ją podbił - słownik wersji nie rośnie z każdym obrazem.
+    """
+    
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # klucz bufora -> (słaba referencja do obrazu, wersja)
+        self._versions = {}
+        # Klucze buforów, których obrazy zostały zwolnione - usuwane z _versions
+        # przy najbliższej operacji pod blokadą (callback weakref może zostać
+        # wywołany przez GC w dowolnym miejscu, także przy trzymanej blokadzie)
+        self._released = deque()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _buffer_key(img):
+        """Tożsamość bufora obrazu"""
+        return (img.__array_interface__['data'][0], img.shape, img.strides, img.dtype.str)
+    
+    def _version(self, buffer_key):
+        """Aktualna wersja bufora (wywoływane pod blokadą)"""
+        while self._released:
+            released_key = self._released.popleft()
+            record = self._versions.get(released_key)
+            # Adres mógł zostać już użyty ponownie przez nowy obraz
+            if record is not None and record[0]() is None:
+                del self._versions[released_key]
+        
+        record = self._versions.get(buffer_key)
+        return record[1] if record is not None else 0
+    
+    def get(self, img, compute=None):
+        """
+        Zwraca statystyki histogramów obrazu z cache lub oblicza je.
+
+        Parametry:
+            img: obraz numpy.ndarray
+            compute: funkcja obliczająca statystyki (domyślnie HistogramManager.calculate_histograms)
+
+        Zwraca:
+            lista Histogram namedtuple (jak HistogramManager.calculate_histograms)
+        """
+        buffer_key = self._buffer_key(img)
+        
+        with self._lock:
+            key = buffer_key + (self._version(buffer_key),)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is img:
+                self._entries.move_to_end(key)
+                return entry[1]
+        
+        stats = (compute or HistogramManager.calculate_histograms)(img)
+        
+        with self._lock:
+            self._entries[key] = (weakref.ref(img), stats)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return stats
+    
+    def invalidate(self, img):
+        """Unieważnia statystyki obrazu (np. po modyfikacji lub zamknięciu)"""
+        buffer_key = self._buffer_key(img)
+        
+        with self._lock:
+            version = self._version(buffer_key)
+            self._entries.pop(buffer_key + (version,), None)
+            released = self._released
+            self._versions[buffer_key] = (
+                weakref.ref(img, lambda ref, key=buffer_key: released.append(key)),
+                version + 1
+            )
+    
+    def clear(self):
+        """Czyści cały cache"""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._released.clear()
+
 class HistogramManager:
     @staticmethod
-    def calculate_histograms(img):
+    def calculate_histograms(img, approximate=False, sample_size=APPROXIMATE_SAMPLE_SIZE):
         """
         Oblicza histogramy pikseli obrazu.
 
-        Parametr:
+        Parametry:
             img: obraz w formacie numpy.ndarray (mono lub BGR)
+            approximate: True - szacunek z warstwowej próbki pikseli (podglądy na żywo);
+                         zwraca HistogramEstimate z przedziałami błędu
+            sample_size: przybliżona liczba pikseli próbki w trybie przybliżonym
 
         Zwraca:
             lista histogramów (każdy to numpy.ndarray 256-elementowy)
             - 1 element w liście dla obrazu mono
             - 3 elementy dla obrazu kolorowego (B, G, R)
         """
+        if not (len(img.shape) == 2 or (len(img.shape) == 3 and img.shape[2] == 3)):
+            raise ValueError("Nieobsługiwany format obrazu")
+        
+        if approximate:
+            sample = HistogramManager.stratified_sample(img, sample_size)
+            return HistogramManager.calculate_sample_histograms(sample, img.shape[0] * img.shape[1])
+        
         if len(img.shape) == 2:  # monochromatic
             hists = HistogramManager._calculate_mono_histogram(img)
         elif len(img.shape) == 3 and img.shape[2] == 3:  # color RGB
@@ -27,13 +144,182 @@ class HistogramManager:
         return HistogramManager._calculate_histogram_stats(hists)
     
     @staticmethod
-    def _calculate_histogram_stats(hists):
+    def stratified_sample(img, sample_size=APPROXIMATE_SAMPLE_SIZE, seed=0):
+        """
+        Warstwowa próbka pikseli obrazu.
+
+        Obraz dzielony jest na kwadratowe bloki (warstwy), z każdego losowany jest
+        jeden piksel. Wynik to miniatura (wiersze bloków x kolumny bloków), więc
+        nadaje się zarówno do szacowania histogramu, jak i do podglądu operacji.
+        Stałe ziarno daje tę samą próbkę przy każdym wywołaniu (stabilny podgląd).
+
+        Parametry:
+            img: obraz numpy.ndarray (mono lub BGR)
+            sample_size: przybliżona liczba pikseli próbki
+            seed: ziarno generatora losowego
+
+        Zwraca:
+            próbka numpy.ndarray; dla małych obrazów - sam obraz
+        """
+        h, w = img.shape[:2]
+        step = int(np.ceil(np.sqrt(h * w / sample_size)))
+        if step <= 1:
+            return img
+        
+        rng = np.random.default_rng(seed)
+        rows = np.arange(0, h, step)
+        cols = np.arange(0, w, step)
+        
+        # Losowe położenie w obrębie bloku (bloki na krawędziach mogą być mniejsze)
+        block_h = np.minimum(step, h - rows)[:, None]
+        block_w = np.minimum(step, w - cols)[None, :]
+        ys = rows[:, None] + (rng.random((rows.size, cols.size)) * block_h).astype(np.intp)
+        xs = cols[None, :] + (rng.random((rows.size, cols.size)) * block_w).astype(np.intp)
+        
+        return img[ys, xs]
+    
+    @staticmethod
+    def calculate_sample_histograms(sample, population_pixels, confidence=0.95):
+        """
+        Szacuje histogramy i statystyki obrazu na podstawie próbki pikseli.
+
+        Histogram próbki jest skalowany do liczby pikseli całego obrazu. Przedziały
+        błędu (na poziomie ufności `confidence`):
+            - mean_error: połowa szerokości przedziału dla średniej (rozkład normalny)
+            - cdf_error: maksymalny błąd histogramu skumulowanego jako ułamek pikseli
+              (nierówność Dworetzky'ego-Kiefera-Wolfowitza)
+            - median_interval: zakres poziomów, w którym leży mediana obrazu
+
+        Parametry:
+            sample: próbka (np. ze stratified_sample) lub przekształcona próbka
+            population_pixels: liczba pikseli (na kanał) całego obrazu
+            confidence: poziom ufności przedziałów, 0 < confidence < 1
+
+        Zwraca:
+            lista HistogramEstimate (po jednej na kanał)
+        """
+        if not 0 < confidence < 1:
+            raise ValueError(f"Poziom ufności musi być z przedziału (0, 1) (podano: {confidence})")
+        
+        hists = HistogramManager._bincount_channels(sample)
+        sampled = sample.shape[0] * sample.shape[1]
+        
+        if sampled >= population_pixels:
+            cdf_error = 0.0
+            z_score = 0.0
+        else:
+            alpha = 1 - confidence
+            cdf_error = float(np.sqrt(np.log(2 / alpha) / (2 * sampled)))
+            # Kwantyl rozkładu normalnego dla przedziału dwustronnego
+            z_score = statistics.NormalDist().inv_cdf(1 - alpha / 2)
+        
+        estimates = []
+        for stats in HistogramManager._calculate_histogram_stats(hists):
+            cdf = np.cumsum(stats.histogram) / sampled
+            median_low = int(min(np.searchsorted(cdf, max(0.5 - cdf_error, 0)), 255))
+            median_high = int(min(np.searchsorted(cdf, min(0.5 + cdf_error, 1)), 255))
+            scaled = stats.histogram * (population_pixels / sampled)
+            
+            estimates.append(HistogramEstimate(
+                histogram=scaled,
+                mean=stats.mean,
+                median=stats.median,
+                std=stats.std,
+                pixels_num=population_pixels,
+                min=np.min(scaled),
+                max=np.max(scaled),
+                sampled_pixels=sampled,
+                mean_error=z_score * stats.std / np.sqrt(sampled),
+                median_interval=(median_low, median_high),
+                cdf_error=cdf_error
+            ))
+        
+        return estimates
+    
+    @staticmethod
+    def calculate_histograms_streaming(source, tile_rows=None, workers=None):
+        """
+        Oblicza histogramy obrazu przetwarzanego kafelkami (obrazy większe niż RAM).
+
+        Parametry:
+            source: jedno z:
+                - numpy.ndarray / numpy.memmap (mono lub BGR) - czytany pasami wierszy
+                - ścieżka do pliku .npy - otwierana jako memmap (tylko do odczytu)
+                - iterator kafelków numpy.ndarray o tej samej liczbie kanałów
+            tile_rows: wysokość pasa wierszy dla tablic (domyślnie tyle wierszy,
+                       ile mieści się w HISTOGRAM_CHUNK_PIXELS pikseli)
+            workers: liczba wątków; None lub 1 - przetwarzanie sekwencyjne
+
+        Zwraca:
+            lista Histogram namedtuple (jak calculate_histograms)
+
+        W pamięci znajduje się naraz co najwyżej 2 * workers kafelków, więc zużycie
+        pamięci nie zależy od rozmiaru obrazu.
+        """
+        if isinstance(source, str):
+            source = np.load(source, mmap_mode='r')
+        
+        if isinstance(source, np.ndarray):
+            if tile_rows is None:
+                tile_rows = max(1, HISTOGRAM_CHUNK_PIXELS // max(1, source.shape[1]))
+            tiles = (source[row:row + tile_rows] for row in range(0, source.shape[0], tile_rows))
+        else:
+            tiles = iter(source)
+        
+        totals = None
+        
+        def accumulate(hists):
+            nonlocal totals
+            if totals is None:
+                totals = hists
+            elif totals.shape != hists.shape:
+                raise ValueError("Kafelki mają różną liczbę kanałów")
+            else:
+                totals += hists
+        
+        if workers is None or workers <= 1:
+            for tile in tiles:
+                accumulate(HistogramManager._tile_histograms(tile))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for tile in tiles:
+                    pending.append(executor.submit(HistogramManager._tile_histograms, tile))
+                    if len(pending) >= 2 * workers:
+                        accumulate(pending.popleft().result())
+                while pending:
+                    accumulate(pending.popleft().result())
+        
+        if totals is None:
+            raise ValueError("Obraz nie zawiera żadnych pikseli")
+        
+        return HistogramManager._calculate_histogram_stats(list(totals))
+    
+    @staticmethod
+    def _tile_histograms(tile):
+        """Histogramy pojedynczego kafelka jako tablica (kanały, 256)"""
+        if not (len(tile.shape) == 2 or (len(tile.shape) == 3 and tile.shape[2] == 3)):
+            raise ValueError("Nieobsługiwany format obrazu")
+        return np.array(HistogramManager._bincount_channels(tile))
+    
+    @staticmethod
+    def _calculate_histogram_stats(hists, values=None):
+        """
+        Liczy statystyki histogramów.
+
+        Parametry:
+            hists: lista histogramów
+            values: wartość pikseli reprezentowana przez każdy koszyk
+                    (domyślnie 0-255, czyli jeden koszyk na poziom jasności)
+        """
+        if values is None:
+            values = np.arange(256)
+        
         stats = []
         for hist in hists:
-            values = np.arange(256)
             pixels_num = np.sum(hist)
             mean = np.sum(values * hist) / pixels_num
-            median = np.searchsorted(np.cumsum(hist), pixels_num / 2) # np.interp(pixels_num / 2, np.cumsum(hist), values)  # TODO: test
+            median = values[np.searchsorted(np.cumsum(hist), pixels_num / 2)] # np.interp(pixels_num / 2, np.cumsum(hist), values)  # TODO: test
             std = np.sqrt(np.sum(((values - mean) ** 2) * hist) / pixels_num)
             max_value = np.max(hist)
             min_value = np.min(hist)
@@ -52,21 +338,44 @@ class HistogramManager:
     
     @staticmethod
     def _calculate_rgb_histograms(img):
-        hists = [np.zeros(256, dtype=int) for _ in range(3)]
-        for row in img:
-            for pixel in row:
-                b, g, r = pixel
-                hists[0][b] += 1
-                hists[1][g] += 1
-                hists[2][r] += 1
-        return hists
+        return HistogramManager._bincount_channels(img)
     
     @staticmethod
     def _calculate_mono_histogram(img):
-        hist = np.zeros(256, dtype=int)
-        for pixel in img.flat:
-            hist[pixel] += 1
-        return [hist]
+        return HistogramManager._bincount_channels(img)
+    
+    @staticmethod
+    def _bincount_channels(img):
+        """
+        Wektorowe zliczanie histogramów wszystkich kanałów naraz.
+
+        Każdy kanał dostaje własny przedział 256 koszyków (kanał c -> c*256 + wartość),
+        więc jedno wywołanie np.bincount liczy wszystkie kanały w jednym przebiegu.
+        Obraz jest przetwarzany porcjami po HISTOGRAM_CHUNK_PIXELS pikseli, aby
+        tymczasowa tablica indeksów nie rosła z rozmiarem obrazu.
+
+        Parametr:
+            img: obraz numpy.ndarray (mono lub wielokanałowy), wartości 0-255
+
+        Zwraca:
+            lista histogramów (numpy.ndarray 256-elementowy, dtype=int) - po jednym na kanał
+        """
+        if img.dtype != np.uint8 and img.size and (img.min() < 0 or img.max() > 255):
+            raise ValueError("Wartości pikseli muszą być w zakresie 0-255")
+        
+        channels = 1 if img.ndim == 2 else img.shape[2]
+        flat = img.reshape(-1)
+        offsets = np.arange(channels, dtype=np.intp) * 256
+        hists = np.zeros(channels * 256, dtype=int)
+        
+        step = HISTOGRAM_CHUNK_PIXELS * channels
+        for start in range(0, flat.size, step):
+            chunk = flat[start:start + step].astype(np.intp)
+            if channels > 1:
+                chunk = (chunk.reshape(-1, channels) + offsets).reshape(-1)
+            hists += np.bincount(chunk, minlength=channels * 256)
+        
+        return list(hists.reshape(channels, 256))
     
     # @staticmethod
     # def stretch_histogram(img, saturation_percent=0):
@@ -126,77 +435,48 @@ class HistogramManager:
         if saturation_percent < 0 or saturation_percent > 5:
             raise ValueError("Przesycenie musi być w zakresie 0-5%")
         
-        # Oblicz histogram
-        hist = np.zeros(256, dtype=int)
-        for pixel in img.flat:
-            hist[pixel] += 1
-        
-        # Znajdź Lmin i Lmax
-        Lmin = 0
-        Lmax = 255
-        sem_min = False
-        sem_max = False
-        
-        if saturation_percent > 0:
-            # Z przesyceniem - szukaj Lmin
-            total_pixels = img.shape[0] * img.shape[1]
-            threshold_pixels = int((saturation_percent / 2 / 100) * total_pixels)
-            
-            accumulated = 0
-            for z in range(256):
-                if not sem_min:
-                    if hist[z] != 0:
-                        sem_min = True
-                        Lmin = z
-                accumulated += hist[z]
-                if accumulated >= threshold_pixels and hist[z] != 0:
-                    Lmin = z
-                    break
-            
-            # Szukaj Lmax
-            accumulated = 0
-            for z in range(255, -1, -1):
-                if not sem_max:
-                    if hist[z] != 0:
-                        sem_max = True
-                        Lmax = z
-                accumulated += hist[z]
-                if accumulated >= threshold_pixels and hist[z] != 0:
-                    Lmax = z
-                    break
-        else:
-            # Bez przesycenia - znajdź pierwsze i ostatnie niezerowe
-            for z in range(256):
-                if hist[z] != 0:
-                    Lmin = z
-                    break
-            
-            for z in range(255, -1, -1):
-                if hist[z] != 0:
-                    Lmax = z
-                    break
-        
-        print(f"Lmin: {Lmin}, Lmax: {Lmax}")
+        hist = HistogramManager._bincount_channels(img)[0]
+        Lmin, Lmax = HistogramManager._find_stretch_bounds(hist, saturation_percent)
         
         # Unikaj dzielenia przez zero
         if Lmax == Lmin:
             return img.copy()
         
-        # Tablica LUT dla transformacji
-        lut = np.zeros(256, dtype=np.uint8)
-        for z in range(256):
-            if z < Lmin:
-                lut[z] = 0
-            elif z > Lmax:
-                lut[z] = 255
-            else:
-                # Wzór: ((p(i,j) - Lmin) * Lmax_output) / (Lmax - Lmin)
-                lut[z] = int(((z - Lmin) * 255) / (Lmax - Lmin))
+        # Tablica LUT: ((z - Lmin) * 255) / (Lmax - Lmin), obcięta do [0, 255]
+        levels = np.arange(256, dtype=np.int64)
+        lut = np.clip((levels - Lmin) * 255 // (Lmax - Lmin), 0, 255).astype(np.uint8)
+        
+        return HistogramManager._apply_lut(img, lut)
+    
+    @staticmethod
+    def _find_stretch_bounds(hist, saturation_percent=0):
+        """
+        Wyznacza Lmin i Lmax dla rozciągania histogramu.
+
+        Bez przesycenia są to pierwszy i ostatni niezerowy poziom. Z przesyceniem -
+        pierwszy niezerowy poziom, na którym histogram skumulowany (od dołu dla Lmin,
+        od góry dla Lmax) osiąga zadany procent pikseli.
+        """
+        nonzero = hist != 0
+        occupied = np.flatnonzero(nonzero)
+        if occupied.size == 0:
+            return 0, 255
+        
+        if saturation_percent == 0:
+            return int(occupied[0]), int(occupied[-1])
+        
+        total_pixels = int(hist.sum())
+        threshold_pixels = int((saturation_percent / 2 / 100) * total_pixels)
+        
+        cumsum_low = np.cumsum(hist)
+        cumsum_high = np.cumsum(hist[::-1])[::-1]
         
-        # Zastosuj transformację
-        result = lut[img]
+        low = np.flatnonzero((cumsum_low >= threshold_pixels) & nonzero)
+        high = np.flatnonzero((cumsum_high >= threshold_pixels) & nonzero)
         
-        return result
+        Lmin = int(low[0]) if low.size else int(occupied[0])
+        Lmax = int(high[-1]) if high.size else int(occupied[-1])
+        return Lmin, Lmax
 
     @staticmethod
     def equalize_histogram(img):
@@ -213,10 +493,7 @@ class HistogramManager:
         if len(img.shape) != 2:
             raise ValueError("Obraz musi być w odcieniach szarości")
         
-        # Oblicz histogram
-        hist = np.zeros(256, dtype=int)
-        for pixel in img.flat:
-            hist[pixel] += 1
+        hist = HistogramManager._bincount_channels(img)[0]
         
         # Oblicz histogram skumulowany (CDF - Cumulative Distribution Function)
         cdf = np.cumsum(hist)
@@ -228,13 +505,26 @@ class HistogramManager:
         
         # Tablica LUT (Look-Up Table) dla transformacji
         lut = np.zeros(256, dtype=np.uint8)
-        for i in range(256):
-            if cdf[i] > 0:
-                lut[i] = np.round(((cdf[i] - cdf_min) / (total_pixels - cdf_min)) * 255)
-            else:
-                lut[i] = 0
-        
-        # Zastosuj transformację
-        result = lut[img]
+        if total_pixels > cdf_min:
+            scaled = np.round(((cdf - cdf_min) / (total_pixels - cdf_min)) * 255)
+            lut[cdf > 0] = scaled[cdf > 0]
         
-        return result
\ No newline at end of file
+        return HistogramManager._apply_lut(img, lut)
+    
+    @staticmethod
+    def _apply_lut(img, lut):
+        """
+        Stosuje tablicę LUT jednym przebiegiem po obrazie.
+
+        lut: 256 elementów (wspólna dla wszystkich kanałów) albo 256 x liczba kanałów
+             (osobna kolumna dla każdego kanału obrazu BGR)
+        """
+        if lut.ndim == 2:
+            if img.ndim != 3 or img.shape[2] != lut.shape[1]:
+                raise ValueError("Liczba kolumn tablicy LUT musi być równa liczbie kanałów obrazu")
+            if img.dtype == np.uint8:
+                return cv2.LUT(img, lut.reshape(1, 256, lut.shape[1]))
+            return lut[img, np.arange(lut.shape[1])]
+        if img.dtype == np.uint8:
+            return cv2.LUT(img, lut)
+        return lut[img]
@@ -2,7 +2,7 @@
 Operacje na histogramie - LAB3 Zadanie 1
 """
 
-import numpy as np
+from backend.PointLUT import PointLUT
 
 
 class HistogramOperations:
@@ -32,22 +32,7 @@ class HistogramOperations:
         if len(image.shape) != 2:
             raise ValueError("Obraz musi być w skali szarości")
         
-        # Walidacja parametrów
-        if p1 >= p2:
-            raise ValueError("p1 musi być mniejsze od p2")
-        if q1 >= q2:
-            raise ValueError("q1 musi być mniejsze od q2")
-        
-        # Konwersja do float dla dokładności obliczeń
-        result = image.astype(np.float32)
-        
-        # Transformacja liniowa dla WSZYSTKICH pikseli
-        # y = (x - p1) * (q2 - q1) / (p2 - p1) + q1
-        result = (result - p1) * (q2 - q1) / (p2 - p1) + q1
-        
-        # Obetnij do zakresu [q1, q2] (piksele poza [p1,p2] będą na krańcach [q1,q2])
-        # Potem obetnij do [0, 255] i konwertuj do uint8
-        result = np.clip(result, q1, q2)
-        result = np.clip(result, 0, 255).astype(np.uint8)
-        
-        return result
\ No newline at end of file
+        # Transformacja liniowa y = (x - p1) * (q2 - q1) / (p2 - p1) + q1 liczona
+        # raz dla 256 poziomów i obcięta do [q1, q2] (piksele poza [p1, p2] trafiają
+        # na krańce [q1, q2]) - walidacja parametrów w PointLUT.stretch_range
+        return PointLUT.stretch_range(p1, p2, q1, q2).apply(image)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Kontener obrazu z zapamiętanymi metadanymi (rodzaj, typ, min/max, wersja zawartości).
+
+Klasyfikacja obrazu (czy jest maską 0/1, maską 0/255, obrazem szarym czy BGR)
+wymaga przejrzenia wszystkich pikseli. Wynik jest zapamiętywany dla tablicy,
+więc kolejne sprawdzenia - w oknie podglądu, dialogach i backendzie - kosztują O(1).
+"""
+
+import threading
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+# Rodzaje obrazów
+KIND_GRAY = 'gray'
+KIND_BGR = 'bgr'
+KIND_BINARY01 = 'binary01'
+KIND_BINARY255 = 'binary255'
+KIND_MULTICHANNEL = 'multichannel'
+
+BINARY_KINDS = (KIND_BINARY01, KIND_BINARY255)
+
+ImageInfo = namedtuple('ImageInfo', ['kind', 'dtype', 'shape', 'min', 'max', 'two_level', 'version'])
+
+# Liczba pikseli bloku przy sprawdzaniu, czy obraz ma tylko dwie wartości -
+# obraz o wielu poziomach jest rozpoznawany już po pierwszym bloku
+TWO_LEVEL_BLOCK_PIXELS = 1 << 16
+
+
+class ImageData:
+    """
+    Obraz numpy.ndarray z metadanymi liczonymi raz na wersję zawartości.
+
+    Metadane są współdzielone przez wszystkie kontenery tej samej tablicy -
+    ImageData.of(img) w dowolnym miejscu aplikacji korzysta z już policzonych
+    wartości. Rejestr trzyma tylko słabą referencję do tablicy, więc zamknięty
+    obraz zwalnia pamięć, a jego wpis znika.
+
+    Po modyfikacji obrazu w miejscu należy wywołać invalidate().
+
+    Przykład:
+        data = ImageData.of(img)
+        if data.kind == KIND_BINARY01:
+            ...
+    """
+
+    # id(tablica) -> [słaba referencja, wersja, ImageInfo lub None]
+    _registry = {}
+    _lock = threading.RLock()
+
+    def __init__(self, array):
+        if array is None:
+            raise ValueError("Obraz jest pusty (None)")
+        self.array = np.asarray(array)
+
+    @classmethod
+    def of(cls, img):
+        """Kontener dla obrazu (ImageData zwracany bez zmian)"""
+        if isinstance(img, ImageData):
+            return img
+        return cls(img)
+
+    # ==================== METADANE ====================
+
+    @property
+    def info(self):
+        """ImageInfo obrazu - liczone przy pierwszym użyciu danej wersji zawartości"""
+        entry = self._entry()
+        if entry[2] is None:
+            info = self._classify(self.array, entry[1])
+            with ImageData._lock:
+                if entry[1] == info.version:
+                    entry[2] = info
+            return info
+        return entry[2]
+
+    @property
+    def kind(self):
+        return self.info.kind
+
+    @property
+    def min(self):
+        return self.info.min
+
+    @property
+    def max(self):
+        return self.info.max
+
+    @property
+    def version(self):
+        return self._entry()[1]
+
+    @property
+    def dtype(self):
+        return self.array.dtype
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    @property
+    def is_binary(self):
+        """Maska binarna (0/1 lub 0/255)"""
+        return self.kind in BINARY_KINDS
+
+    @property
+    def is_two_level(self):
+        """
+        Co najwyżej dwie różne wartości (min i max) - oprócz masek 0/1 i 0/255
+        także np. maska 1/255 lub czarno-biały obraz BGR
+        """
+        return self.info.two_level
+
+    @property
+    def is_grayscale(self):
+        """Obraz jednokanałowy (także maska binarna)"""
+        return self.array.ndim == 2
+
+    def invalidate(self):
+        """Podbija wersję zawartości i unieważnia metadane (po modyfikacji w miejscu)"""
+        with ImageData._lock:
+            entry = self._entry_locked()
+            entry[1] += 1
+            entry[2] = None
+
+    # ==================== REJESTR ====================
+
+    def _entry(self):
+        with ImageData._lock:
+            return self._entry_locked()
+
+    def _entry_locked(self):
+        array = self.array
+        key = id(array)
+        entry = ImageData._registry.get(key)
+        if entry is None or entry[0]() is not array:
+            registry = ImageData._registry
+
+            def forget(_ref, key=key):
+                with ImageData._lock:
+                    current = registry.get(key)
+                    if current is not None and current[0] is _ref:
+                        del registry[key]
+
+            entry = [weakref.ref(array, forget), 0, None]
+            registry[key] = entry
+        return entry
+
+    # ==================== KLASYFIKACJA ====================
+
+    @staticmethod
+    def _classify(array, version):
+        """Jeden przebieg min/max, a dla kandydatów na maskę 0/255 - jedno porównanie"""
+        dtype = array.dtype
+        shape = array.shape
+
+        if array.ndim == 3:
+            kind = KIND_BGR if shape[2] == 3 else KIND_MULTICHANNEL
+        elif array.ndim != 2:
+            raise ValueError(f"Nieobsługiwany kształt obrazu: {shape}")
+        else:
+            kind = KIND_GRAY
+
+        if array.size == 0:
+            return ImageInfo(kind, dtype, shape, None, None, False, version)
+
+        low, high = array.min(), array.max()
+        if kind == KIND_GRAY:
+            kind = ImageData._binary_kind(array, low, high)
+        two_level = kind in BINARY_KINDS or ImageData._is_two_level(array, low, high)
+
+        return ImageInfo(kind, dtype, shape, low.item(), high.item(), two_level, version)
+
+    @staticmethod
+    def _is_two_level(array, low, high):
+        """Czy obraz zawiera tylko wartości low i high - sprawdzanie blokami wierszy do pierwszej innej"""
+        rows = max(1, TWO_LEVEL_BLOCK_PIXELS // max(array[0].size, 1))
+        for top in range(0, array.shape[0], rows):
+            block = array[top:top + rows]
+            if np.count_nonzero((block != low) & (block != high)):
+                return False
+        return True
+
+    @staticmethod
+    def _binary_kind(array, low, high):
+        if array.dtype == np.bool_:
+            return KIND_BINARY01
+
+        exact = np.issubdtype(array.dtype, np.integer)
+        if low >= 0 and high <= 1:
+            # Dla typów całkowitych zakres [0, 1] oznacza wyłącznie wartości 0 i 1
+            if exact or not np.count_nonzero((array != 0) & (array != 1)):
+                return KIND_BINARY01
+        elif low in (0, 255) and high in (0, 255):
+            if not np.count_nonzero((array != 0) & (array != 255)):
+                return KIND_BINARY255
+        return KIND_GRAY
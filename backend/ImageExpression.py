@@ -0,0 +1,206 @@
+"""
+Wyrażenia arytmetyczne na obrazach liczone jednym przebiegiem blokami.
+
+Łańcuch operacji (np. różnica bezwzględna, potem mnożenie i dodawanie liczby)
+liczony krok po kroku tworzy pełnowymiarową tablicę int16/float32 po każdym kroku.
+ImageExpression kompiluje całą formułę i liczy ją blokami mieszczącymi się
+w pamięci podręcznej procesora - tymczasowe tablice mają rozmiar bloku,
+a wynik trafia od razu do obrazu uint8.
+"""
+
+import ast
+import operator
+
+import numpy as np
+
+# Liczba pikseli bloku - tymczasowe tablice float32 bloku mieszczą się w pamięci podręcznej L2
+EXPRESSION_BLOCK_PIXELS = 1 << 16
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _clip(x):
+    """Wysycenie w danym miejscu wyrażenia: obcięcie do 0-255 i odrzucenie części ułamkowej"""
+    return np.floor(np.clip(x, 0, 255))
+
+
+# Funkcje dostępne w wyrażeniach
+EXPRESSION_FUNCTIONS = {
+    'abs': (1, np.abs),
+    'min': (2, np.minimum),
+    'max': (2, np.maximum),
+    'floor': (1, np.floor),
+    'clip': (1, _clip),
+}
+
+
+class ImageExpression:
+    """
+    Skompilowane wyrażenie arytmetyczne na obrazach i liczbach.
+
+    Dozwolone są: nazwy zmiennych (obrazy lub liczby), stałe liczbowe, operatory
+    + - * / oraz funkcje abs(x), min(x, y), max(x, y), floor(x), clip(x).
+    Wyrażenie liczone jest w float32, bez obcinania wyników pośrednich.
+
+    Semantyka wysycenia:
+        - clip(x) - jawne wysycenie w danym miejscu wyrażenia (obcięcie do 0-255
+          i część całkowita, jak po zapisie pośredniego wyniku do uint8)
+        - saturation=True w evaluate() - wynik końcowy obcinany do 0-255
+        - saturation=False - wynik końcowy normalizowany liniowo do 0-255
+          (drugi przebieg blokami po wyznaczeniu min/max)
+    Część ułamkowa wyniku końcowego jest odrzucana, jak w pozostałych
+    operacjach arytmetycznych.
+
+    Przykład:
+        expr = ImageExpression("abs(a - b) * 2 + 10")
+        result = expr.evaluate({'a': img1, 'b': img2})
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Niepoprawne wyrażenie: {expression}\n{e.msg}")
+
+        self.names = set()
+        self._evaluate_block = self._compile(tree.body)
+
+    def _compile(self, node):
+        """Zamienia węzeł drzewa składni na funkcję zmienne -> wartość bloku"""
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            if abs(node.value) > float(np.finfo(np.float32).max):
+                raise ValueError(f"Stała {node.value} przekracza zakres liczb float32")
+            value = np.float32(node.value)
+            return lambda variables: value
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name in EXPRESSION_FUNCTIONS:
+                raise ValueError(f"'{name}' jest funkcją - użyj {name}(...)")
+            self.names.add(name)
+            return lambda variables: variables[name]
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            op = _BINARY_OPERATORS[type(node.op)]
+            if isinstance(node.op, ast.Div) and isinstance(node.right, ast.Constant) \
+                    and node.right.value == 0:
+                raise ValueError("Nie można dzielić przez zero!")
+            left = self._compile(node.left)
+            right = self._compile(node.right)
+            return lambda variables: op(left(variables), right(variables))
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            op = _UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand)
+            return lambda variables: op(operand(variables))
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+                and node.func.id in EXPRESSION_FUNCTIONS and not node.keywords:
+            arity, func = EXPRESSION_FUNCTIONS[node.func.id]
+            if len(node.args) != arity:
+                raise ValueError(f"Funkcja {node.func.id} przyjmuje {arity} argument(y)")
+            args = [self._compile(arg) for arg in node.args]
+            return lambda variables: func(*(arg(variables) for arg in args))
+
+        raise ValueError(f"Niedozwolony element wyrażenia: {ast.unparse(node)}")
+
+    def evaluate(self, variables, saturation=True, block_pixels=EXPRESSION_BLOCK_PIXELS):
+        """
+        Liczy wyrażenie dla podanych zmiennych.
+
+        Parametry:
+            variables: słownik nazwa -> obraz numpy.ndarray lub liczba;
+                       wszystkie obrazy muszą mieć identyczny kształt
+            saturation: True - obcięcie wyniku do 0-255,
+                        False - normalizacja wyniku do 0-255
+            block_pixels: liczba pikseli liczonych naraz
+
+        Zwraca:
+            obraz uint8
+        """
+        images, scalars = self._split_variables(variables)
+        shape = next(iter(images.values())).shape
+        pixels_per_row = int(np.prod(shape[1:], dtype=np.int64))
+        rows = max(1, block_pixels // max(pixels_per_row, 1))
+
+        def blocks():
+            for top in range(0, shape[0], rows):
+                block_vars = dict(scalars)
+                for name, img in images.items():
+                    block_vars[name] = img[top:top + rows].astype(np.float32)
+                with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                    values = self._evaluate_block(block_vars)
+                # Dzielenie przez zero i przepełnienie float32: ±inf (obcinane),
+                # wartości nieokreślone (0/0, inf - inf, 0 * inf) -> 0
+                values = np.nan_to_num(values, nan=0.0, posinf=np.inf, neginf=-np.inf)
+                values = np.broadcast_to(values, (min(rows, shape[0] - top),) + shape[1:])
+                yield top, values
+
+        result = np.empty(shape, dtype=np.uint8)
+
+        if saturation:
+            for top, values in blocks():
+                result[top:top + len(values)] = np.clip(values, 0, 255)
+            return result
+
+        # Bez wysycenia: pierwszy przebieg - zakres wyniku, drugi - normalizacja
+        low, high = np.inf, -np.inf
+        for _, values in blocks():
+            finite = values[np.isfinite(values)]
+            if finite.size:
+                low = min(low, float(finite.min()))
+                high = max(high, float(finite.max()))
+
+        if not np.isfinite(low) or high == low:
+            result[:] = 128 if np.isfinite(low) else 0
+            return result
+
+        scale = np.float32(255 / (high - low))
+        for top, values in blocks():
+            with np.errstate(over='ignore'):
+                result[top:top + len(values)] = np.clip((values - np.float32(low)) * scale, 0, 255)
+        return result
+
+    def _split_variables(self, variables):
+        """Dzieli zmienne na obrazy i liczby, sprawdza kompletność i rozmiary"""
+        missing = sorted(self.names - set(variables))
+        if missing:
+            raise ValueError(f"Brak wartości zmiennych: {', '.join(missing)}")
+
+        images, scalars = {}, {}
+        for name in self.names:
+            value = variables[name]
+            if isinstance(value, np.ndarray) and value.ndim > 0:
+                images[name] = value
+            elif np.isscalar(value) and np.isreal(value) and not isinstance(value, (bool, str)):
+                scalars[name] = np.float32(value)
+            else:
+                raise ValueError(f"Zmienna {name} musi być obrazem lub liczbą")
+
+        if not images:
+            raise ValueError("Wyrażenie musi zawierać co najmniej jeden obraz")
+
+        names = sorted(images)
+        base = images[names[0]]
+        if base.ndim not in (2, 3):
+            raise ValueError(f"Obraz {names[0]} musi być w odcieniach szarości lub kolorowy")
+        for name in names[1:]:
+            img = images[name]
+            if img.shape != base.shape:
+                raise ValueError(f"Obrazy muszą mieć identyczny rozmiar.\n"
+                                 f"Obraz {names[0]}: {base.shape[1]}x{base.shape[0]}\n"
+                                 f"Obraz {name}: {img.shape[1]}x{img.shape[0]}")
+
+        return images, scalars
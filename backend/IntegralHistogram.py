@@ -0,0 +1,135 @@
+"""
+Histogram całkowy (integral histogram) - histogramy i statystyki dowolnych
+prostokątnych obszarów obrazu w czasie stałym względem rozmiaru obszaru.
+"""
+
+import numpy as np
+
+from backend.Histogram import HistogramManager
+
+
+class IntegralHistogram:
+    """
+    Histogram całkowy obrazu w skali szarości.
+
+    Tablica table[y, x, b] przechowuje liczbę pikseli z koszyka b w prostokącie
+    [0, y) x [0, x). Histogram dowolnego prostokąta to kombinacja czterech
+    narożników tablicy - koszt O(liczba koszyków), niezależny od rozmiaru obszaru.
+
+    Pamięć tablicy to (H+1)*(W+1)*bins*4 bajty, dlatego dla dużych obrazów
+    warto użyć IntegralHistogram.bounded(), który kwantyzuje jasność do mniejszej
+    liczby koszyków.
+    """
+
+    def __init__(self, img, bins=256):
+        """
+        Parametry:
+            img: obraz numpy.ndarray (grayscale, wartości 0-255)
+            bins: liczba koszyków (potęga dwójki z zakresu 1-256)
+        """
+        if img is None:
+            raise ValueError("Obraz jest pusty (None)")
+        if len(img.shape) != 2:
+            raise ValueError("Obraz musi być w odcieniach szarości")
+        if bins < 1 or bins > 256 or bins & (bins - 1):
+            raise ValueError("Liczba koszyków musi być potęgą dwójki z zakresu 1-256")
+
+        self.bins = bins
+        self.height, self.width = img.shape
+
+        # Wartość reprezentowana przez koszyk - środek przedziału jasności
+        bin_width = 256 // bins
+        if bin_width == 1:
+            self.bin_values = np.arange(256)
+        else:
+            self.bin_values = np.arange(bins) * bin_width + (bin_width - 1) / 2
+
+        self.table = self._build_table(img, bins)
+
+    @classmethod
+    def bounded(cls, img, max_bytes=256 * 1024 * 1024):
+        """
+        Tworzy histogram całkowy mieszczący się w zadanym limicie pamięci.
+
+        Wybiera największą liczbę koszyków (256, 128, ..., 1), dla której tablica
+        nie przekracza max_bytes.
+        """
+        h, w = img.shape[:2]
+        cell_bytes = (h + 1) * (w + 1) * np.dtype(cls._count_dtype(h, w)).itemsize
+
+        bins = 256
+        while bins > 1 and cell_bytes * bins > max_bytes:
+            bins //= 2
+
+        if cell_bytes * bins > max_bytes:
+            raise ValueError(
+                f"Obraz {w}x{h} nie mieści się w limicie {max_bytes / 1024**2:.0f} MB "
+                "nawet przy jednym koszyku"
+            )
+
+        return cls(img, bins)
+
+    @staticmethod
+    def _count_dtype(height, width):
+        """Najmniejszy typ mieszczący liczbę pikseli obrazu"""
+        return np.uint32 if height * width < 2**32 else np.uint64
+
+    @staticmethod
+    def _build_table(img, bins):
+        """Jeden przebieg po wierszach: table[y+1] = table[y] + skumulowany histogram wiersza y"""
+        h, w = img.shape
+        dtype = IntegralHistogram._count_dtype(h, w)
+        shift = 8 - (bins.bit_length() - 1)
+
+        table = np.zeros((h + 1, w + 1, bins), dtype=dtype)
+        row_counts = np.zeros((w, bins), dtype=dtype)
+        columns = np.arange(w)
+
+        for y in range(h):
+            quantized = img[y].astype(np.intp) >> shift
+            row_counts[:] = 0
+            row_counts[columns, quantized] = 1
+            np.cumsum(row_counts, axis=0, out=table[y + 1, 1:])
+            table[y + 1, 1:] += table[y, 1:]
+
+        return table
+
+    def _validate_region(self, x, y, width, height):
+        if width <= 0 or height <= 0:
+            raise ValueError("Obszar musi mieć dodatnią szerokość i wysokość")
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            raise ValueError(
+                f"Obszar ({x}, {y}, {width}x{height}) wykracza poza obraz "
+                f"{self.width}x{self.height}"
+            )
+
+    def region_histogram(self, x, y, width, height):
+        """
+        Histogram prostokątnego obszaru.
+
+        Parametry:
+            x, y: lewy górny róg obszaru
+            width, height: rozmiar obszaru
+
+        Zwraca:
+            numpy.ndarray o długości self.bins (dtype=int)
+        """
+        self._validate_region(x, y, width, height)
+        t = self.table
+        x2, y2 = x + width, y + height
+
+        # Arytmetyka modulo 2^n typu bez znaku daje poprawny, nieujemny wynik
+        hist = t[y2, x2] - t[y, x2] - t[y2, x] + t[y, x]
+        return hist.astype(int)
+
+    def region_stats(self, x, y, width, height):
+        """
+        Statystyki prostokątnego obszaru.
+
+        Zwraca:
+            Histogram namedtuple (jak HistogramManager.calculate_histograms);
+            dla skwantyzowanej wersji średnia, mediana i odchylenie liczone są
+            dla środków przedziałów jasności
+        """
+        hist = self.region_histogram(x, y, width, height)
+        return HistogramManager._calculate_histogram_stats([hist], self.bin_values)[0]
@@ -1,6 +1,17 @@
 import numpy as np
 from functools import wraps
 
+# Liczba pikseli przetwarzanych naraz przez combine() - blok wyniku mieści się
+# w pamięci podręcznej procesora, gdy składane są kolejne obrazy
+LOGICAL_BLOCK_PIXELS = 1 << 18
+
+# Operacje bitowe obsługiwane przez combine()
+LOGICAL_OPERATIONS = {
+    "AND": np.bitwise_and,
+    "OR": np.bitwise_or,
+    "XOR": np.bitwise_xor,
+}
+
 
 def validate_binary_operation(func):
     """
@@ -27,13 +38,18 @@ def validate_binary_operation(func):
 
 
 class LogicalOperations:
-    """Operacje logiczne na obrazach monochromatycznych i binarnych"""
+    """
+    Operacje logiczne na obrazach monochromatycznych i binarnych.
+    
+    Operacje działają bit po bicie na bitach o tej samej wadze, a wynik jest
+    obrazem uint8. Bity wyniku zależą tylko od 8 najmłodszych bitów argumentów,
+    więc obrazy całkowitoliczbowe innych typów są najpierw rzutowane na uint8.
+    """
     
     @staticmethod
     def logical_not(img):
         """
         Operacja logiczna NOT (negacja bitowa).
-        Działa w pętli bit po bicie na każdym pikselu.
         
         Parametr:
             img: obraz numpy.ndarray (grayscale lub binary)
@@ -44,24 +60,17 @@ class LogicalOperations:
         if len(img.shape) != 2:
             raise ValueError("Obraz musi być w odcieniach szarości")
         
-        # Przygotuj tablicę wynikową
-        result = np.zeros_like(img, dtype=np.uint8)
-        height, width = img.shape
-        
-        # Pętla po pikselach
-        for i in range(height):
-            for j in range(width):
-                # Operacja bitowa NOT na całym bajcie
-                result[i, j] = ~img[i, j] & 0xFF  # & 0xFF zapewnia uint8
+        if img.dtype == np.bool_:
+            # Negacja wartości logicznej: True -> 0, False -> 1
+            return np.logical_not(img).astype(np.uint8)
         
-        return result
+        return np.invert(LogicalOperations._as_uint8(img))
     
     @staticmethod
     @validate_binary_operation
     def logical_and(img1, img2):
         """
         Operacja logiczna AND.
-        Działa w pętli bit po bicie na odpowiednich pikselach.
         
         Parametry:
             img1, img2: obrazy numpy.ndarray (grayscale lub binary)
@@ -69,26 +78,13 @@ class LogicalOperations:
         Zwraca:
             obraz po operacji AND
         """
-        height, width = img1.shape
-        
-        # Przygotuj tablicę wynikową
-        result = np.zeros_like(img1, dtype=np.uint8)
-        
-        # Pętla po pikselach - działanie na odpowiednich pikselach
-        for i in range(height):
-            for j in range(width):
-                # Operacja bitowa AND - w pętli bit po bicie
-                # Działamy na bitach o tej samej wadze
-                result[i, j] = img1[i, j] & img2[i, j]
-        
-        return result
+        return LogicalOperations.combine([img1, img2], "AND")
     
     @staticmethod
     @validate_binary_operation
     def logical_or(img1, img2):
         """
         Operacja logiczna OR.
-        Działa w pętli bit po bicie na odpowiednich pikselach.
         
         Parametry:
             img1, img2: obrazy numpy.ndarray (grayscale lub binary)
@@ -96,23 +92,13 @@ class LogicalOperations:
         Zwraca:
             obraz po operacji OR
         """
-        height, width = img1.shape
-        result = np.zeros_like(img1, dtype=np.uint8)
-        
-        # Pętla po pikselach
-        for i in range(height):
-            for j in range(width):
-                # Operacja bitowa OR - działanie na bitach o tej samej wadze
-                result[i, j] = img1[i, j] | img2[i, j]
-        
-        return result
+        return LogicalOperations.combine([img1, img2], "OR")
     
     @staticmethod
     @validate_binary_operation
     def logical_xor(img1, img2):
         """
         Operacja logiczna XOR (exclusive OR).
-        Działa w pętli bit po bicie na odpowiednich pikselach.
         
         Parametry:
             img1, img2: obrazy numpy.ndarray (grayscale lub binary)
@@ -120,13 +106,66 @@ class LogicalOperations:
         Zwraca:
             obraz po operacji XOR
         """
-        height, width = img1.shape
-        result = np.zeros_like(img1, dtype=np.uint8)
+        return LogicalOperations.combine([img1, img2], "XOR")
+    
+    @staticmethod
+    def combine(images, operation):
+        """
+        Operacja logiczna na dowolnej liczbie obrazów: obraz1 OP obraz2 OP ... OP obrazN.
         
-        # Pętla po pikselach
-        for i in range(height):
-            for j in range(width):
-                # Operacja bitowa XOR - działanie na bitach o tej samej wadze
-                result[i, j] = img1[i, j] ^ img2[i, j]
+        Wynik jest zapisywany do jednego bufora, bez obrazów pośrednich. Obraz jest
+        przetwarzany blokami wierszy - każdy blok wyniku jest składany ze wszystkich
+        obrazów, zanim algorytm przejdzie do następnego.
         
-        return result
\ No newline at end of file
+        Parametry:
+            images: lista obrazów numpy.ndarray (grayscale lub binary, ten sam rozmiar)
+            operation: "AND", "OR" lub "XOR"
+        
+        Zwraca:
+            obraz uint8 - identyczny z kolejnym składaniem parami
+        """
+        if operation not in LOGICAL_OPERATIONS:
+            raise ValueError(f"Nieznana operacja logiczna: {operation} "
+                           f"(dostępne: {', '.join(LOGICAL_OPERATIONS)})")
+        LogicalOperations._validate_images(images)
+        
+        op = LOGICAL_OPERATIONS[operation]
+        images = [LogicalOperations._as_uint8(img) for img in images]
+        if len(images) == 1:
+            return images[0].copy()
+        
+        height, width = images[0].shape
+        result = np.empty((height, width), dtype=np.uint8)
+        rows = max(1, LOGICAL_BLOCK_PIXELS // max(width, 1))
+        
+        for top in range(0, height, rows):
+            block = result[top:top + rows]
+            op(images[0][top:top + rows], images[1][top:top + rows], out=block)
+            for img in images[2:]:
+                op(block, img[top:top + rows], out=block)
+        
+        return result
+    
+    @staticmethod
+    def _validate_images(images):
+        """Sprawdza, czy obrazy są jednokanałowe i mają identyczny rozmiar"""
+        if len(images) == 0:
+            raise ValueError("Wybierz co najmniej jeden obraz")
+        
+        for i, img in enumerate(images, start=1):
+            if len(img.shape) != 2:
+                raise ValueError(f"Obraz {i} musi być w odcieniach szarości")
+        
+        base_shape = images[0].shape
+        for i, img in enumerate(images[1:], start=2):
+            if img.shape != base_shape:
+                raise ValueError(f"Obrazy muszą mieć identyczny rozmiar.\n"
+                               f"Obraz 1: {base_shape[1]}x{base_shape[0]}\n"
+                               f"Obraz {i}: {img.shape[1]}x{img.shape[0]}")
+    
+    @staticmethod
+    def _as_uint8(img):
+        """Obraz jako uint8 (8 najmłodszych bitów); bez kopii, jeśli już jest uint8"""
+        if img.dtype != np.bool_ and not np.issubdtype(img.dtype, np.integer):
+            raise ValueError("Operacje logiczne wymagają obrazów o wartościach całkowitych")
+        return img.astype(np.uint8, copy=False)
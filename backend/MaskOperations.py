@@ -1,5 +1,8 @@
 import numpy as np
 
+from backend.ImageData import ImageData, KIND_BINARY01, BINARY_KINDS
+from backend.PackedMask import PackedMask
+
 
 class MaskOperations:
     """Operacje konwersji masek binarnych"""
@@ -18,12 +21,11 @@ class MaskOperations:
         if len(img.shape) != 2:
             raise ValueError("Obraz musi być w odcieniach szarości")
         
-        # Sprawdź czy to maska binarna (wartości 0/1)
-        unique_values = np.unique(img)
-        if not np.all(np.isin(unique_values, [0, 1])):
+        # Sprawdź czy to maska binarna (wartości 0/1) - rodzaj zapamiętany w ImageData
+        if ImageData.of(img).kind != KIND_BINARY01:
             raise ValueError(
                 "Obraz nie jest maską binarną (0/1).\n"
-                f"Znalezione wartości: {unique_values}\n\n"
+                f"Znalezione wartości: {np.unique(img)}\n\n"
                 "Użyj progowania aby utworzyć maskę binarną."
             )
         
@@ -46,16 +48,36 @@ class MaskOperations:
         if len(img.shape) != 2:
             raise ValueError("Obraz musi być w odcieniach szarości")
         
-        # Sprawdź czy to maska 8-bitowa (wartości 0/255)
-        unique_values = np.unique(img)
-        if not np.all(np.isin(unique_values, [0, 255])):
+        # Sprawdź czy to maska 8-bitowa (wartości 0/255); obraz samych zer
+        # jest klasyfikowany jako maska 0/1, ale jest też poprawną maską 0/255
+        data = ImageData.of(img)
+        if data.kind not in BINARY_KINDS or data.max == 1:
             raise ValueError(
                 "Obraz nie jest maską 8-bitową (0/255).\n"
-                f"Znalezione wartości: {unique_values}\n\n"
+                f"Znalezione wartości: {np.unique(img)}\n\n"
                 "Użyj progowania binarnego aby utworzyć maskę."
             )
         
         # Konwersja: 0→0, 255→1
         result = (img // 255).astype(np.uint8)
         
-        return result
\ No newline at end of file
+        return result
+    
+    @staticmethod
+    def to_packed_mask(img):
+        """
+        Pakuje maskę (0/1 lub 0/255) do postaci bitowej - jeden bit na piksel.
+        
+        Parametr:
+            img: maska numpy.ndarray (grayscale, 0/1 lub 0/255)
+        
+        Zwraca:
+            PackedMask
+        """
+        if len(img.shape) != 2:
+            raise ValueError("Obraz musi być w odcieniach szarości")
+        
+        # Maska 0/1 ma maksimum 1, maska 0/255 - maksimum 255
+        if ImageData.of(img).max == 255:
+            return PackedMask.from_8bit(img)
+        return PackedMask.from_binary(img)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 
+from backend.ImageData import ImageData
+
 
 class MorphologyOperations:
     """
@@ -25,8 +27,10 @@ class MorphologyOperations:
         if len(image.shape) != 2:
             raise ValueError("Obraz musi być w skali szarości (2D)")
         
-        unique_values = np.unique(image)
-        if not (len(unique_values) <= 2 and all(v in [0, 1, 255] for v in unique_values)):
+        # Rodzaj obrazu zapamiętany w ImageData - maski 0/1 i 0/255 bez skanowania
+        # przy każdym wywołaniu; akceptowana jest też maska 1/255
+        data = ImageData.of(image)
+        if not (data.is_two_level and data.min in (0, 1, 255) and data.max in (0, 1, 255)):
             raise ValueError("Obraz musi być binarny (wartości 0 i 1 lub 0 i 255)")
     
     @staticmethod
@@ -0,0 +1,150 @@
+"""
+Maska binarna upakowana bitowo - jeden bit na piksel.
+
+Maska uint8 (0/1 lub 0/255) zajmuje bajt na piksel; upakowana zajmuje 8 razy mniej
+pamięci, a operacje logiczne i zliczanie pikseli działają bezpośrednio na słowach
+64-bitowych - po 64 piksele naraz.
+"""
+
+import numpy as np
+
+# Bajty w słowie, którym przetwarzane są upakowane wiersze
+WORD_BYTES = 8
+
+
+class PackedMask:
+    """
+    Maska binarna upakowana bitowo.
+
+    Każdy wiersz maski jest pakowany osobno (np.packbits) i dopełniany zerami do
+    pełnych słów 64-bitowych, więc words ma kształt (wysokość, słowa na wiersz).
+    Bity dopełnienia są zawsze zerowe - dzięki temu count() i porównania nie
+    wymagają maskowania końcówek wierszy.
+
+    Przykład:
+        a = PackedMask.from_8bit(mask1)
+        b = PackedMask.from_8bit(mask2)
+        common = (a & ~b).count()
+        result = (a | b).to_8bit()
+    """
+
+    def __init__(self, words, shape):
+        """
+        Parametry:
+            words: numpy.ndarray uint64 (wysokość, słowa na wiersz) - upakowane wiersze
+            shape: (wysokość, szerokość) maski w pikselach
+        """
+        height, width = shape
+        words_per_row = -(-width // (8 * WORD_BYTES))
+        if words.dtype != np.uint64 or words.shape != (height, words_per_row):
+            raise ValueError(f"Niepoprawne słowa maski {words.shape} ({words.dtype}) "
+                             f"dla rozmiaru {width}x{height}")
+        self.words = words
+        self.shape = (height, width)
+
+    # ==================== KONWERSJE ====================
+
+    @classmethod
+    def from_array(cls, mask):
+        """Pakuje dowolny obraz jednokanałowy: piksel niezerowy -> 1, zerowy -> 0"""
+        if len(mask.shape) != 2:
+            raise ValueError("Maska musi być obrazem jednokanałowym")
+
+        height, width = mask.shape
+        row_bytes = -(-width // (8 * WORD_BYTES)) * WORD_BYTES
+
+        packed = np.zeros((height, row_bytes), dtype=np.uint8)
+        if width:
+            packed[:, :-(-width // 8)] = np.packbits(mask != 0, axis=1)
+        return cls(packed.view(np.uint64), (height, width))
+
+    @classmethod
+    def from_binary(cls, mask):
+        """Pakuje maskę binarną (0/1)"""
+        cls._validate_values(mask, 1, "Obraz nie jest maską binarną (0/1)")
+        return cls.from_array(mask)
+
+    @classmethod
+    def from_8bit(cls, mask):
+        """Pakuje maskę 8-bitową (0/255)"""
+        cls._validate_values(mask, 255, "Obraz nie jest maską 8-bitową (0/255)")
+        return cls.from_array(mask)
+
+    @staticmethod
+    def _validate_values(mask, high, message):
+        if len(mask.shape) != 2:
+            raise ValueError("Maska musi być obrazem jednokanałowym")
+        # Jedno porównanie na piksel zamiast sortowania przez np.unique
+        invalid = np.count_nonzero((mask != 0) & (mask != high))
+        if invalid:
+            raise ValueError(f"{message}.\nPikseli o innych wartościach: {invalid}")
+
+    def to_bool(self):
+        """Rozpakowuje maskę do tablicy bool"""
+        height, width = self.shape
+        unpacked = np.unpackbits(self.words.view(np.uint8), axis=1, count=width)
+        return unpacked.view(np.bool_).reshape(height, width)
+
+    def to_binary(self):
+        """Rozpakowuje maskę do formatu 0/1 (uint8)"""
+        height, width = self.shape
+        return np.unpackbits(self.words.view(np.uint8), axis=1, count=width).reshape(height, width)
+
+    def to_8bit(self):
+        """Rozpakowuje maskę do formatu 0/255 (uint8)"""
+        result = self.to_binary()
+        result *= 255
+        return result
+
+    # ==================== OPERACJE NA SŁOWACH ====================
+
+    def count(self):
+        """Liczba pikseli o wartości 1 (popcount słów)"""
+        return int(np.bitwise_count(self.words).sum(dtype=np.int64))
+
+    def _check_compatible(self, other):
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        if other.shape != self.shape:
+            raise ValueError(f"Maski muszą mieć identyczny rozmiar.\n"
+                             f"Maska 1: {self.shape[1]}x{self.shape[0]}\n"
+                             f"Maska 2: {other.shape[1]}x{other.shape[0]}")
+        return None
+
+    def __and__(self, other):
+        if self._check_compatible(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.words & other.words, self.shape)
+
+    def __or__(self, other):
+        if self._check_compatible(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.words | other.words, self.shape)
+
+    def __xor__(self, other):
+        if self._check_compatible(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.words ^ other.words, self.shape)
+
+    def __invert__(self):
+        # Negacja nie może ustawić bitów dopełnienia
+        return PackedMask(~self.words & self._row_mask(), self.shape)
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        return self.shape == other.shape and np.array_equal(self.words, other.words)
+
+    __hash__ = None
+
+    def _row_mask(self):
+        """Słowa wiersza z jedynkami na pozycjach pikseli i zerami w dopełnieniu"""
+        return PackedMask.from_array(np.ones((1, self.shape[1]), dtype=np.uint8)).words
+
+    @property
+    def nbytes(self):
+        """Rozmiar upakowanej maski w bajtach"""
+        return self.words.nbytes
+
+    def __repr__(self):
+        return f"PackedMask({self.shape[1]}x{self.shape[0]}, {self.count()} pikseli = 1)"
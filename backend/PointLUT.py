@@ -0,0 +1,301 @@
+"""
+Silnik tablic LUT dla operacji punktowych.
+
+Operacja punktowa na obrazie 8-bitowym zależy tylko od wartości piksela, więc
+można ją zapisać jako 256-elementową tablicę. Łańcuch takich operacji składa się
+w jedną tablicę (złożenie funkcji) i wykonuje jednym przebiegiem po obrazie,
+bez tymczasowych tablic float dla każdego kroku.
+
+Obrazy BGR są obsługiwane bez rozdzielania kanałów: wspólna tablica albo tablica
+osobna dla każdego kanału (PointLUT.per_channel) trafia do cv2.LUT, które
+przetwarza piksele z przeplotem kanałów w jednym przebiegu.
+"""
+
+import cv2
+import numpy as np
+
+from backend.Histogram import HistogramManager
+
+# Wszystkie możliwe wartości piksela 8-bitowego
+LEVELS = np.arange(256)
+
+
+class PointLUT:
+    """
+    Pojedyncza operacja punktowa.
+
+    Zwykle jest to gotowa tablica 256 x uint8. Operacje, których wynik zależy od
+    zakresu jasności obrazu (np. dodawanie bez wysycenia, które normalizuje wynik
+    do 0-255), zamiast tablicy mają funkcję builder(min, max) -> tablica;
+    LUTPipeline wywołuje ją z zakresem obrazu pośredniego w danym miejscu łańcucha.
+
+    Dla obrazu BGR zwykła operacja jest wspólna dla wszystkich kanałów (zakres
+    jasności liczony z całego obrazu, więc proporcje kolorów są zachowane);
+    PointLUT.per_channel tworzy operację z osobną tablicą dla każdego kanału.
+    """
+
+    def __init__(self, table=None, builder=None, channels=None):
+        if sum(arg is not None for arg in (table, builder, channels)) != 1:
+            raise ValueError("Podaj tablicę LUT, funkcję budującą tablicę albo operacje dla kanałów")
+        if table is not None:
+            table = np.asarray(table)
+            if table.shape != (256,):
+                raise ValueError("Tablica LUT musi mieć 256 elementów")
+            table = table.astype(np.uint8)
+        if channels is not None:
+            channels = list(channels)
+            if any(step.channels is not None for step in channels):
+                raise ValueError("Operacje dla kanałów nie mogą być zagnieżdżone")
+        self.table = table
+        self.builder = builder
+        self.channels = channels
+
+    @property
+    def data_dependent(self):
+        """Czy tablica zależy od zakresu jasności obrazu"""
+        if self.channels is not None:
+            return any(step.data_dependent for step in self.channels)
+        return self.builder is not None
+
+    @staticmethod
+    def per_channel(*steps):
+        """
+        Osobna operacja dla każdego kanału obrazu BGR.
+
+        Przykład:
+            PointLUT.per_channel(PointLUT.negate(), PointLUT.posterize(4), PointLUT.negate())
+
+        Operacje zależne od zakresu jasności używają wtedy zakresu swojego kanału.
+        """
+        if not steps:
+            raise ValueError("Podaj co najmniej jedną operację")
+        return PointLUT(channels=steps)
+
+    @staticmethod
+    def from_values(factory, values, img):
+        """
+        Operacja z parametrem wspólnym albo osobnym dla każdego kanału.
+
+        Parametry:
+            factory: funkcja parametr -> PointLUT (np. PointLUT.posterize)
+            values: jedna wartość (tablica wspólna) albo po jednej na kanał (B, G, R)
+            img: obraz, do którego operacja będzie zastosowana
+        """
+        if np.ndim(values) == 0:
+            return factory(values)
+
+        channels = 1 if img.ndim == 2 else img.shape[2]
+        if len(values) != channels:
+            raise ValueError(f"Podaj jedną wartość albo po jednej dla każdego kanału "
+                             f"(obraz ma {channels} kan.)")
+        return PointLUT.per_channel(*(factory(value) for value in values))
+
+    def for_channel(self, channel):
+        """Operacja stosowana do kanału o numerze `channel`"""
+        if self.channels is None:
+            return self
+        if channel >= len(self.channels):
+            raise ValueError(f"Brak operacji dla kanału {channel} "
+                             f"(zdefiniowano {len(self.channels)})")
+        return self.channels[channel]
+
+    def then(self, other):
+        """Łańcuch: najpierw ta operacja, potem `other`"""
+        return LUTPipeline([self]).then(other)
+
+    def apply(self, img):
+        """Stosuje operację do obrazu jednym przebiegiem"""
+        return LUTPipeline([self]).apply(img)
+
+    # ==================== OPERACJE PUNKTOWE ====================
+
+    @staticmethod
+    def negate():
+        """Negacja: 255 - p"""
+        return PointLUT(255 - LEVELS)
+
+    @staticmethod
+    def posterize(levels):
+        """Posteryzacja do `levels` poziomów szarości"""
+        if levels < 2 or levels > 256:
+            raise ValueError("Liczba poziomów musi być w zakresie 2-256")
+
+        step = 256 / levels
+        return PointLUT(np.clip(np.floor(LEVELS / step) * step, 0, 255))
+
+    @staticmethod
+    def threshold_binary(threshold):
+        """Progowanie binarne: p >= próg -> 255, w przeciwnym razie 0"""
+        PointLUT._validate_threshold(threshold)
+        return PointLUT(np.where(LEVELS >= threshold, 255, 0))
+
+    @staticmethod
+    def threshold_with_levels(threshold):
+        """Progowanie z zachowaniem poziomów: p >= próg -> p, w przeciwnym razie 0"""
+        PointLUT._validate_threshold(threshold)
+        return PointLUT(np.where(LEVELS >= threshold, LEVELS, 0))
+
+    @staticmethod
+    def stretch_range(p1, p2, q1, q2):
+        """Rozciąganie zakresu [p1, p2] na [q1, q2] (jak HistogramOperations.stretch_histogram_range)"""
+        if p1 >= p2:
+            raise ValueError("p1 musi być mniejsze od p2")
+        if q1 >= q2:
+            raise ValueError("q1 musi być mniejsze od q2")
+
+        values = LEVELS.astype(np.float32)
+        values = (values - p1) * (q2 - q1) / (p2 - p1) + q1
+        values = np.clip(values, q1, q2)
+        return PointLUT(np.clip(values, 0, 255))
+
+    @staticmethod
+    def add_scalar(scalar, saturation=True):
+        """
+        Dodawanie liczby.
+        Z wysyceniem wynik jest obcinany do 0-255, bez wysycenia - normalizowany
+        liniowo z zakresu [min + scalar, max + scalar] do 0-255.
+        """
+        if saturation:
+            return PointLUT(np.clip(LEVELS.astype(np.int16) + scalar, 0, 255))
+
+        def builder(lo, hi):
+            if hi == lo:
+                return np.full(256, 128, dtype=np.uint8)
+            # (p + scalar - (lo + scalar)) * 255 / (hi - lo), w typie int64 bez przepełnienia
+            values = (LEVELS - lo) * 255 / (hi - lo)
+            return np.clip(values, 0, 255).astype(np.uint8)
+
+        return PointLUT(builder=builder)
+
+    @staticmethod
+    def multiply_scalar(scalar, saturation=True):
+        """
+        Mnożenie przez liczbę.
+        Bez wysycenia (scalar > 1) obraz jest najpierw normalizowany do zakresu
+        [0, 255 // scalar] (cv2.NORM_MINMAX), żeby iloczyn nie przekroczył 255.
+        """
+        if scalar == 0:
+            return PointLUT(np.zeros(256))
+
+        if saturation:
+            return PointLUT(np.clip(LEVELS.astype(np.float32) * scalar, 0, 255))
+
+        if scalar <= 1:
+            return PointLUT((LEVELS.astype(np.float32) * scalar).astype(np.uint8))
+
+        max_scale_value = 255 // scalar
+
+        def builder(lo, hi):
+            # cv2.normalize zależy tylko od min/max - normalizujemy rampę lo..hi
+            ramp = np.arange(lo, hi + 1, dtype=np.uint8).reshape(1, -1)
+            scaled = cv2.normalize(ramp, None, 0, max_scale_value, cv2.NORM_MINMAX)
+            table = np.zeros(256, dtype=np.uint8)
+            table[lo:hi + 1] = (scaled.astype(np.float32) * scalar).astype(np.uint8).ravel()
+            return table
+
+        return PointLUT(builder=builder)
+
+    @staticmethod
+    def divide_scalar(scalar):
+        """Dzielenie przez liczbę (bez wysycenia - wynik zawsze mieści się w 0-255)"""
+        if scalar == 0:
+            raise ValueError("Nie można dzielić przez zero!")
+        return PointLUT((LEVELS.astype(np.float32) / scalar).astype(np.uint8))
+
+    @staticmethod
+    def _validate_threshold(threshold):
+        if threshold < 0 or threshold > 255:
+            raise ValueError("Próg musi być w zakresie 0-255")
+
+
+class LUTPipeline:
+    """
+    Łańcuch operacji punktowych złożony w jedną tablicę LUT.
+
+    Przykład:
+        pipeline = PointLUT.negate().then(PointLUT.posterize(8)).then(PointLUT.threshold_binary(100))
+        result = pipeline.apply(img)  # jeden przebieg po obrazie zamiast trzech
+    """
+
+    def __init__(self, steps=None):
+        self.steps = list(steps or [])
+
+    def then(self, step):
+        """Zwraca nowy łańcuch z dodaną operacją (PointLUT lub LUTPipeline) na końcu"""
+        if isinstance(step, LUTPipeline):
+            return LUTPipeline(self.steps + step.steps)
+        return LUTPipeline(self.steps + [step])
+
+    @property
+    def data_dependent(self):
+        return any(step.data_dependent for step in self.steps)
+
+    def compile(self, histograms=None, channels=1):
+        """
+        Składa łańcuch w jedną tablicę LUT.
+
+        Parametry:
+            histograms: lista histogramów kanałów obrazu wejściowego - wymagana,
+                        jeśli któraś operacja zależy od zakresu jasności; zakres
+                        obrazu pośredniego to min/max złożonej dotąd tablicy na
+                        zajętych poziomach (dla operacji wspólnej - ze wszystkich kanałów)
+            channels: liczba kanałów obrazu (1 - mono, 3 - BGR)
+
+        Zwraca:
+            numpy.ndarray 256 x uint8 dla jednego kanału,
+            numpy.ndarray 256 x channels x uint8 dla obrazu wielokanałowego
+        """
+        tables = [LEVELS.astype(np.uint8)] * channels
+        occupied = None
+        if histograms is not None:
+            if len(histograms) != channels:
+                raise ValueError(f"Oczekiwano {channels} histogramów, otrzymano {len(histograms)}")
+            occupied = [np.asarray(hist) > 0 for hist in histograms]
+
+        for step in self.steps:
+            if step.data_dependent and occupied is None:
+                raise ValueError("Operacja zależy od zakresu jasności obrazu - wymagany histogram")
+
+            if step.channels is None:
+                if step.data_dependent:
+                    lo, hi = self._value_range(tables, occupied)
+                    step_table = step.builder(lo, hi)
+                else:
+                    step_table = step.table
+                tables = [step_table[table] for table in tables]
+                continue
+
+            for c in range(channels):
+                channel_step = step.for_channel(c)
+                if channel_step.data_dependent:
+                    lo, hi = self._value_range([tables[c]], [occupied[c]])
+                    step_table = channel_step.builder(lo, hi)
+                else:
+                    step_table = channel_step.table
+                tables[c] = step_table[tables[c]]
+
+        if channels == 1:
+            return tables[0]
+        return np.stack(tables, axis=1)
+
+    @staticmethod
+    def _value_range(tables, occupied):
+        """Min i max wartości złożonych tablic na poziomach występujących w obrazie"""
+        values = np.concatenate([table[mask] for table, mask in zip(tables, occupied)])
+        if values.size == 0:
+            return 0, 0
+        return int(values.min()), int(values.max())
+
+    def apply(self, img):
+        """
+        Stosuje cały łańcuch do obrazu (mono lub BGR) jednym przebiegiem (cv2.LUT).
+        Obraz BGR nie jest rozdzielany na kanały.
+        """
+        if img.ndim not in (2, 3):
+            raise ValueError("Obraz musi być w odcieniach szarości lub wielokanałowy (BGR)")
+        channels = 1 if img.ndim == 2 else img.shape[2]
+
+        histograms = None
+        if self.data_dependent:
+            histograms = HistogramManager._bincount_channels(img)
+        return HistogramManager._apply_lut(img, self.compile(histograms, channels))
@@ -1,21 +1,35 @@
-import numpy as np
+from backend.PointLUT import PointLUT
 
 class PointOperations:
+    """
+    Operacje punktowe na obrazach mono i BGR.
+
+    Obraz BGR jest przetwarzany w jednym przebiegu, bez rozdzielania kanałów.
+    Parametry operacji (levels, threshold) mogą być jedną liczbą - wspólną dla
+    wszystkich kanałów - albo krotką z osobną wartością dla każdego kanału (B, G, R).
+    """
+
+    @staticmethod
+    def _validate_image(img):
+        if len(img.shape) == 2:
+            return
+        if len(img.shape) != 3 or img.shape[2] != 3:
+            raise ValueError("Obraz musi być w odcieniach szarości lub kolorowy (BGR)")
+
     @staticmethod
     def negate(img):
         """
         Negacja obrazu (odwrócenie poziomów szarości).
         
         Parametr:
-            img: obraz numpy.ndarray (grayscale)
+            img: obraz numpy.ndarray (grayscale lub BGR)
         
         Zwraca:
             znegowany obraz
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
+        PointOperations._validate_image(img)
         
-        return 255 - img
+        return PointLUT.negate().apply(img)
     
     @staticmethod
     def posterize(img, levels):
@@ -23,26 +37,16 @@ class PointOperations:
         Redukcja poziomów szarości (posteryzacja).
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
-            levels: liczba poziomów szarości (np. 2, 4, 8, 16)
+            img: obraz numpy.ndarray (grayscale lub BGR)
+            levels: liczba poziomów szarości (np. 2, 4, 8, 16) lub krotka (B, G, R)
         
         Zwraca:
             obraz z ograniczoną liczbą poziomów szarości
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
-        
-        if levels < 2 or levels > 256:
-            raise ValueError("Liczba poziomów musi być w zakresie 2-256")
+        PointOperations._validate_image(img)
         
-        # Oblicz rozmiar przedziału
-        step = 256 / levels
-        
-        # Kwantyzacja
-        result = np.floor(img / step) * step
-        result = np.clip(result, 0, 255).astype(np.uint8)
-        
-        return result
+        # Kwantyzacja: floor(p / step) * step, step = 256 / levels
+        return PointLUT.from_values(PointLUT.posterize, levels, img).apply(img)
     
     @staticmethod
     def threshold_binary(img, threshold):
@@ -50,20 +54,15 @@ class PointOperations:
         Progowanie binarne.
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
-            threshold: próg (0-255)
+            img: obraz numpy.ndarray (grayscale lub BGR)
+            threshold: próg (0-255) lub krotka (B, G, R)
         
         Zwraca:
             obraz binarny (0 lub 255)
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
+        PointOperations._validate_image(img)
         
-        if threshold < 0 or threshold > 255:
-            raise ValueError("Próg musi być w zakresie 0-255")
-        
-        result = np.where(img >= threshold, 255, 0).astype(np.uint8)
-        return result
+        return PointLUT.from_values(PointLUT.threshold_binary, threshold, img).apply(img)
     
     @staticmethod
     def threshold_with_levels(img, threshold):
@@ -72,17 +71,12 @@ class PointOperations:
         Piksele poniżej progu = 0, powyżej = oryginalna wartość
         
         Parametry:
-            img: obraz numpy.ndarray (grayscale)
-            threshold: próg (0-255)
+            img: obraz numpy.ndarray (grayscale lub BGR)
+            threshold: próg (0-255) lub krotka (B, G, R)
         
         Zwraca:
             obraz z zachowanymi poziomami szarości powyżej progu
         """
-        if len(img.shape) != 2:
-            raise ValueError("Obraz musi być w odcieniach szarości")
-        
-        if threshold < 0 or threshold > 255:
-            raise ValueError("Próg musi być w zakresie 0-255")
+        PointOperations._validate_image(img)
         
-        result = np.where(img >= threshold, img, 0).astype(np.uint8)
-        return result
\ No newline at end of file
+        return PointLUT.from_values(PointLUT.threshold_with_levels, threshold, img).apply(img)
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Statystyki stosu obrazów (serii czasowej tej samej sceny) - projekcje piksel po pikselu.
+
+Stos jest przetwarzany kafelkami wierszy (opcjonalnie w wielu wątkach), więc
+zużycie pamięci zależy od rozmiaru kafelka, a nie od liczby klatek. Mediana
+i percentyle liczone są z 256-koszykowego histogramu każdego piksela - bez
+sortowania wartości.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.ArithmeticOperations import ArithmeticOperations
+
+# Budżet bajtów danych stosu w jednym kafelku (liczba klatek x piksele kafelka)
+STACK_TILE_BYTES = 16 * 1024 * 1024
+
+# Maksymalna liczba pikseli kafelka dla mediany/percentyla
+# (histogram kafelka zajmuje 256 x piksele x 2-4 bajty)
+STACK_HISTOGRAM_TILE_PIXELS = 1 << 13
+
+STACK_STATISTICS = ("mean", "min", "max", "std", "median", "percentile")
+
+
+class StackOperations:
+    """Projekcje stosu obrazów uint8: średnia, minimum, maksimum, odchylenie, mediana, percentyl"""
+
+    @staticmethod
+    def project(stack, statistic="mean", percentile=None, as_float=False, tile_rows=None, workers=None):
+        """
+        Projekcja stosu obrazów - jedna wartość statystyki dla każdego piksela.
+
+        Parametry:
+            stack: numpy.ndarray (N, H, W) (także np.memmap) albo lista obrazów
+                   (H, W) lub ścieżek do plików .npy (otwieranych jako memmap)
+            statistic: "mean", "min", "max", "std", "median" lub "percentile"
+            percentile: percentyl 0-100 (tylko dla "percentile")
+            as_float: True - wynik float32 (średnia, odchylenie, interpolowane
+                      percentyle bez zaokrąglenia); False - obraz uint8
+            tile_rows: liczba wierszy kafelka (domyślnie wg STACK_TILE_BYTES)
+            workers: liczba wątków; None - liczba procesorów, 1 - sekwencyjnie
+
+        Zwraca:
+            obraz (H, W) uint8 lub float32
+
+        Percentyle (i mediana = 50. percentyl) interpolowane są liniowo między
+        sąsiednimi wartościami, jak numpy.percentile.
+        """
+        if statistic not in STACK_STATISTICS:
+            raise ValueError(f"Nieznana statystyka: {statistic} (dostępne: {', '.join(STACK_STATISTICS)})")
+        if statistic == "median":
+            percentile = 50
+        elif statistic == "percentile":
+            if percentile is None or not 0 <= percentile <= 100:
+                raise ValueError("Percentyl musi być w zakresie 0-100")
+        elif percentile is not None:
+            raise ValueError("Percentyl można podać tylko dla statystyki 'percentile'")
+
+        frames = StackOperations._frames(stack)
+        count = len(frames)
+        height, width = frames[0].shape
+
+        if tile_rows is None:
+            tile_pixels = STACK_TILE_BYTES // count
+            if percentile is not None:
+                tile_pixels = min(tile_pixels, STACK_HISTOGRAM_TILE_PIXELS)
+            tile_rows = max(1, tile_pixels // max(width, 1))
+
+        result = np.empty((height, width), dtype=np.float32 if as_float else np.uint8)
+
+        def process(top):
+            tiles = [frame[top:top + tile_rows] for frame in frames]
+            if percentile is not None:
+                values = StackOperations._tile_percentile(tiles, percentile)
+            else:
+                values = StackOperations._tile_statistic(tiles, statistic, as_float)
+            if as_float or values.dtype == np.uint8:
+                result[top:top + tile_rows] = values
+            else:
+                result[top:top + tile_rows] = np.clip(np.rint(values), 0, 255)
+
+        tops = range(0, height, tile_rows)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(tops) == 1:
+            for top in tops:
+                process(top)
+        else:
+            # Kafelek jest wczytywany dopiero w zadaniu, więc w pamięci są
+            # naraz co najwyżej `workers` kafelki
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(process, tops))
+
+        return result
+
+    @staticmethod
+    def _frames(stack):
+        """Lista klatek (H, W) uint8 z tablicy (N, H, W) lub listy obrazów/ścieżek"""
+        if isinstance(stack, str):
+            stack = np.load(stack, mmap_mode='r')
+
+        if isinstance(stack, np.ndarray):
+            if stack.ndim != 3:
+                raise ValueError("Stos musi mieć kształt (liczba obrazów, wysokość, szerokość)")
+            frames = list(stack)
+        else:
+            frames = [np.load(img, mmap_mode='r') if isinstance(img, str) else img for img in stack]
+
+        if not frames:
+            raise ValueError("Stos nie zawiera obrazów")
+
+        base_shape = frames[0].shape
+        for i, frame in enumerate(frames, start=1):
+            ArithmeticOperations._validate_stack_image(frame, i, base_shape)
+            if frame.dtype != np.uint8:
+                raise ValueError(f"Obraz {i} musi być 8-bitowy (uint8)")
+        return frames
+
+    @staticmethod
+    def _tile_statistic(tiles, statistic, as_float):
+        """Średnia, min, max lub odchylenie standardowe kafelka"""
+        count = len(tiles)
+
+        if statistic in ("min", "max"):
+            reduce = np.minimum if statistic == "min" else np.maximum
+            result = np.array(tiles[0])
+            for tile in tiles[1:]:
+                reduce(result, tile, out=result)
+            return result
+
+        acc = np.zeros(tiles[0].shape, dtype=ArithmeticOperations._accumulator_dtype(count))
+        for tile in tiles:
+            acc += tile
+
+        if statistic == "mean":
+            if as_float:
+                return acc / np.float32(count)
+            return ArithmeticOperations._finish_accumulation(acc, "mean", count)
+
+        # Odchylenie standardowe (populacyjne) z sumy i sumy kwadratów
+        squares = np.zeros(tiles[0].shape, dtype=np.uint64)
+        for tile in tiles:
+            squares += np.square(tile, dtype=np.uint32)
+        total = acc.astype(np.float64)
+        variance = (squares - total * total / count) / count
+        return np.sqrt(np.maximum(variance, 0)).astype(np.float32)
+
+    @staticmethod
+    def _tile_percentile(tiles, percentile):
+        """
+        Percentyl kafelka z histogramu każdego piksela.
+
+        Zliczanie: counts[wartość, piksel] += 1 dla każdej klatki - indeksy pikseli
+        w jednej klatce są unikalne, więc wystarczy zwykłe indeksowanie
+        (na spłaszczonej tablicy, co jest wyraźnie szybsze niż indeks 2D).
+        Potem jeden przebieg po 256 koszykach znajduje wartości o rangach
+        floor(h) i ceil(h), gdzie h = (N - 1) * percentyl / 100.
+        """
+        count = len(tiles)
+        shape = tiles[0].shape
+        pixels = tiles[0].size
+        index = np.arange(pixels)
+
+        counts = np.zeros(256 * pixels, dtype=np.uint16 if count < 2**16 else np.uint32)
+        for tile in tiles:
+            counts[np.asarray(tile).reshape(-1).astype(np.intp) * pixels + index] += 1
+        counts = counts.reshape(256, pixels)
+
+        position = (count - 1) * percentile / 100
+        rank_low = int(np.floor(position))
+        rank_high = int(np.ceil(position))
+        fraction = position - rank_low
+
+        # Wartość o randze r to liczba koszyków, których histogram skumulowany
+        # nie przekracza jeszcze r (histogram skumulowany jest niemalejący)
+        low = np.zeros(pixels, dtype=np.uint16)
+        high = np.zeros(pixels, dtype=np.uint16)
+        cumulative = np.zeros(pixels, dtype=np.uint32)
+        for value in range(255):
+            cumulative += counts[value]
+            low += cumulative <= rank_low
+            high += cumulative <= rank_high
+
+        if fraction == 0:
+            return low.astype(np.uint8).reshape(shape)
+        values = low + np.float32(fraction) * (high.astype(np.float32) - low)
+        return values.reshape(shape)
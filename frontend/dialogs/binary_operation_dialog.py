@@ -29,7 +29,7 @@ class BinaryOperationDialog(tk.Toplevel):
             self.exact_count = None
         elif operation_type == "arithmetic_multi":
             self.min_images = 2
-            self.max_images = 5
+            self.max_images = None
             self.exact_count = None
         else:  # arithmetic (np. różnica bezwzględna)
             self.min_images = 2
@@ -52,7 +52,7 @@ class BinaryOperationDialog(tk.Toplevel):
         else:  # arithmetic
             info_map = {
                 "Różnica bezwzględna": "Oblicza różnicę bezwzględną: |obraz1 - obraz2|\nPokazuje różnice między obrazami",
-                "Dodawanie": "Dodaje 2-5 obrazów.\nZ wysyceniem: obcięcie do 0-255\nBez wysycenia: automatyczne skalowanie"  # DODAJ
+                "Dodawanie": "Dodaje 2 lub więcej obrazów.\nZ wysyceniem: obcięcie do 0-255\nBez wysycenia: automatyczne skalowanie"  # DODAJ
             }
 
         return info_map.get(self.operation, "")
@@ -248,14 +248,8 @@ class BinaryOperationDialog(tk.Toplevel):
         # Wykonaj operację
         try:
             if self.operation_type == "logical":
-                result = selected_images[0]
-                for img in selected_images[1:]:
-                    if self.operation == "AND":
-                        result = self.app_manager.apply_logical_and(result, img)
-                    elif self.operation == "OR":
-                        result = self.app_manager.apply_logical_or(result, img)
-                    elif self.operation == "XOR":
-                        result = self.app_manager.apply_logical_xor(result, img)
+                # Wszystkie obrazy naraz, bez wyników pośrednich dla każdej pary
+                result = self.app_manager.apply_logical_combine(selected_images, self.operation)
             elif self.operation_type == "arithmetic":
                 if self.operation == "Różnica bezwzględna":
                     result = self.app_manager.apply_absolute_difference(
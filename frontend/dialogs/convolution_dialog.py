@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import cv2
 import numpy as np
 
@@ -122,7 +122,7 @@ class SmoothingDialog(ConvolutionDialog):
         
         self.window = tk.Toplevel(parent)
         self.window.title("Wygładzanie liniowe")
-        self.window.geometry("450x550")
+        self.window.geometry("450x600")
         self.window.resizable(False, False)
         
         self.window.transient(parent)
@@ -139,11 +139,13 @@ class SmoothingDialog(ConvolutionDialog):
             row=0, column=0, columnspan=2, sticky='w', pady=(0, 10)
         )
         
+        # Maski 3x3 oraz filtry z parametrem (Gauss - sigma, uśrednienie - promień)
+        self.smoothing_filters = self.app_manager.get_smoothing_filters()
         self.mask_var = tk.StringVar(value=self.app_manager.get_smoothing_masks()[0])
         mask_combo = ttk.Combobox(
             main_frame,
             textvariable=self.mask_var,
-            values=self.app_manager.get_smoothing_masks(),
+            values=self.app_manager.get_smoothing_masks() + self.smoothing_filters,
             state='readonly',
             width=30
         )
@@ -181,22 +183,43 @@ class SmoothingDialog(ConvolutionDialog):
         )
         self.divisor_label.grid(row=1, column=3, padx=10)
         
+        # Parametr filtru (sigma lub promień) - aktywny tylko dla filtrów z parametrem
+        self.param_label = ttk.Label(main_frame, text="Parametr:")
+        self.param_label.grid(row=3, column=0, sticky='w', padx=10, pady=5)
+        
+        self.param_var = tk.StringVar(value="")
+        self.param_spinbox = ttk.Spinbox(
+            main_frame,
+            textvariable=self.param_var,
+            width=23,
+            state='disabled'
+        )
+        self.param_spinbox.grid(row=3, column=1, sticky='w', padx=10, pady=5)
+        
         # Wyświetl początkową maskę
         self._update_mask_display()
         
         # Kontrolki brzegu
-        next_row = self._create_border_controls(main_frame, start_row=3)
+        next_row = self._create_border_controls(main_frame, start_row=4)
         
         # Przyciski
         self._create_buttons(main_frame, next_row)
     
     def _update_mask_display(self, event=None):
         """Aktualizuje wyświetlanie wartości maski"""
-        from backend.ConvolutionOperations import ConvolutionOperations
-        conv_ops = ConvolutionOperations()
+        conv_ops = self.app_manager.convolution_engine
         
         mask_name = self.mask_var.get()
         mask = conv_ops.SMOOTHING_MASKS.get(mask_name)
+        self._update_param_controls(mask_name)
+        
+        if mask_name in self.smoothing_filters:
+            # Filtr o dowolnym rozmiarze - brak maski 3x3 do wyświetlenia
+            for row_labels in self.mask_labels:
+                for label in row_labels:
+                    label.config(text="-")
+            self.divisor_label.config(text="")
+            return
         
         if mask is not None:
             # Odtwórz oryginalne wartości całkowite
@@ -230,14 +253,55 @@ class SmoothingDialog(ConvolutionDialog):
             
             self.divisor_label.config(text="")
     
+    def _update_param_controls(self, mask_name):
+        """Ustawia pole parametru dla wybranego filtru"""
+        gaussian, box = self.smoothing_filters
+        if mask_name == gaussian:
+            self.param_label.config(text="Sigma (0.5-100):")
+            self.param_spinbox.config(state='normal', from_=0.5, to=100, increment=0.5)
+            self.param_var.set("5.0")
+        elif mask_name == box:
+            self.param_label.config(text="Promień (1-500):")
+            self.param_spinbox.config(state='normal', from_=1, to=500, increment=1)
+            self.param_var.set("5")
+        else:
+            self.param_label.config(text="Parametr:")
+            self.param_var.set("")
+            self.param_spinbox.config(state='disabled')
+    
     def _apply_and_show(self):
+        mask_name = self.mask_var.get()
+        gaussian, box = self.smoothing_filters
+        
+        if mask_name in self.smoothing_filters:
+            try:
+                param = float(self.param_var.get().replace(",", "."))
+            except ValueError:
+                messagebox.showerror("Błąd", "Nieprawidłowa wartość parametru")
+                return
+        
         try:
-            result = self.app_manager.apply_smoothing(
-                self.image,
-                self.mask_var.get(),
-                self.border_type_var.get(),
-                self.border_value_var.get()
-            )
+            if mask_name == gaussian:
+                result = self.app_manager.apply_gaussian_smoothing(
+                    self.image,
+                    param,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
+            elif mask_name == box:
+                result = self.app_manager.apply_box_smoothing(
+                    self.image,
+                    param,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
+            else:
+                result = self.app_manager.apply_smoothing(
+                    self.image,
+                    mask_name,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
             
             if self.on_result_callback:
                 self.on_result_callback(result)
@@ -261,7 +325,7 @@ class SharpeningDialog(ConvolutionDialog):
         
         self.window = tk.Toplevel(parent)
         self.window.title("Wyostrzanie (Laplacjan)")
-        self.window.geometry("450x550")
+        self.window.geometry("450x680")
         self.window.resizable(False, False)
         
         self.window.transient(parent)
@@ -279,15 +343,15 @@ class SharpeningDialog(ConvolutionDialog):
         )
         
         self.mask_var = tk.StringVar(value=self.app_manager.get_laplacian_masks()[0])
-        mask_combo = ttk.Combobox(
+        self.mask_combo = ttk.Combobox(
             main_frame,
             textvariable=self.mask_var,
             values=self.app_manager.get_laplacian_masks(),
             state='readonly',
             width=30
         )
-        mask_combo.grid(row=1, column=0, columnspan=2, sticky='ew', padx=10, pady=5)
-        mask_combo.bind('<<ComboboxSelected>>', self._update_mask_display)
+        self.mask_combo.grid(row=1, column=0, columnspan=2, sticky='ew', padx=10, pady=5)
+        self.mask_combo.bind('<<ComboboxSelected>>', self._update_mask_display)
         
         # Ramka na wyświetlenie maski
         mask_display_frame = ttk.LabelFrame(main_frame, text="Podgląd maski 3x3:", padding="10")
@@ -314,16 +378,43 @@ class SharpeningDialog(ConvolutionDialog):
         # Wyświetl początkową maskę
         self._update_mask_display()
         
+        # Rodzaj wyniku: odpowiedź Laplacjanu, obraz wyostrzony Laplacjanem
+        # lub maską wyostrzającą (unsharp)
+        ttk.Label(main_frame, text="Wynik:").grid(row=3, column=0, sticky='w', padx=10, pady=5)
+        
+        self.sharpening_modes = self.app_manager.get_sharpening_modes()
+        self.mode_var = tk.StringVar(value=self.sharpening_modes[0])
+        mode_combo = ttk.Combobox(
+            main_frame,
+            textvariable=self.mode_var,
+            values=self.sharpening_modes,
+            state='readonly',
+            width=32
+        )
+        mode_combo.grid(row=3, column=1, sticky='w', padx=10, pady=5)
+        mode_combo.bind('<<ComboboxSelected>>', self._on_mode_changed)
+        
+        # Parametry wyostrzania
+        self.amount_var, self.amount_spinbox = self._create_param_spinbox(
+            main_frame, 4, "Siła (0-10):", 0, 10, 0.1, "1.0"
+        )
+        self.sigma_var, self.sigma_spinbox = self._create_param_spinbox(
+            main_frame, 5, "Sigma rozmycia:", 0.5, 100, 0.5, "1.0"
+        )
+        self.threshold_var, self.threshold_spinbox = self._create_param_spinbox(
+            main_frame, 6, "Próg (0-255):", 0, 255, 1, "0"
+        )
+        self._on_mode_changed()
+        
         # Kontrolki brzegu
-        next_row = self._create_border_controls(main_frame, start_row=3)
+        next_row = self._create_border_controls(main_frame, start_row=7)
         
         # Przyciski
         self._create_buttons(main_frame, next_row)
     
     def _update_mask_display(self, event=None):
         """Aktualizuje wyświetlanie wartości maski"""
-        from backend.ConvolutionOperations import ConvolutionOperations
-        conv_ops = ConvolutionOperations()
+        conv_ops = self.app_manager.convolution_engine
         
         mask_name = self.mask_var.get()
         mask = conv_ops.LAPLACIAN_MASKS.get(mask_name)
@@ -334,14 +425,70 @@ class SharpeningDialog(ConvolutionDialog):
                     value = int(mask[i, j])
                     self.mask_labels[i][j].config(text=f"{value}")
     
+    def _create_param_spinbox(self, parent_frame, row, text, from_, to, increment, value):
+        """Etykieta i pole liczbowe parametru wyostrzania"""
+        ttk.Label(parent_frame, text=text).grid(row=row, column=0, sticky='w', padx=10, pady=5)
+        
+        var = tk.StringVar(value=value)
+        spinbox = ttk.Spinbox(
+            parent_frame,
+            from_=from_,
+            to=to,
+            increment=increment,
+            textvariable=var,
+            width=23
+        )
+        spinbox.grid(row=row, column=1, sticky='w', padx=10, pady=5)
+        return var, spinbox
+    
+    def _on_mode_changed(self, event=None):
+        """Włącza pola parametrów potrzebne dla wybranego rodzaju wyniku"""
+        response, laplacian, unsharp = self.sharpening_modes
+        mode = self.mode_var.get()
+        
+        self.amount_spinbox.config(state='normal' if mode != response else 'disabled')
+        self.sigma_spinbox.config(state='normal' if mode == unsharp else 'disabled')
+        self.threshold_spinbox.config(state='normal' if mode == unsharp else 'disabled')
+        # Maska wyostrzająca nie korzysta z maski Laplacjana
+        self.mask_combo.config(state='disabled' if mode == unsharp else 'readonly')
+    
     def _apply_and_show(self):
+        response, laplacian, unsharp = self.sharpening_modes
+        mode = self.mode_var.get()
+        
         try:
-            result = self.app_manager.apply_sharpening(
-                self.image,
-                self.mask_var.get(),
-                self.border_type_var.get(),
-                self.border_value_var.get()
-            )
+            amount = float(self.amount_var.get().replace(",", "."))
+            sigma = float(self.sigma_var.get().replace(",", "."))
+            threshold = float(self.threshold_var.get().replace(",", "."))
+        except ValueError:
+            messagebox.showerror("Błąd", "Nieprawidłowa wartość parametru")
+            return
+        
+        try:
+            if mode == laplacian:
+                result = self.app_manager.apply_laplacian_sharpening(
+                    self.image,
+                    self.mask_var.get(),
+                    amount,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
+            elif mode == unsharp:
+                result = self.app_manager.apply_unsharp_mask(
+                    self.image,
+                    sigma,
+                    amount,
+                    threshold,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
+            else:
+                result = self.app_manager.apply_sharpening(
+                    self.image,
+                    self.mask_var.get(),
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
             
             if self.on_result_callback:
                 self.on_result_callback(result)
@@ -355,7 +502,12 @@ class SharpeningDialog(ConvolutionDialog):
 class PrewittDialog(ConvolutionDialog):
     """Dialog dla kierunkowej detekcji krawędzi Prewitta"""
     
+    # Pozycja listy kierunków: wszystkie 8 kierunków naraz
+    COMPASS_OPTION = "Wszystkie kierunki (kompas)"
+    
     def __init__(self, parent, image, app_manager):
+        # Callback dla mapy kierunków (tryb kompasowy)
+        self.on_directions_callback = None
         super().__init__(parent, "Detekcja krawędzi - Prewitt", image, app_manager)
     
     def _create_widgets(self):
@@ -367,11 +519,12 @@ class PrewittDialog(ConvolutionDialog):
             row=0, column=0, columnspan=2, sticky='w', pady=(0, 10)
         )
         
-        self.direction_var = tk.StringVar(value=self.app_manager.get_prewitt_directions()[0])
+        directions = self.app_manager.get_prewitt_directions()
+        self.direction_var = tk.StringVar(value=directions[0])
         direction_combo = ttk.Combobox(
             main_frame,
             textvariable=self.direction_var,
-            values=self.app_manager.get_prewitt_directions(),
+            values=directions + [self.COMPASS_OPTION],
             state='readonly',
             width=30
         )
@@ -385,12 +538,26 @@ class PrewittDialog(ConvolutionDialog):
     
     def _apply_and_show(self):
         try:
-            result = self.app_manager.apply_prewitt(
-                self.image,
-                self.direction_var.get(),
-                self.border_type_var.get(),
-                self.border_value_var.get()
-            )
+            if self.direction_var.get() == self.COMPASS_OPTION:
+                result, directions = self.app_manager.apply_prewitt_compass(
+                    self.image,
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
+                
+                if self.on_directions_callback:
+                    # Indeksy kierunków 0-7 jako poziomy szarości 0-224 (co 32),
+                    # piksele bez kierunku pozostają białe (255)
+                    lut = np.full(256, 255, dtype=np.uint8)
+                    lut[:8] = np.arange(8) * 32
+                    self.on_directions_callback(cv2.LUT(directions, lut))
+            else:
+                result = self.app_manager.apply_prewitt(
+                    self.image,
+                    self.direction_var.get(),
+                    self.border_type_var.get(),
+                    self.border_value_var.get()
+                )
             
             if self.on_result_callback:
                 self.on_result_callback(result)
@@ -443,7 +610,7 @@ class SobelDialog(ConvolutionDialog):
 
 
 class CustomMaskDialog(ConvolutionDialog):
-    """Dialog dla własnej maski 3x3 zdefiniowanej przez użytkownika"""
+    """Dialog dla własnej maski (3x3 do 31x31) zdefiniowanej przez użytkownika"""
     
     def __init__(self, parent, image, app_manager):
         # Nie wywołujemy super().__init__ bo chcemy niestandardowy rozmiar
@@ -452,11 +619,12 @@ class CustomMaskDialog(ConvolutionDialog):
         self.app_manager = app_manager
         self.result = None
         self.on_result_callback = None
+        self.mask_entries = []
         
         # Okno dialogowe - większe niż standardowe
         self.window = tk.Toplevel(parent)
-        self.window.title("Własna maska 3x3")
-        self.window.geometry("480x500")
+        self.window.title("Własna maska")
+        self.window.geometry("560x640")
         self.window.resizable(False, False)
         
         # Centrowanie okna
@@ -472,26 +640,53 @@ class CustomMaskDialog(ConvolutionDialog):
         # Nagłówek
         header = ttk.Label(
             main_frame, 
-            text="Zdefiniuj własną maskę 3x3:",
+            text="Zdefiniuj własną maskę:",
             font=('Arial', 10, 'bold')
         )
         header.pack(pady=(0, 10))
         
-        # Rama dla grida 3x3
-        grid_frame = ttk.Frame(main_frame)
-        grid_frame.pack(pady=10)
+        # Rozmiar maski
+        size_frame = ttk.Frame(main_frame)
+        size_frame.pack(fill='x', pady=5)
         
-        # Grid 3x3 dla wartości
-        self.mask_entries = []
-        for i in range(3):
-            row_entries = []
-            for j in range(3):
-                entry = ttk.Entry(grid_frame, width=8, justify='center')
-                entry.grid(row=i, column=j, padx=5, pady=5)
-                entry.insert(0, "0")
-                entry.bind('<KeyRelease>', self._update_divisor)
-                row_entries.append(entry)
-            self.mask_entries.append(row_entries)
+        ttk.Label(size_frame, text="Rozmiar maski:").pack(side=tk.LEFT, padx=5)
+        
+        self.size_var = tk.IntVar(value=3)
+        size_combo = ttk.Combobox(
+            size_frame,
+            textvariable=self.size_var,
+            values=self.app_manager.get_custom_mask_sizes(),
+            state='readonly',
+            width=8
+        )
+        size_combo.pack(side=tk.LEFT, padx=5)
+        size_combo.bind('<<ComboboxSelected>>', lambda event: self._build_mask_grid(self.size_var.get()))
+        
+        ttk.Button(
+            size_frame,
+            text="Wczytaj z pliku...",
+            command=self._load_mask_from_file
+        ).pack(side=tk.RIGHT, padx=5)
+        
+        # Rama dla grida z przewijaniem (duże maski nie mieszczą się w oknie)
+        grid_container = ttk.Frame(main_frame)
+        grid_container.pack(fill='x', pady=10)
+        
+        self.grid_canvas = tk.Canvas(grid_container, height=220, highlightthickness=0)
+        x_scroll = ttk.Scrollbar(grid_container, orient='horizontal', command=self.grid_canvas.xview)
+        y_scroll = ttk.Scrollbar(grid_container, orient='vertical', command=self.grid_canvas.yview)
+        self.grid_canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        
+        y_scroll.pack(side=tk.RIGHT, fill='y')
+        x_scroll.pack(side=tk.BOTTOM, fill='x')
+        self.grid_canvas.pack(side=tk.LEFT, fill='both', expand=True)
+        
+        self.grid_frame = ttk.Frame(self.grid_canvas)
+        self.grid_canvas.create_window((0, 0), window=self.grid_frame, anchor='nw')
+        self.grid_frame.bind(
+            '<Configure>',
+            lambda event: self.grid_canvas.configure(scrollregion=self.grid_canvas.bbox('all'))
+        )
         
         # Rama dla dzielnika
         divisor_frame = ttk.Frame(main_frame)
@@ -508,6 +703,15 @@ class CustomMaskDialog(ConvolutionDialog):
         )
         divisor_label.pack(side=tk.LEFT, padx=5)
         
+        # Informacja o rozkładzie maski na przebiegi 1-D
+        self.decomposition_var = tk.StringVar(value="")
+        ttk.Label(
+            main_frame,
+            textvariable=self.decomposition_var,
+            font=('Arial', 9),
+            foreground='#666'
+        ).pack(pady=(0, 5))
+        
         # Separator
         ttk.Separator(main_frame, orient='horizontal').pack(fill='x', pady=10)
         
@@ -562,19 +766,77 @@ class CustomMaskDialog(ConvolutionDialog):
             command=self.window.destroy,
             width=20
         ).pack(side=tk.LEFT, padx=10)
+        
+        self._build_mask_grid(3)
+    
+    def _build_mask_grid(self, size, values=None):
+        """Tworzy grid size x size pól maski (opcjonalnie wypełniony wartościami)"""
+        for child in self.grid_frame.winfo_children():
+            child.destroy()
+        
+        self.size_var.set(size)
+        entry_width = 8 if size <= 5 else 5
+        
+        self.mask_entries = []
+        for i in range(size):
+            row_entries = []
+            for j in range(size):
+                entry = ttk.Entry(self.grid_frame, width=entry_width, justify='center')
+                entry.grid(row=i, column=j, padx=2, pady=2)
+                entry.insert(0, "0" if values is None else f"{values[i, j]:g}")
+                entry.bind('<KeyRelease>', self._update_divisor)
+                row_entries.append(entry)
+            self.mask_entries.append(row_entries)
+        
+        self._update_divisor()
+    
+    def _load_mask_from_file(self):
+        """Wczytuje maskę z pliku tekstowego (wiersze maski, wartości oddzielone spacją lub przecinkiem)"""
+        file_path = filedialog.askopenfilename(
+            parent=self.window,
+            title="Wczytaj maskę",
+            filetypes=[("Pliki tekstowe", "*.txt *.csv"), ("Wszystkie pliki", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                values = np.loadtxt(f.read().replace(',', ' ').splitlines(), ndmin=2)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Błąd", f"Nie udało się wczytać maski:\n{str(e)}")
+            return
+        
+        sizes = self.app_manager.get_custom_mask_sizes()
+        if values.shape[0] != values.shape[1] or values.shape[0] not in sizes:
+            messagebox.showerror(
+                "Błąd",
+                f"Maska musi być kwadratowa, rozmiar {sizes[0]}x{sizes[0]} - {sizes[-1]}x{sizes[-1]} "
+                f"(nieparzysty).\nWczytano: {values.shape[0]}x{values.shape[1]}"
+            )
+            return
+        
+        self._build_mask_grid(values.shape[0], values)
+    
+    def _read_mask(self):
+        """Odczytuje wartości z grida; None jeśli któreś pole jest nieprawidłowe"""
+        size = len(self.mask_entries)
+        mask = np.zeros((size, size), dtype=np.float32)
+        for i in range(size):
+            for j in range(size):
+                try:
+                    mask[i, j] = float(self.mask_entries[i][j].get())
+                except ValueError:
+                    messagebox.showerror("Błąd", f"Nieprawidłowa wartość w pozycji [{i},{j}]")
+                    return None
+        return mask
     
     def _apply_and_show(self):
         try:
             # Pobierz wartości z grida
-            mask = np.zeros((3, 3), dtype=np.float32)
-            for i in range(3):
-                for j in range(3):
-                    try:
-                        value = float(self.mask_entries[i][j].get())
-                        mask[i, j] = value
-                    except ValueError:
-                        messagebox.showerror("Błąd", f"Nieprawidłowa wartość w pozycji [{i},{j}]")
-                        return
+            mask = self._read_mask()
+            if mask is None:
+                return
             
             # Pobierz dzielnik
             try:
@@ -605,21 +867,37 @@ class CustomMaskDialog(ConvolutionDialog):
             messagebox.showerror("Błąd", f"Nie udało się wykonać operacji:\n{str(e)}")
     
     def _update_divisor(self, event=None):
-        """Automatycznie wylicza sumę wartości w gridzie"""
-        total = 0
-        for i in range(3):
-            for j in range(3):
+        """Automatycznie wylicza sumę wartości w gridzie i sprawdza separowalność maski"""
+        size = len(self.mask_entries)
+        mask = np.zeros((size, size), dtype=np.float64)
+        valid = True
+        for i in range(size):
+            for j in range(size):
                 try:
-                    value = float(self.mask_entries[i][j].get())
-                    total += value
+                    mask[i, j] = float(self.mask_entries[i][j].get())
                 except ValueError:
-                    pass
+                    valid = False
+        
+        total = float(np.sum(mask))
         
         # Jeśli suma <= 0, użyj 1
         if total <= 0:
             total = 1.0
         
         self.divisor_var.set(f"{total:.2f}")
+        
+        if not valid or not np.all(np.isfinite(mask)):
+            self.decomposition_var.set("")
+            return
+        
+        decomposition = self.app_manager.decompose_custom_mask(mask / total)
+        if decomposition.separable:
+            self.decomposition_var.set(
+                f"Maska separowalna (rząd {decomposition.rank}) - liczba przebiegów 1-D: "
+                f"{2 * decomposition.rank}, błąd ≤ {decomposition.max_error:.2g}"
+            )
+        else:
+            self.decomposition_var.set(f"Maska nieseparowalna (rząd {decomposition.rank}) - pełna konwolucja 2-D")
 
 
 class CannyDialog:
@@ -764,7 +1042,7 @@ class MedianDialog:
         size_combo = ttk.Combobox(
             size_frame,
             textvariable=self.size_var,
-            values=[3, 5, 7, 9],
+            values=self.app_manager.get_median_kernel_sizes(),
             state='readonly',
             width=15
         )
@@ -49,6 +49,10 @@ class StretchHistogramDialog:
         # Timer do debouncing
         self._update_timer = None
         
+        # Podglądy przy przesuwaniu suwaków liczone na warstwowej próbce obrazu,
+        # dokładny wynik dopiero po "Zastosuj"
+        self.preview_image = self.app_manager.create_preview_sample(self.image)
+        
         self._create_widgets()
         self._update_histograms()  # Pokaż początkowe histogramy
         
@@ -239,10 +243,10 @@ class StretchHistogramDialog:
             from backend.HistogramOperations import HistogramOperations
             try:
                 result = HistogramOperations.stretch_histogram_range(
-                    self.image, p1, p2, q1, q2
+                    self.preview_image, p1, p2, q1, q2
                 )
                 
-                hist_after = self.app_manager.calculate_histograms(result)
+                hist_after = self.app_manager.estimate_sample_histograms(result, self.image.size)
                 histogram_after = hist_after[0].histogram
                 
                 self.ax_after.clear()
@@ -252,7 +256,10 @@ class StretchHistogramDialog:
                 self.ax_after.axvline(q1, color='red', linestyle='--', linewidth=2, label=f'q1={q1}')
                 self.ax_after.axvline(q2, color='blue', linestyle='--', linewidth=2, label=f'q2={q2}')
                 
-                self.ax_after.set_title("PO rozciągnięciu")
+                if hist_after[0].cdf_error > 0:
+                    self.ax_after.set_title(f"PO rozciągnięciu (próbka, ±{hist_after[0].cdf_error:.1%})")
+                else:
+                    self.ax_after.set_title("PO rozciągnięciu")
                 self.ax_after.set_xlabel("Wartość piksela")
                 self.ax_after.set_ylabel("Częstość")
                 self.ax_after.set_xlim(0, 255)
@@ -23,8 +23,8 @@ class ObjectAnalysisDialog:
         self.on_result_callback: Callable = None
         
         # Sprawdź czy obraz jest binarny
-        unique_vals = np.unique(image)
-        if not (len(unique_vals) <= 2 and (unique_vals.max() == 255 or unique_vals.max() == 1)):
+        image_data = app_manager.get_image_data(image)
+        if not (image_data.is_two_level and image_data.max in (1, 255)):
             raise ValueError("Obraz musi być binarny!")
         
         self._create_dialog()
@@ -317,9 +317,10 @@ class OtsuThresholdDialog:
         # Wyświetl wartość progu
         self.threshold_label.config(text=f"{threshold_value:.2f}")
         
-        # Statystyki
-        white_pixels = np.sum(binary_image == 255)
-        total_pixels = binary_image.size
+        # Statystyki - z histogramu (cache) zamiast ponownego skanowania obrazu
+        histogram = self.app_manager.calculate_histograms(self.image)[0].histogram
+        white_pixels = int(histogram[int(threshold_value) + 1:].sum())
+        total_pixels = self.image.size
         percentage = (white_pixels / total_pixels) * 100
         
         stats_text = (
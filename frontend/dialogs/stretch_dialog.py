@@ -171,9 +171,7 @@ class StretchDialog(tk.Toplevel):
         result = self.app_manager.apply_stretch_histogram(self.img, saturation)
         
         # Oblicz histogram wyniku
-        hist_result = np.zeros(256, dtype=int)
-        for pixel in result.flat:
-            hist_result[pixel] += 1
+        hist_result = self.app_manager.calculate_histograms(result, use_cache=False)[0].histogram
         
         # Aktualizuj wykres
         self.ax_stretched.clear()
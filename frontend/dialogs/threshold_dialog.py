@@ -34,10 +34,13 @@ class ThresholdDialog(tk.Toplevel):
         hist_frame = tk.Frame(self)
         hist_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Oblicz histogram
-        histogram_stats = self.app_manager.calculate_histograms(self.img)
+        # Oblicz histogram - szacunek z próbki, dokładny wynik liczony przy "Zastosuj"
+        histogram_stats = self.app_manager.calculate_histograms(self.img, approximate=True)
         self.hist_data = histogram_stats[0].histogram
         
+        # Podgląd progowania liczony na warstwowej próbce obrazu (miniaturze)
+        self.preview_img = self.app_manager.create_preview_sample(self.img)
+        
         # Wykres
         self.fig = Figure(figsize=(7, 3.5))
         self.ax = self.fig.add_subplot(111)
@@ -46,7 +49,10 @@ class ThresholdDialog(tk.Toplevel):
         self.ax.bar(x, self.hist_data, color='gray', width=1.0, alpha=0.7, edgecolor='none')
         
         mode_text = "Binarne" if self.mode == "binary" else "Z poziomami"
-        self.ax.set_title(f"Histogram - Progowanie {mode_text}")
+        title = f"Histogram - Progowanie {mode_text}"
+        if histogram_stats[0].cdf_error > 0:
+            title += f" (próbka, błąd ±{histogram_stats[0].cdf_error:.1%})"
+        self.ax.set_title(title)
         self.ax.set_xlabel("Wartość piksela")
         self.ax.set_ylabel("Częstość")
         self.ax.set_xlim(0, 255)
@@ -166,9 +172,9 @@ class ThresholdDialog(tk.Toplevel):
         threshold = self.threshold_var.get()
         
         if self.mode == "binary":
-            result = self.app_manager.apply_threshold_binary(self.img, threshold)
+            result = self.app_manager.apply_threshold_binary(self.preview_img, threshold)
         else:
-            result = self.app_manager.apply_threshold_with_levels(self.img, threshold)
+            result = self.app_manager.apply_threshold_with_levels(self.preview_img, threshold)
         
         # Utwórz lub zaktualizuj okno podglądu
         if not hasattr(self, 'preview_window') or not self.preview_window.winfo_exists():
@@ -3,6 +3,8 @@ from PIL import Image, ImageTk
 import cv2
 import numpy as np
 
+from backend.ImageData import ImageData, KIND_BINARY01
+
 
 class ImageViewer:
     """Okno do wyświetlania pojedynczego obrazu"""
@@ -43,8 +45,7 @@ class ImageViewer:
         # Konwersja do RGB dla PIL
         if len(img.shape) == 2:
             # Grayscale - sprawdź czy to maska binarna (0/1)
-            unique_vals = np.unique(img)
-            if len(unique_vals) == 2 and 0 in unique_vals and 1 in unique_vals:
+            if ImageData.of(self.original_img).kind == KIND_BINARY01:
                 # Maska binarna (0/1) - przeskaluj do 0/255 tylko do wyświetlenia
                 img_display = img * 255
                 img_rgb = cv2.cvtColor(img_display.astype(np.uint8), cv2.COLOR_GRAY2RGB)
@@ -218,9 +219,8 @@ class ImageViewer:
         
         # Konwersja do RGB
         if len(img.shape) == 2:
-            # Sprawdź czy to maska binarna (0/1)
-            unique_vals = np.unique(img)
-            if len(unique_vals) <= 2 and np.max(unique_vals) <= 1:
+            # Sprawdź czy to maska binarna (0/1) - rodzaj zapamiętany po pierwszym sprawdzeniu
+            if ImageData.of(self.original_img).kind == KIND_BINARY01:
                 # Maska binarna - przeskaluj do wyświetlenia
                 img_display = img * 255
                 img_rgb = cv2.cvtColor(img_display.astype(np.uint8), cv2.COLOR_GRAY2RGB)
@@ -110,7 +110,7 @@ class MainWindow:
         filters_menu = Menu(process_menu, tearoff=0)
         process_menu.add_cascade(label="Filtry", menu=filters_menu)
         filters_menu.add_command(label="Wygładzanie", command=self.apply_smoothing)
-        filters_menu.add_command(label="Własna maska 3x3", command=self.apply_custom_mask)
+        filters_menu.add_command(label="Własna maska...", command=self.apply_custom_mask)
         filters_menu.add_command(label="Wyostrzanie (Laplasjan)", command=self.apply_sharpening)
         filters_menu.add_command(label="Mediana", command=self.apply_median)
         
@@ -374,13 +374,13 @@ class MainWindow:
     
     # ============ PROCESS OPERATIONS (LAB 1) ============
     
-    @_require_grayscale
+    @_require_image
     def apply_negate(self):
         """Negacja obrazu"""
         result = self.app_manager.apply_negate(self.current_image)
         self._show_result(result, "Inverted")
         
-    @_require_grayscale
+    @_require_image
     def apply_posterize(self):
         """Posteryzacja obrazu"""
         dialog = PosterizeDialog(self.root, self.current_image, self.app_manager)
@@ -432,7 +432,7 @@ class MainWindow:
 
     @_require_multiple_images(min_count=2)
     def apply_add_images(self):
-        """Dodawanie obrazów (2-5)"""
+        """Dodawanie obrazów (2 lub więcej)"""
         dialog = BinaryOperationDialog(
             self.root,
             "Dodawanie",
@@ -442,7 +442,7 @@ class MainWindow:
         )
         dialog.on_result_callback = lambda img: self._show_result(img, "Dodawanie obrazów")
 
-    @_require_grayscale
+    @_require_image
     def apply_add_scalar(self):
         """Dodawanie liczby do obrazu"""
         dialog = ScalarOperationDialog(
@@ -453,7 +453,7 @@ class MainWindow:
         )
         dialog.on_result_callback = lambda img: self._show_result(img, "Dodawanie liczby")
     
-    @_require_grayscale
+    @_require_image
     def apply_multiply_scalar(self):
         """Mnożenie obrazu przez liczbę"""
         dialog = ScalarOperationDialog(
@@ -464,7 +464,7 @@ class MainWindow:
         )
         dialog.on_result_callback = lambda img: self._show_result(img, "Mnożenie przez liczbę")
     
-    @_require_grayscale
+    @_require_image
     def apply_divide_scalar(self):
         """Dzielenie obrazu przez liczbę"""
         dialog = ScalarOperationDialog(
@@ -573,7 +573,7 @@ class MainWindow:
 
     @_require_grayscale
     def apply_custom_mask(self):
-        """Własna maska 3x3"""
+        """Własna maska (3x3 - 31x31)"""
         dialog = CustomMaskDialog(self.root, self.current_image, self.app_manager)
         dialog.on_result_callback = lambda img: self._show_result(img, "Własna maska")
 
@@ -588,6 +588,7 @@ class MainWindow:
         """Kierunkowa detekcja krawędzi Prewitta"""
         dialog = PrewittDialog(self.root, self.current_image, self.app_manager)
         dialog.on_result_callback = lambda img: self._show_result(img, "Prewitt")
+        dialog.on_directions_callback = lambda img: self._show_result(img, "Prewitt - kierunki")
 
     @_require_grayscale
     def apply_sobel(self):
@@ -696,8 +697,8 @@ class MainWindow:
             messagebox.showinfo("Info", "Nie załadowano obrazu")
             return
         
-        unique_vals = np.unique(self.current_image)
-        if not (len(unique_vals) <= 2 and (unique_vals.max() == 255 or unique_vals.max() == 1)):
+        image_data = self.app_manager.get_image_data(self.current_image)
+        if not (image_data.is_two_level and image_data.max in (1, 255)):
             response = messagebox.askyesno("Ostrzeżenie", 
                 "Obraz nie jest binarny. Zastosować progowanie Otsu?")
             if response:
@@ -784,6 +785,9 @@ class MainWindow:
         if img_index is not None:
             self.images.pop(img_index)
         
+        # Zwolnij histogramy obrazu z cache
+        self.app_manager.invalidate_histograms(img)
+        
         # Jeśli to był aktywny obraz, wyczyść
         if self.current_image is img:
             self.current_image = None
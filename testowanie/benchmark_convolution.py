@@ -0,0 +1,155 @@
+"""
+Benchmark trybu brzegu "Wypełnienie wyniku stałą" - pętla pikselowa
+vs. wektorowa konwolucja i mediana ConvolutionOperations - czas filtru
+medianowego w zależności od rozmiaru otoczenia, skalowanie konwolucji
+kafelkowej z liczbą wątków oraz czas wygładzania Gaussa i uśredniania
+o dowolnym rozmiarze.
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/benchmark_convolution.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.ConvolutionOperations import ConvolutionOperations
+
+BORDER_FILL = "Wypełnienie wyniku stałą"
+BORDER_VALUE = 128
+
+
+def loop_convolution(img, kernel, border_value):
+    """Referencyjna konwolucja piksel po pikselu (poprzednia implementacja)"""
+    result = np.full_like(img, border_value, dtype=np.float32)
+
+    pad = kernel.shape[0] // 2
+    h, w = img.shape
+
+    for i in range(pad, h - pad):
+        for j in range(pad, w - pad):
+            roi = img[i-pad:i+pad+1, j-pad:j+pad+1].astype(np.float32)
+            result[i, j] = np.sum(roi * kernel)
+
+    return result
+
+
+def loop_median(img, kernel_size, border_value):
+    """Referencyjna mediana piksel po pikselu (poprzednia implementacja)"""
+    result = np.full_like(img, border_value, dtype=np.uint8)
+
+    pad = kernel_size // 2
+    h, w = img.shape
+
+    for i in range(pad, h - pad):
+        for j in range(pad, w - pad):
+            roi = img[i-pad:i+pad+1, j-pad:j+pad+1]
+            result[i, j] = np.median(roi)
+
+    return result
+
+
+def measure(func, repeats):
+    """Zwraca najlepszy czas (w sekundach) z `repeats` powtórzeń oraz wynik"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    conv_ops = ConvolutionOperations()
+    rng = np.random.default_rng(0)
+
+    kernels = {
+        "Uśrednienie": conv_ops.SMOOTHING_MASKS["Uśrednienie"],
+        "Filtr Gaussa": conv_ops.SMOOTHING_MASKS["Filtr Gaussa"],
+        "Laplacjan wariant 2": conv_ops.LAPLACIAN_MASKS["Laplacjan wariant 2"],
+        "Sobel X": conv_ops.SOBEL_X,
+    }
+
+    print(f"{'Maska':<22} {'Rozmiar':>10} {'Pętle [ms]':>12} {'Wektor [ms]':>12} {'Przysp.':>9}")
+    for size in [(256, 256), (512, 512), (1024, 1024)]:
+        img = rng.integers(0, 256, size, dtype=np.uint8)
+
+        for name, kernel in kernels.items():
+            loop_time, expected = measure(lambda: loop_convolution(img, kernel, BORDER_VALUE), repeats=1)
+            fast_time, result = measure(
+                lambda: conv_ops._apply_convolution_with_border(img, kernel, BORDER_FILL, BORDER_VALUE),
+                repeats=5
+            )
+
+            if not np.array_equal(expected, result):
+                raise AssertionError(f"Niezgodny wynik dla maski {name}, obraz {size}")
+
+            speedup = loop_time / fast_time if fast_time > 0 else float('inf')
+            print(f"{name:<22} {'x'.join(map(str, size)):>10} {loop_time * 1000:>12.2f} "
+                  f"{fast_time * 1000:>12.2f} {speedup:>8.1f}x")
+
+    print()
+    print(f"{'Mediana':<22} {'Rozmiar':>10} {'Pętle [ms]':>12} {'Wektor [ms]':>12} {'Przysp.':>9}")
+    for size in [(256, 256), (512, 512)]:
+        img = rng.integers(0, 256, size, dtype=np.uint8)
+
+        for kernel_size in (3, 5):
+            loop_time, expected = measure(lambda: loop_median(img, kernel_size, BORDER_VALUE), repeats=1)
+            fast_time, result = measure(
+                lambda: conv_ops.apply_median(img, kernel_size, BORDER_FILL, BORDER_VALUE),
+                repeats=5
+            )
+
+            if not np.array_equal(expected, result):
+                raise AssertionError(f"Niezgodna mediana {kernel_size}x{kernel_size}, obraz {size}")
+
+            speedup = loop_time / fast_time if fast_time > 0 else float('inf')
+            name = f"{kernel_size}x{kernel_size}"
+            print(f"{name:<22} {'x'.join(map(str, size)):>10} {loop_time * 1000:>12.2f} "
+                  f"{fast_time * 1000:>12.2f} {speedup:>8.1f}x")
+
+    print()
+    print(f"{'Mediana (1024x1024)':<22} {'Czas [ms]':>12}")
+    img = rng.integers(0, 256, (1024, 1024), dtype=np.uint8)
+    for kernel_size in conv_ops.get_median_kernel_sizes():
+        fast_time, _ = measure(lambda: conv_ops.apply_median(img, kernel_size, BORDER_FILL, BORDER_VALUE), repeats=3)
+        print(f"{f'{kernel_size}x{kernel_size}':<22} {fast_time * 1000:>12.2f}")
+
+    print()
+    print(f"{'Kafelki (2048x2048)':<22} {'Wątki':>10} {'Czas [ms]':>12} {'Przysp.':>9}")
+    img = rng.integers(0, 256, (2048, 2048), dtype=np.uint8)
+    kernel = conv_ops.SMOOTHING_MASKS["Filtr Gaussa"]
+    for border_type in conv_ops.get_border_types():
+        base_time, expected = None, None
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            tiled_ops = ConvolutionOperations(workers=workers)
+            tiled_time, result = measure(
+                lambda: tiled_ops._apply_convolution_with_border(img, kernel, border_type, BORDER_VALUE),
+                repeats=3
+            )
+            if expected is None:
+                base_time, expected = tiled_time, result
+            elif not np.array_equal(expected, result):
+                raise AssertionError(f"Niezgodny wynik dla {workers} wątków, brzeg {border_type}")
+
+            speedup = base_time / tiled_time if tiled_time > 0 else float('inf')
+            print(f"{border_type[:22]:<22} {workers:>10} {tiled_time * 1000:>12.2f} {speedup:>8.1f}x")
+
+    print()
+    print(f"{'Wygładzanie (2048x2048)':<22} {'Parametr':>10} {'Czas [ms]':>12}")
+    for sigma in (2, 5, 10, 20, 40, 80):
+        smooth_time, _ = measure(lambda: conv_ops.apply_gaussian_smoothing(img, sigma), repeats=1)
+        print(f"{'Gauss, sigma':<22} {sigma:>10} {smooth_time * 1000:>12.2f}")
+    for radius in (1, 5, 25, 100):
+        smooth_time, _ = measure(lambda: conv_ops.apply_box_smoothing(img, radius), repeats=3)
+        print(f"{'Uśrednienie, promień':<22} {radius:>10} {smooth_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
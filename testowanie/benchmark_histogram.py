@@ -0,0 +1,87 @@
+"""
+Benchmark liczenia histogramów - pętle pikselowe vs. wektorowy HistogramManager.
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/benchmark_histogram.py
+"""
+
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.Histogram import HistogramManager
+
+
+def loop_histograms(img):
+    """Referencyjne liczenie histogramu piksel po pikselu (poprzednia implementacja)"""
+    if len(img.shape) == 2:
+        hist = np.zeros(256, dtype=int)
+        for pixel in img.flat:
+            hist[pixel] += 1
+        return [hist]
+
+    hists = [np.zeros(256, dtype=int) for _ in range(3)]
+    for row in img:
+        for pixel in row:
+            b, g, r = pixel
+            hists[0][b] += 1
+            hists[1][g] += 1
+            hists[2][r] += 1
+    return hists
+
+
+def load_image(path):
+    """Wczytuje obraz tak samo jak MainWindow.load_image"""
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return None
+    if len(img.shape) == 3 and img.shape[2] == 4:
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    if len(img.shape) == 3 and img.shape[2] == 3:
+        if np.all(img[:, :, 0] == img[:, :, 1]) and np.all(img[:, :, 1] == img[:, :, 2]):
+            img = img[:, :, 0]
+    return img
+
+
+def measure(func, img, repeats):
+    """Zwraca najlepszy czas (w sekundach) z `repeats` powtórzeń oraz wynik"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(img)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, "sample_pictures", "*")))
+
+    print(f"{'Obraz':<40} {'Rozmiar':>14} {'Pętle [ms]':>12} {'Wektor [ms]':>12} {'Przysp.':>9}")
+    for path in paths:
+        img = load_image(path)
+        if img is None:
+            continue
+
+        loop_time, expected = measure(loop_histograms, img, repeats=1)
+        fast_time, stats = measure(HistogramManager.calculate_histograms, img, repeats=5)
+
+        for exp, got in zip(expected, stats):
+            if not np.array_equal(exp, got.histogram):
+                raise AssertionError(f"Niezgodny histogram dla {path}")
+
+        size = "x".join(str(v) for v in img.shape)
+        speedup = loop_time / fast_time if fast_time > 0 else float('inf')
+        print(f"{os.path.basename(path):<40} {size:>14} {loop_time * 1000:>12.2f} "
+              f"{fast_time * 1000:>12.2f} {speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
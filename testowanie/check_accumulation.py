@@ -0,0 +1,81 @@
+"""
+Sprawdzenie akumulacji N obrazów (ArithmeticOperations.accumulate_images
+oraz projekcji stosu StackOperations.project, która używa tego samego
+akumulatora).
+
+Średnia jest porównywana z dokładnym wynikiem liczonym w int64 dla liczby
+obrazów na granicy zmiany typu akumulatora (uint16 -> uint32, z zapasem na
+składnik zaokrąglenia) - dla listy obrazów i dla iteratora. Dodawanie bez
+wysycenia musi odrzucić więcej niż 255 obrazów zamiast zwrócić czarny obraz.
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/check_accumulation.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.ArithmeticOperations import ArithmeticOperations
+from backend.StackOperations import StackOperations
+
+# Liczby obrazów wokół granicy uint16: 256 * 255 + 128 <= 65535 < 257 * 255 + 128
+BOUNDARY_COUNTS = [2, 255, 256, 257, 258, 65535 // 255, 65535 // 255 + 1, 300]
+
+
+def exact_mean(images):
+    """Średnia zaokrąglona do najbliższej wartości (połówki w górę), w int64"""
+    total = np.sum(np.stack(images).astype(np.int64), axis=0)
+    count = len(images)
+    return ((total + count // 2) // count).astype(np.uint8)
+
+
+def main():
+    failures = 0
+    rng = np.random.default_rng(0)
+
+    print("Średnia N obrazów (lista / iterator):")
+    for count in BOUNDARY_COUNTS:
+        cases = {
+            "255": [np.full((4, 4), 255, dtype=np.uint8)] * count,
+            "losowe": [rng.integers(0, 256, (4, 4), dtype=np.uint8) for _ in range(count)],
+        }
+        for name, images in cases.items():
+            expected = exact_mean(images)
+            as_list = ArithmeticOperations.accumulate_images(images, "mean")
+            as_iter = ArithmeticOperations.accumulate_images(iter(images), "mean")
+            same = np.array_equal(as_list, expected) and np.array_equal(as_iter, expected)
+            failures += not same
+            print(f"  N={count:<4} {name:<7}: {'OK' if same else 'RÓŻNICA'}")
+
+    print("\nProjekcja średniej stosu N klatek:")
+    for count in (256, 257, 300):
+        stacks = {
+            "255": np.full((count, 4, 4), 255, dtype=np.uint8),
+            "losowe": rng.integers(0, 256, (count, 4, 4), dtype=np.uint8),
+        }
+        for name, stack in stacks.items():
+            expected = exact_mean(list(stack))
+            same = np.array_equal(StackOperations.project(stack, "mean"), expected)
+            failures += not same
+            print(f"  N={count:<4} {name:<7}: {'OK' if same else 'RÓŻNICA'}")
+
+    print("\nDodawanie bez wysycenia, 300 obrazów:")
+    try:
+        ArithmeticOperations.accumulate_images([np.full((4, 4), 100, dtype=np.uint8)] * 300,
+                                               "sum", saturation=False)
+        failures += 1
+        print("  RÓŻNICA: brak błędu")
+    except ValueError as e:
+        print(f"  OK (ValueError: {e})")
+
+    print("\nWynik:", "OK" if failures == 0 else f"{failures} błędów")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
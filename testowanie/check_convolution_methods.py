@@ -0,0 +1,121 @@
+"""
+Sprawdzenie zgodności metod konwolucji własnej maski
+(ConvolutionOperations.apply_custom_mask: "direct", "separable", "fft", "auto").
+
+Każda metoda liczy ten sam wynik z innym szumem numerycznym float - wyniki
+mogą różnić się o 1 poziom jasności, ale szum tuż poza zakresem 0-255 nie
+może zmieniać sposobu odwzorowania wyniku (normalizacja całego obrazu).
+Obrazy zawierają czarny blok, w którym wynik maski dodatniej wynosi dokładnie 0.
+Dla maski o wagach całkowitych / 16 (wynik float dokładny) "auto" liczy
+w arytmetyce całkowitej, a pozostałe metody muszą dawać ten sam wynik -
+wszystkie obcinają część ułamkową. Maski wygładzające (apply_smoothing)
+porównywane są z dokładnym wynikiem całkowitym (int64, dzielenie w dół).
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/check_convolution_methods.py
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.ConvolutionOperations import ConvolutionOperations
+
+# Największa dopuszczalna różnica między metodami (poziomy jasności)
+MAX_LEVEL_DIFFERENCE = 1
+
+
+def image_with_black_block(size, block, seed):
+    """Losowy obraz uint8 z czarnym kwadratem block x block"""
+    img = np.random.default_rng(seed).integers(0, 256, (size, size), dtype=np.uint8)
+    img[size // 5:size // 5 + block, size // 5:size // 5 + block] = 0
+    return img
+
+
+def low_rank_mask(size, rank, seed):
+    """Dodatnia, znormalizowana maska size x size rzędu rank"""
+    rng = np.random.default_rng(seed)
+    mask = rng.random((size, rank)) @ rng.random((rank, size))
+    return mask / mask.sum()
+
+
+def exact_smoothing(ops, img, mask_name, border_type, border_value):
+    """Wygładzanie liczone w int64: suma wag całkowitych // dzielnik"""
+    fixed = ops.fixed_point_kernel(ops.SMOOTHING_MASKS[mask_name])
+    pad = fixed.weights.shape[0] // 2
+    h, w = img.shape
+    if border_type == "Wypełnienie wyniku stałą":
+        padded, result = img.astype(np.int64), np.full((h, w), border_value, dtype=np.int64)
+        target = result[pad:h - pad, pad:w - pad]
+    else:
+        padded = cv2.copyMakeBorder(img, pad, pad, pad, pad, ops.BORDER_TYPES[border_type],
+                                    value=border_value).astype(np.int64)
+        result = np.zeros((h, w), dtype=np.int64)
+        target = result
+    out_h, out_w = target.shape
+    acc = np.zeros((out_h, out_w), dtype=np.int64)
+    for (dy, dx), weight in np.ndenumerate(fixed.weights):
+        acc += padded[dy:dy + out_h, dx:dx + out_w] * int(weight)
+    target[...] = acc // fixed.divisor
+    return result.astype(np.uint8)
+
+
+def compare_methods(ops, name, img, mask, border_type, methods, max_difference=MAX_LEVEL_DIFFERENCE):
+    """Porównuje wyniki metod z metodą "direct"; zwraca liczbę błędów"""
+    reference = ops.apply_custom_mask(img, mask, border_type, 0, method="direct").astype(np.int16)
+    failures = 0
+    for method in methods:
+        result = ops.apply_custom_mask(img, mask, border_type, 0, method=method)
+        difference = int(np.max(np.abs(result.astype(np.int16) - reference)))
+        ok = difference <= max_difference
+        failures += not ok
+        print(f"  {name:<22} {border_type:<26} {method:<9}: "
+              f"{'OK' if ok else 'RÓŻNICA'} (maks. różnica {difference})")
+    return failures
+
+
+def main():
+    ops = ConvolutionOperations()
+    failures = 0
+
+    print("Maska 15x15 rzędu 2 (filter2D przez DFT / przebiegi 1-D):")
+    img = image_with_black_block(300, 100, seed=0)
+    mask = low_rank_mask(15, 2, seed=1)
+    for border_type in ("BORDER_REFLECT", "BORDER_CONSTANT"):
+        failures += compare_methods(ops, "15x15 rząd 2", img, mask, border_type,
+                                    ["separable", "fft", "auto"])
+
+    print("\nMaska 31x31 pełnego rzędu (FFT), wypełnienie wyniku stałą:")
+    img = image_with_black_block(512, 200, seed=2)
+    mask = np.random.default_rng(3).random((31, 31))
+    mask /= mask.sum()
+    failures += compare_methods(ops, "31x31 dodatnia", img, mask, "Wypełnienie wyniku stałą",
+                                ["fft", "auto"])
+
+    print("\nMaska Gaussa 3x3 / 16 (arytmetyka całkowita w \"auto\"):")
+    img = image_with_black_block(300, 100, seed=4)
+    mask = np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16
+    for border_type in ("BORDER_REFLECT", "Wypełnienie wyniku stałą"):
+        failures += compare_methods(ops, "3x3 / 16", img, mask, border_type,
+                                    ["separable", "auto"], max_difference=0)
+
+    print("\nMaski wygładzające (arytmetyka całkowita) a wynik dokładny:")
+    img = np.random.default_rng(5).integers(0, 256, (120, 140), dtype=np.uint8)
+    for mask_name in ops.get_smoothing_mask_names():
+        for border_type in ops.get_border_types():
+            expected = exact_smoothing(ops, img, mask_name, border_type, 77)
+            same = np.array_equal(ops.apply_smoothing(img, mask_name, border_type, 77), expected)
+            failures += not same
+            print(f"  {mask_name:<22} {border_type:<26}: {'OK' if same else 'RÓŻNICA'}")
+
+    print("\nWynik:", "OK" if failures == 0 else f"{failures} błędów")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,162 @@
+"""
+Sprawdzenie zgodności rozciągania i wyrównywania histogramu.
+
+Porównuje wektorowe HistogramManager.stretch_histogram / equalize_histogram
+z poprzednią implementacją (pętle piksel po pikselu) - wynik musi być identyczny
+bit w bit - oraz wypisuje różnicę względem obrazów referencyjnych z ref_pictures.
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/check_histogram_ops.py
+"""
+
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.Histogram import HistogramManager
+
+TEST_DIR = os.path.join(ROOT_DIR, "testowanie", "test_pictures")
+REF_DIR = os.path.join(ROOT_DIR, "testowanie", "ref_pictures")
+
+REFERENCES = {
+    "02_3_rozciągnięcie": lambda img: HistogramManager.stretch_histogram(img),
+    "03_3_equalizacja": lambda img: HistogramManager.equalize_histogram(img),
+}
+
+
+def loop_stretch_histogram(img, saturation_percent=0):
+    """Referencyjne rozciąganie histogramu (poprzednia implementacja)"""
+    hist = np.zeros(256, dtype=int)
+    for pixel in img.flat:
+        hist[pixel] += 1
+
+    Lmin = 0
+    Lmax = 255
+    sem_min = False
+    sem_max = False
+
+    if saturation_percent > 0:
+        total_pixels = img.shape[0] * img.shape[1]
+        threshold_pixels = int((saturation_percent / 2 / 100) * total_pixels)
+
+        accumulated = 0
+        for z in range(256):
+            if not sem_min:
+                if hist[z] != 0:
+                    sem_min = True
+                    Lmin = z
+            accumulated += hist[z]
+            if accumulated >= threshold_pixels and hist[z] != 0:
+                Lmin = z
+                break
+
+        accumulated = 0
+        for z in range(255, -1, -1):
+            if not sem_max:
+                if hist[z] != 0:
+                    sem_max = True
+                    Lmax = z
+            accumulated += hist[z]
+            if accumulated >= threshold_pixels and hist[z] != 0:
+                Lmax = z
+                break
+    else:
+        for z in range(256):
+            if hist[z] != 0:
+                Lmin = z
+                break
+
+        for z in range(255, -1, -1):
+            if hist[z] != 0:
+                Lmax = z
+                break
+
+    if Lmax == Lmin:
+        return img.copy()
+
+    lut = np.zeros(256, dtype=np.uint8)
+    for z in range(256):
+        if z < Lmin:
+            lut[z] = 0
+        elif z > Lmax:
+            lut[z] = 255
+        else:
+            lut[z] = int(((z - Lmin) * 255) / (Lmax - Lmin))
+
+    return lut[img]
+
+
+def loop_equalize_histogram(img):
+    """Referencyjne wyrównywanie histogramu (poprzednia implementacja)"""
+    hist = np.zeros(256, dtype=int)
+    for pixel in img.flat:
+        hist[pixel] += 1
+
+    cdf = np.cumsum(hist)
+    cdf_min = cdf[cdf > 0].min()
+    total_pixels = img.shape[0] * img.shape[1]
+
+    lut = np.zeros(256, dtype=np.uint8)
+    with np.errstate(invalid='ignore'):
+        for i in range(256):
+            if cdf[i] > 0:
+                lut[i] = np.round(((cdf[i] - cdf_min) / (total_pixels - cdf_min)) * 255)
+            else:
+                lut[i] = 0
+
+    return lut[img]
+
+
+def gray_images():
+    """Obrazy testowe w skali szarości: test_pictures, sample_pictures i losowe"""
+    paths = sorted(glob.glob(os.path.join(TEST_DIR, "*")))
+    paths += sorted(glob.glob(os.path.join(ROOT_DIR, "sample_pictures", "*")))
+    for path in paths:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is not None:
+            yield os.path.relpath(path, ROOT_DIR), img
+
+    rng = np.random.default_rng(0)
+    yield "losowy 0-255", rng.integers(0, 256, (240, 320), dtype=np.uint8)
+    yield "losowy 40-90", rng.integers(40, 91, (240, 320), dtype=np.uint8)
+    yield "stały 7", np.full((16, 16), 7, dtype=np.uint8)
+
+
+def main():
+    failures = 0
+
+    for name, img in gray_images():
+        for saturation in (0, 1, 2, 5):
+            expected = loop_stretch_histogram(img, saturation)
+            result = HistogramManager.stretch_histogram(img, saturation)
+            if not np.array_equal(expected, result):
+                failures += 1
+                print(f"RÓŻNICA stretch_histogram({saturation}%): {name}")
+
+        if not np.array_equal(loop_equalize_histogram(img), HistogramManager.equalize_histogram(img)):
+            failures += 1
+            print(f"RÓŻNICA equalize_histogram: {name}")
+
+    print("\nPorównanie z obrazami referencyjnymi (test_pictures/3.*):")
+    for ref_name, operation in REFERENCES.items():
+        for ref_path in sorted(glob.glob(os.path.join(REF_DIR, ref_name + ".*"))):
+            ref = cv2.imread(ref_path, cv2.IMREAD_GRAYSCALE)
+            for test_path in sorted(glob.glob(os.path.join(TEST_DIR, "3.*"))):
+                img = cv2.imread(test_path, cv2.IMREAD_GRAYSCALE)
+                result = operation(img)
+                diff = np.abs(result.astype(np.int16) - ref.astype(np.int16))
+                print(f"  {os.path.basename(ref_path):<28} vs {os.path.basename(test_path):<6} "
+                      f"maks. różnica: {diff.max():3d}, różnych pikseli: {np.count_nonzero(diff)}")
+
+    print("\nZgodność z poprzednią implementacją:", "OK" if failures == 0 else f"{failures} błędów")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
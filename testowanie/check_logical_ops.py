@@ -0,0 +1,75 @@
+"""
+Sprawdzenie zgodności operacji logicznych.
+
+Porównuje wektorowe LogicalOperations z obrazami referencyjnymi 10-12 z ref_pictures
+(AND, OR, XOR obrazów 1 i 2) oraz składanie N obrazów przez LogicalOperations.combine
+z kolejnym składaniem parami - wyniki muszą być identyczne bit w bit.
+
+Uruchomienie (z katalogu głównego repozytorium):
+    python testowanie/check_logical_ops.py
+"""
+
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.LogicalOperations import LogicalOperations
+
+TEST_DIR = os.path.join(ROOT_DIR, "testowanie", "test_pictures")
+REF_DIR = os.path.join(ROOT_DIR, "testowanie", "ref_pictures")
+
+REFERENCES = {
+    "10_1_2_AND": LogicalOperations.logical_and,
+    "11_1_2_OR": LogicalOperations.logical_or,
+    "12_1_2_XOR": LogicalOperations.logical_xor,
+}
+
+
+def main():
+    failures = 0
+
+    print("Porównanie z obrazami referencyjnymi (test_pictures/1.* i 2.*):")
+    for ref_name, operation in REFERENCES.items():
+        for ref_path in sorted(glob.glob(os.path.join(REF_DIR, ref_name + ".*"))):
+            ref = cv2.imread(ref_path, cv2.IMREAD_GRAYSCALE)
+            for ext in ("bmp", "png", "tif"):
+                img1 = cv2.imread(os.path.join(TEST_DIR, f"1.{ext}"), cv2.IMREAD_GRAYSCALE)
+                img2 = cv2.imread(os.path.join(TEST_DIR, f"2.{ext}"), cv2.IMREAD_GRAYSCALE)
+                if img1 is None or img2 is None:
+                    continue
+                same = np.array_equal(operation(img1, img2), ref)
+                failures += not same
+                print(f"  {os.path.basename(ref_path):<16} vs 1.{ext}, 2.{ext}: "
+                      f"{'OK' if same else 'RÓŻNICA'}")
+
+    print("\nSkładanie N obrazów vs. składanie parami:")
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (480, 640), dtype=np.uint8) for _ in range(6)]
+    pairwise = {
+        "AND": LogicalOperations.logical_and,
+        "OR": LogicalOperations.logical_or,
+        "XOR": LogicalOperations.logical_xor,
+    }
+    for operation, pair in pairwise.items():
+        for count in range(1, len(images) + 1):
+            expected = images[0]
+            for img in images[1:count]:
+                expected = pair(expected, img)
+            same = np.array_equal(LogicalOperations.combine(images[:count], operation), expected)
+            failures += not same
+            if not same:
+                print(f"  RÓŻNICA {operation} dla {count} obrazów")
+    print("  sprawdzono AND/OR/XOR dla 1-6 obrazów")
+
+    print("\nZgodność:", "OK" if failures == 0 else f"{failures} błędów")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())